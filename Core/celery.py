@@ -14,4 +14,7 @@ app = Celery('Core')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Автоматично знаходить tasks.py у всіх додатках
-app.autodiscover_tasks()
\ No newline at end of file
+app.autodiscover_tasks()
+
+# Підключає збір метрик (глибина черг, латентність, частка помилок)
+from . import celery_metrics  # noqa: E402,F401
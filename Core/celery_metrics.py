@@ -0,0 +1,126 @@
+import time
+from celery.signals import before_task_publish, task_prerun, task_postrun
+from django.conf import settings
+from django.core.cache import cache
+from kombu.exceptions import OperationalError, ChannelError
+from .counters import incr_counters
+
+# Лічильники зберігаються в кеші (Redis), тому їх бачать усі воркери та веб-процес.
+# Ключі розбиті на вікна TASK_METRICS_WINDOW_SECONDS і живуть, поки вікно входить у ковзний діапазон
+METRICS_KEY_PREFIX = 'celery_metrics'
+METRICS_FIELDS = ['succeeded', 'failed', 'retried', 'runtime_ms', 'wait_ms', 'wait_samples']
+STATE_FIELDS = {'SUCCESS': 'succeeded', 'FAILURE': 'failed', 'RETRY': 'retried'}
+
+# Час старту задач поточного процесу воркера (task_id -> timestamp)
+_started_at = {}
+
+
+def _window():
+    return int(time.time() // settings.TASK_METRICS_WINDOW_SECONDS)
+
+
+def _metric_key(task_name, field, window=None):
+    window = _window() if window is None else window
+    return f"{METRICS_KEY_PREFIX}:{window}:{task_name}:{field}"
+
+
+def _record(deltas):
+    ttl = settings.TASK_METRICS_WINDOW_SECONDS * (settings.TASK_METRICS_WINDOWS + 1)
+    incr_counters(deltas, timeout=ttl)
+
+
+@before_task_publish.connect
+def stamp_enqueue_time(headers=None, **kwargs):
+    # Позначає час постановки в чергу, щоб воркер порахував час очікування
+    if headers is not None:
+        headers['enqueued_at'] = time.time()
+
+
+@task_prerun.connect
+def record_task_start(task_id=None, task=None, **kwargs):
+    now = time.time()
+    _started_at[task_id] = now
+
+    enqueued_at = getattr(task.request, 'enqueued_at', None)
+    if enqueued_at:
+        _record({
+            _metric_key(task.name, 'wait_ms'): int((now - enqueued_at) * 1000),
+            _metric_key(task.name, 'wait_samples'): 1,
+        })
+
+
+@task_postrun.connect
+def record_task_finish(task_id=None, task=None, state=None, **kwargs):
+    deltas = {}
+    started_at = _started_at.pop(task_id, None)
+    if started_at:
+        deltas[_metric_key(task.name, 'runtime_ms')] = int((time.time() - started_at) * 1000)
+
+    field = STATE_FIELDS.get(state)
+    if field:
+        deltas[_metric_key(task.name, field)] = 1
+    _record(deltas)
+
+
+def get_queue_depths(app, connection=None):
+    """
+    Повертає кількість повідомлень у кожній черзі брокера.
+    Якщо брокер недоступний, повертає None.
+    """
+    depths = {}
+    with app.connection_or_acquire(connection) as conn:
+        try:
+            conn.ensure_connection(max_retries=1)
+        except OperationalError:
+            return None
+
+        channel = conn.default_channel
+        for queue in app.conf.task_queues:
+            try:
+                depths[queue.name] = channel.queue_declare(queue=queue.name, passive=True).message_count
+            except ChannelError:
+                # Черга ще не створена брокером — отже порожня
+                depths[queue.name] = 0
+    return depths
+
+
+def get_task_stats(app):
+    """
+    Повертає для кожної зареєстрованої задачі кількість виконань,
+    частку помилок, середній час виконання та середній час очікування в черзі
+    за останні TASK_METRICS_WINDOWS вікон.
+    """
+    task_names = sorted(name for name in app.tasks if not name.startswith('celery.'))
+    current = _window()
+    windows = range(current - settings.TASK_METRICS_WINDOWS + 1, current + 1)
+    keys = [_metric_key(name, field, window) for name in task_names for field in METRICS_FIELDS for window in windows]
+    values = cache.get_many(keys)
+
+    stats = {}
+    for name in task_names:
+        metric = {
+            field: sum(values.get(_metric_key(name, field, window), 0) for window in windows)
+            for field in METRICS_FIELDS
+        }
+        finished = metric['succeeded'] + metric['failed']
+
+        stats[name] = {
+            'succeeded': metric['succeeded'],
+            'failed': metric['failed'],
+            'retried': metric['retried'],
+            'failure_rate': round(metric['failed'] / finished, 4) if finished else 0.0,
+            'avg_runtime_ms': round(metric['runtime_ms'] / finished, 1) if finished else None,
+            'avg_wait_ms': round(metric['wait_ms'] / metric['wait_samples'], 1) if metric['wait_samples'] else None,
+        }
+    return stats
+
+
+def collect_metrics(connection=None):
+    """Зведені метрики фонових задач: глибина черг + статистика по задачах."""
+    from .celery import app
+
+    return {
+        'window_seconds': settings.TASK_METRICS_WINDOW_SECONDS * settings.TASK_METRICS_WINDOWS,
+        'queues': get_queue_depths(app, connection),
+        'tasks': get_task_stats(app),
+    }
@@ -0,0 +1,188 @@
+import hashlib
+import time
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_etags
+from .sparse_fields import representation_key
+
+VERSION_KEY_PREFIX = 'etag:ver'
+
+# Заголовки, з якими PATCH/PUT виконується тільки для актуальної версії об'єкта
+PRECONDITION_HEADERS = ('HTTP_IF_MATCH', 'HTTP_IF_UNMODIFIED_SINCE', 'HTTP_IF_NONE_MATCH')
+
+
+# --- ВЕРСІЇ ВКЛАДЕНИХ КОЛЕКЦІЙ ---
+# Версія — час (нс) останньої зміни дочірніх об'єктів (коментарів, учасників, задач спринту).
+# Якщо ключ витіснено з кешу, створюється нова мітка: клієнти один раз перезавантажать дані,
+# але ніколи не отримають 304 на застарілі.
+
+def _version_key(model, pk):
+    return f"{VERSION_KEY_PREFIX}:{model._meta.label_lower}:{pk}"
+
+
+def get_versions(items):
+    """Версії для списку (модель, pk) одним зверненням до кешу; None для pk=None."""
+    keys = [_version_key(model, pk) if pk is not None else None for model, pk in items]
+    stored = cache.get_many([key for key in keys if key])
+    for key in keys:
+        if key and key not in stored:
+            cache.add(key, time.time_ns(), timeout=None)
+            stored[key] = cache.get(key)
+    return [stored[key] if key else None for key in keys]
+
+
+def bump_versions(model, pks):
+    """
+    Позначає колекції об'єктів як змінені.
+    Підвищує одразу і повторно після коміту, щоб паралельний читач
+    не закріпив версію за ще не закоміченими даними.
+    """
+    keys = [_version_key(model, pk) for pk in {pk for pk in pks if pk is not None}]
+    if not keys:
+        return
+
+    def bump():
+        version = time.time_ns()
+        cache.set_many({key: version for key in keys}, timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def track_collection(child_model, parent_model, fk_attname):
+    """
+    Зміни child_model (збереження, видалення, каскади) підвищують версію батьківського
+    об'єкта. Якщо дочірній об'єкт перенесли до іншого батька (_loaded_values),
+    змінюються обидва.
+    """
+    def bump_parent(sender, instance, **kwargs):
+        previous = getattr(instance, '_loaded_values', {}).get(fk_attname)
+        bump_versions(parent_model, [getattr(instance, fk_attname), previous])
+
+    uid = f"track_collection:{child_model._meta.label_lower}:{parent_model._meta.label_lower}"
+    post_save.connect(bump_parent, sender=child_model, weak=False, dispatch_uid=f"{uid}:save")
+    post_delete.connect(bump_parent, sender=child_model, weak=False, dispatch_uid=f"{uid}:delete")
+
+
+def track_display_fields(model, fields, dependents=()):
+    """
+    Зміна полів model, які показуються в інших об'єктах (ім'я та аватар юзера, назва проєкту),
+    підвищує версію самого об'єкта — її враховують ETag-и через related_versions — і версії
+    об'єктів, у вкладених списках яких він присутній: dependents = [(модель, instance -> pk-и)].
+    save(update_fields=...) без цих полів (наприклад, last_login) версій не змінює.
+    """
+    fields = set(fields)
+
+    def bump_dependents(sender, instance, update_fields=None, **kwargs):
+        if update_fields is not None and not fields & set(update_fields):
+            return
+        bump_versions(model, [instance.pk])
+        for dependent_model, get_pks in dependents:
+            bump_versions(dependent_model, get_pks(instance))
+
+    labels = ':'.join(dependent_model._meta.label_lower for dependent_model, _ in dependents)
+    uid = f"track_display_fields:{model._meta.label_lower}:{labels}"
+    post_save.connect(bump_dependents, sender=model, weak=False, dispatch_uid=uid)
+
+
+# --- УМОВНІ ЗАПИТИ (ETag / Last-Modified) ---
+
+def _object_etag(etag):
+    """ETag без суфікса представлення (\"<об'єкт>.<представлення>\" -> \"<об'єкт>\")."""
+    return etag.split('.', 1)[0] + '"' if '.' in etag else etag
+
+
+class ConditionalRequestMixin:
+    """
+    Міксин viewset-а (разом з SparseQuerysetMixin): ETag і Last-Modified для деталей об'єкта.
+
+    Валідатори рахуються без серіалізації — одним запитом за updated_at і FK з related_versions
+    (з тими ж правами доступу, що й get_object) плюс версії з кешу: вкладених колекцій
+    і пов'язаних об'єктів, чиї поля показуються у відповіді (ім'я виконавця, назва проєкту).
+    Вибране представлення (?fields=/?expand=) дає окремий суфікс ETag.
+    GET з If-None-Match / If-Modified-Since повертає 304 ще до завантаження об'єкта,
+    PATCH/PUT з If-Match / If-Unmodified-Since — 412, якщо об'єкт уже змінили (lost update).
+    """
+    version_field = 'updated_at'
+    # FK (attname) -> модель, чия версія входить в ETag (див. track_display_fields)
+    related_versions = {}
+
+    def get_validators(self, lock=False):
+        """(etag, last_modified) об'єкта з URL або (None, None), якщо його не видно."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+
+        # Той самий queryset, що й для get_object, але без анотацій, JOIN-ів і prefetch
+        self._sparse_sources = {self.version_field}
+        try:
+            queryset = self.filter_queryset(self.get_queryset())
+        finally:
+            del self._sparse_sources
+
+        queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        if lock:
+            queryset = queryset.select_for_update()
+        row = queryset.values_list('pk', self.version_field, *self.related_versions).first()
+        if row is None:
+            return None, None
+
+        pk, updated_at, *related_ids = row
+        versions = get_versions(
+            [(queryset.model, pk)] + list(zip(self.related_versions.values(), related_ids))
+        )
+        label = queryset.model._meta.label_lower
+        digest = hashlib.md5(f"{label}:{pk}:{updated_at.isoformat()}:{versions}".encode()).hexdigest()
+
+        representation = representation_key(self.request)
+        if representation is not None:
+            digest += '.' + hashlib.md5(representation.encode()).hexdigest()[:12]
+
+        newest = max(version for version in versions if version is not None)
+        last_modified = max(int(updated_at.timestamp()), newest // 1_000_000_000)
+        return f'"{digest}"', last_modified
+
+    @staticmethod
+    def _has_preconditions(request):
+        return any(header in request.META for header in PRECONDITION_HEADERS)
+
+    @staticmethod
+    def _set_validators(response, etag, last_modified):
+        if etag is None or response.status_code not in (200, 304):
+            return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Клієнт може тримати копію, але щоразу перевіряє її умовним запитом
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        if etag is not None:
+            not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if not_modified is not None:
+                return self._set_validators(not_modified, etag, last_modified)
+        return self._set_validators(super().retrieve(request, *args, **kwargs), etag, last_modified)
+
+    def update(self, request, *args, **kwargs):
+        if not self._has_preconditions(request):
+            response = super().update(request, *args, **kwargs)
+        else:
+            # Перевірка версії і збереження під блокуванням рядка (без гонки між ними)
+            if_match = request.META.get('HTTP_IF_MATCH', '').strip()
+            if if_match and if_match != '*':
+                # ETag будь-якого представлення (?fields=) підтверджує ту саму версію об'єкта
+                request.META['HTTP_IF_MATCH'] = ', '.join(_object_etag(tag) for tag in parse_etags(if_match))
+            with transaction.atomic():
+                etag, last_modified = self.get_validators(lock=True)
+                if etag is not None:
+                    etag = _object_etag(etag)
+                    failed = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                    if failed is not None:
+                        return failed
+                response = super().update(request, *args, **kwargs)
+
+        if response.status_code != 200:
+            return response
+        # Нова версія — щоб клієнт міг одразу робити наступний PATCH з If-Match
+        return self._set_validators(response, *self.get_validators())
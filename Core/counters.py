@@ -0,0 +1,38 @@
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.redis import RedisCache
+
+
+def incr_counter(key, delta=1, timeout=None):
+    """Атомарний інкремент лічильника в кеші (створює ключ, якщо його ще немає)."""
+    incr_counters({key: delta}, timeout=timeout)
+
+
+def incr_counters(deltas, timeout=None):
+    """
+    Атомарно інкрементує кілька лічильників {ключ: приріст}.
+    На Redis — один pipeline (INCRBY + EXPIRE) замість окремих запитів на кожен ключ;
+    timeout=None — ключі без строку дії. Нульові прирости пропускаються.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    backend = caches[DEFAULT_CACHE_ALIAS]
+    if isinstance(backend, RedisCache):
+        # Цілі числа RedisCache зберігає без серіалізації, тому INCRBY працює з ними напряму
+        with backend._cache.get_client(write=True).pipeline(transaction=False) as pipe:
+            for key, delta in deltas.items():
+                redis_key = backend.make_and_validate_key(key)
+                pipe.incrby(redis_key, delta)
+                if timeout is not None:
+                    pipe.expire(redis_key, timeout)
+            pipe.execute()
+        return
+
+    for key, delta in deltas.items():
+        backend.add(key, 0, timeout=timeout)
+        try:
+            backend.incr(key, delta)
+        except ValueError:
+            # Ключ витіснили між add та incr
+            backend.add(key, delta, timeout=timeout)
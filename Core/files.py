@@ -0,0 +1,66 @@
+import hashlib
+import mimetypes
+import os
+
+DEFAULT_MIME_TYPE = 'application/octet-stream'
+METADATA_FIELDS = ('file_size', 'file_extension', 'mime_type', 'sha256')
+# Ліміти колонок file_extension / mime_type у моделях вкладень і блобів
+MAX_EXTENSION_LENGTH = 20
+MAX_MIME_TYPE_LENGTH = 100
+
+
+def file_extension(name):
+    """
+    Розширення у нижньому регістрі. Довгий «хвіст» після крапки
+    (notes.final-approved-version-2026) — не розширення, тому повертається ''.
+    """
+    extension = os.path.splitext(name or '')[1].lower()
+    return extension if len(extension) <= MAX_EXTENSION_LENGTH else ''
+
+
+def guess_mime_type(name, content_type=None):
+    """MIME-тип за назвою, далі — заявлений клієнтом; задовгий або відсутній — DEFAULT_MIME_TYPE."""
+    for mime_type in (mimetypes.guess_type(name or '')[0], content_type):
+        if mime_type and len(mime_type) <= MAX_MIME_TYPE_LENGTH:
+            return mime_type
+    return DEFAULT_MIME_TYPE
+
+
+def file_metadata(file, name=None):
+    """
+    Розмір, розширення, MIME-тип і SHA-256 файлу за один потоковий прохід по чанках
+    (файл не читається в пам'ять цілком).
+    """
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in file.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+
+    name = name or file.name
+    return {
+        'file_size': size,
+        'file_extension': file_extension(name),
+        'mime_type': guess_mime_type(name, getattr(file, 'content_type', None)),
+        'sha256': digest.hexdigest(),
+    }
+
+
+def fill_file_metadata(instance, field_name='file'):
+    """
+    Заповнює метадані моделі з щойно завантаженого файлу (викликається з save()).
+    Файл, який уже лежить у сховищі, не перечитується — його метадані пораховані раніше.
+    """
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        for name in METADATA_FIELDS:
+            setattr(instance, name, None if name == 'file_size' else '')
+        return False
+
+    # _committed=False — файл ще в пам'яті/тимчасовому файлі запиту, сховище не чіпаємо
+    if field_file._committed:
+        return False
+
+    for name, value in file_metadata(field_file.file, name=field_file.name).items():
+        setattr(instance, name, value)
+    return True
@@ -0,0 +1,136 @@
+import os
+import re
+from urllib.parse import quote
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date
+from .files import DEFAULT_MIME_TYPE
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+RANGE_BLOCK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    """
+    Один діапазон з Range (bytes=0-499, bytes=500-, bytes=-500) -> (start, end) включно.
+    None — заголовка немає або кілька діапазонів (віддається весь файл),
+    ValueError — діапазон поза межами файлу (416).
+    """
+    match = RANGE_RE.match(header or '')
+    if match is None or match.groups() == ('', ''):
+        return None
+
+    start, end = match.groups()
+    if not start:
+        suffix = int(end)
+        if suffix == 0:
+            raise ValueError(header)
+        return max(size - suffix, 0), size - 1
+
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, min(end, size - 1)
+
+
+def _read_range(file, start, length):
+    try:
+        file.seek(start)
+        while length > 0:
+            block = file.read(min(RANGE_BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        file.close()
+
+
+def _file_response(request, path, content_type, etag, last_modified):
+    """FileResponse (zero-copy sendfile через wsgi.file_wrapper) або 206 для Range-запиту."""
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        raise Http404
+
+    # If-Range з іншою версією файлу — клієнт отримує весь файл заново
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if not if_range or if_range == etag or (last_modified and if_range == http_date(last_modified)):
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f"bytes */{size}"
+            return response
+
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(open(path, 'rb'), start, end - start + 1), status=206, content_type=content_type
+        )
+        response['Content-Range'] = f"bytes {start}-{end}/{size}"
+        response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _set_cache_headers(response, etag, last_modified):
+    if etag:
+        response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    # Файл доступний тільки учасникам проєкту — спільні кеші (CDN, проксі) його не зберігають
+    patch_cache_control(response, private=True, max_age=settings.PROTECTED_MEDIA_MAX_AGE)
+    return response
+
+
+def serve_protected_file(request, field_file, filename, content_type, etag=None, last_modified=None):
+    """
+    Віддає файл, доступ до якого view вже перевірив.
+    Передача байтів делегується фронт-проксі (PROTECTED_MEDIA_SERVER):
+    nginx — X-Accel-Redirect на internal location, apache — X-Sendfile;
+    без проксі — FileResponse з підтримкою Range. Файли з віддаленого сховища
+    віддаються редиректом на підписаний URL.
+    """
+    try:
+        path = field_file.storage.path(field_file.name)
+    except NotImplementedError:
+        return HttpResponseRedirect(field_file.url)
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return _set_cache_headers(not_modified, etag, last_modified)
+
+    server = settings.PROTECTED_MEDIA_SERVER
+    if server == 'nginx':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.PROTECTED_MEDIA_PREFIX + quote(field_file.name)
+    elif server == 'apache':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+    else:
+        response = _file_response(request, path, content_type, etag, last_modified)
+
+    if response.status_code == 416:
+        return response
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    return _set_cache_headers(response, etag, last_modified)
+
+
+def serve_resource_file(request, resource):
+    """
+    Віддає файл вкладення (TaskResource/ProjectResource). Вміст незмінний для свого SHA-256,
+    тому хеш слугує сильним ETag, а повторні запити клієнта закінчуються 304.
+    """
+    return serve_protected_file(
+        request, resource.file,
+        filename=resource.name or os.path.basename(resource.file.name),
+        content_type=resource.mime_type or DEFAULT_MIME_TYPE,
+        etag=f'"{resource.sha256}"' if resource.sha256 else None,
+        last_modified=int(resource.created_at.timestamp()),
+    )
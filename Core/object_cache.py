@@ -0,0 +1,253 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from django.db.models.fields.files import FieldFile
+from django.db.models.signals import post_save, post_delete
+from rest_framework import serializers
+from .profiling import record_cache
+
+# Моделі-довідники, які можна читати через кеш (інвалідація через сигнали нижче),
+# і поля, що потрапляють у кеш. Кешується тільки ця проєкція (без пароля та службових полів);
+# решта полів у закешованому об'єкті відкладені і читаються з БД при зверненні
+CACHED_MODELS = {
+    'users.customuser': ('id', 'email', 'first_name', 'last_name', 'avatar', 'avatar_variants'),
+    'projects.project': ('id', 'key', 'name', 'owner'),
+    'planning.sprint': ('id', 'project', 'name', 'status', 'start_date', 'end_date'),
+}
+
+KEY_PREFIX = 'objcache'
+
+
+class LocalLRUCache:
+    """
+    Перший рівень: LRU-кеш у пам'яті процесу з TTL.
+    Не синхронізується між процесами, тому TTL має бути коротким.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class ObjectCache:
+    """
+    Дворівневий read-through кеш об'єктів за (модель, pk):
+    1. LRU у пам'яті процесу (без мережевих запитів).
+    2. Redis (спільний для всіх процесів) з версіонованими ключами.
+    3. База даних (один запит in_bulk на всі промахи).
+
+    Інвалідація збільшує версію об'єкта, тому старі ключі в Redis просто перестають читатися.
+    Обидва рівні зберігають значення полів проєкції, а не самі інстанси: кожен виклик
+    отримує новий об'єкт, і зміни в одному запиті не потрапляють у кеш.
+    """
+
+    def __init__(self, local_maxsize, local_ttl, shared_ttl):
+        self.local = LocalLRUCache(local_maxsize, local_ttl)
+        self.shared_ttl = shared_ttl
+
+    @staticmethod
+    def _label(model):
+        label = model._meta.label_lower
+        if label not in CACHED_MODELS:
+            raise ValueError(f"Модель {label} не зареєстрована в CACHED_MODELS.")
+        return label
+
+    @staticmethod
+    def _attnames(model):
+        """attname полів проєкції в порядку полів моделі (як їх очікує Model.from_db)."""
+        names = CACHED_MODELS[model._meta.label_lower]
+        return [field.attname for field in model._meta.concrete_fields if field.name in names]
+
+    def _project(self, model, obj):
+        # FieldFile прив'язаний до інстанса — кешується тільки його шлях
+        return tuple(
+            value.name if isinstance(value, FieldFile) else value
+            for value in (getattr(obj, attname) for attname in self._attnames(model))
+        )
+
+    def _build(self, model, values):
+        # Копія: змінювані значення (JSON-словники) не спільні між викликами
+        return model.from_db(router.db_for_read(model), self._attnames(model), copy.deepcopy(values))
+
+    @staticmethod
+    def _version_key(label, pk):
+        return f"{KEY_PREFIX}:ver:{label}:{pk}"
+
+    @staticmethod
+    def _object_key(label, pk, version):
+        return f"{KEY_PREFIX}:obj:{label}:{pk}:{version}"
+
+    def get(self, model, pk):
+        """Повертає об'єкт за pk або None, якщо його не існує."""
+        if pk is None:
+            return None
+        return self.get_many(model, [pk]).get(pk)
+
+    def get_many(self, model, pks):
+        """Повертає словник {pk: об'єкт} для всіх знайдених pk (пакетне читання)."""
+        label = self._label(model)
+        result = {}
+
+        # 1. Кеш процесу
+        missing = []
+        for pk in {pk for pk in pks if pk is not None}:
+            values = self.local.get((label, pk))
+            if values is not None:
+                result[pk] = values
+            else:
+                missing.append(pk)
+        record_cache(hits=len(result))
+
+        if missing:
+            # 2. Redis: спочатку версії, потім самі об'єкти (два пакетні запити)
+            version_keys = {pk: self._version_key(label, pk) for pk in missing}
+            stored_versions = cache.get_many(version_keys.values())
+            object_keys = {
+                pk: self._object_key(label, pk, stored_versions.get(version_keys[pk], 0))
+                for pk in missing
+            }
+            stored_objects = cache.get_many(object_keys.values())
+
+            not_in_redis = []
+            for pk in missing:
+                values = stored_objects.get(object_keys[pk])
+                if values is None:
+                    not_in_redis.append(pk)
+                else:
+                    self.local.set((label, pk), values)
+                    result[pk] = values
+
+            record_cache(hits=len(missing) - len(not_in_redis), misses=len(not_in_redis))
+
+            # 3. База даних
+            if not_in_redis:
+                fetched = model._default_manager.only(*CACHED_MODELS[label]).in_bulk(not_in_redis)
+                projected = {pk: self._project(model, obj) for pk, obj in fetched.items()}
+                cache.set_many({object_keys[pk]: values for pk, values in projected.items()}, self.shared_ttl)
+                for pk, values in projected.items():
+                    self.local.set((label, pk), values)
+                    result[pk] = values
+
+        return {pk: self._build(model, values) for pk, values in result.items()}
+
+    def invalidate(self, model, pk):
+        label = self._label(model)
+        self.local.delete((label, pk))
+
+        version_key = self._version_key(label, pk)
+        if not cache.add(version_key, 1, timeout=None):
+            cache.incr(version_key)
+
+    def invalidate_many(self, model, pks):
+        """
+        Інвалідація після QuerySet.update()/bulk_update(): вони не шлють post_save,
+        тому код, що масово змінює закешовані моделі, викликає її явно (одразу і після коміту).
+        """
+        pks = [pk for pk in set(pks) if pk is not None]
+        for pk in pks:
+            self.invalidate(model, pk)
+        transaction.on_commit(lambda: [self.invalidate(model, pk) for pk in pks])
+
+    def clear_local(self):
+        self.local.clear()
+
+
+object_cache = ObjectCache(
+    local_maxsize=settings.OBJECT_CACHE_LOCAL_MAXSIZE,
+    local_ttl=settings.OBJECT_CACHE_LOCAL_TTL,
+    shared_ttl=settings.OBJECT_CACHE_SHARED_TTL,
+)
+
+
+def attach_cached(instances, *field_names):
+    """
+    Підставляє пов'язані FK-об'єкти з кешу в список інстансів,
+    щоб звернення instance.<field_name> не робило окремого запиту в БД.
+    Поля з однаковою моделлю (assignee, reporter) читаються одним пакетом.
+    Відкладені (only()/defer()) зв'язки пропускаються — серіалізатор їх не читає.
+    """
+    if not instances:
+        return
+
+    deferred = instances[0].get_deferred_fields()
+    fields_by_model = {}
+    for field_name in field_names:
+        field = instances[0]._meta.get_field(field_name)
+        if field.attname in deferred:
+            continue
+        fields_by_model.setdefault(field.related_model, []).append(field)
+
+    for related_model, fields in fields_by_model.items():
+        pks = [getattr(instance, field.attname) for instance in instances for field in fields]
+        related = object_cache.get_many(related_model, pks)
+
+        for field in fields:
+            for instance in instances:
+                related_id = getattr(instance, field.attname)
+                if related_id is None:
+                    field.set_cached_value(instance, None)
+                elif related_id in related:
+                    field.set_cached_value(instance, related[related_id])
+
+
+class CachedRelationsListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer, який перед серіалізацією сторінки підтягує FK-об'єкти,
+    перелічені в Meta.cached_relations дочірнього серіалізатора, одним пакетом з кешу.
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        attach_cached(items, *getattr(self.child.Meta, 'cached_relations', []))
+        return super().to_representation(items)
+
+
+# --- ІНВАЛІДАЦІЯ ЧЕРЕЗ СИГНАЛИ ---
+
+def _invalidate_cached_object(sender, instance, **kwargs):
+    if sender._meta.label_lower not in CACHED_MODELS:
+        return
+
+    # pk запам'ятовується одразу: після delete() Django обнуляє його в інстансі
+    pk = instance.pk
+    # Інвалідує одразу (для поточного процесу) і повторно після коміту,
+    # щоб паралельний читач не залишив у кеші ще не закомічений стан
+    object_cache.invalidate(sender, pk)
+    transaction.on_commit(lambda: object_cache.invalidate(sender, pk))
+
+
+post_save.connect(_invalidate_cached_object, dispatch_uid='object_cache_post_save')
+post_delete.connect(_invalidate_cached_object, dispatch_uid='object_cache_post_delete')
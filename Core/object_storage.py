@@ -0,0 +1,266 @@
+import base64
+import hashlib
+import hmac
+import os
+import shutil
+from datetime import datetime, timedelta, timezone as dt_timezone
+from tempfile import SpooledTemporaryFile
+from urllib.error import HTTPError
+from urllib.parse import quote, urlsplit
+from urllib.request import Request, urlopen
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, Storage
+from .files import guess_mime_type
+
+SIGNING_ALGORITHM = 'AWS4-HMAC-SHA256'
+UNSIGNED_PAYLOAD = 'UNSIGNED-PAYLOAD'
+AMZ_DATE_FORMAT = '%Y%m%dT%H%M%SZ'
+CHECKSUM_HEADER = 'x-amz-checksum-sha256'
+COPY_SOURCE_HEADER = 'x-amz-copy-source'
+# Заголовок Cache-Control, який сховище підставить у відповідь на підписаний GET
+CACHE_CONTROL_PARAM = 'response-cache-control'
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+REQUEST_TIMEOUT = 30
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+# --- ПІДПИС URL (S3 Signature V4, query string) ---
+# Реалізація без boto: той самий алгоритм підписують S3, MinIO і локальна заглушка
+# (Core/views.py LocalObjectStorageView), тому клієнт працює з будь-яким із них однаково.
+
+def _config():
+    config = settings.OBJECT_STORAGE
+    return {**config, 'SECRET_KEY': config.get('SECRET_KEY') or settings.SECRET_KEY}
+
+
+def _hmac(key, message):
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def _signing_key(secret_key, datestamp, region):
+    key = _hmac(f"AWS4{secret_key}".encode(), datestamp)
+    key = _hmac(key, region)
+    key = _hmac(key, 's3')
+    return _hmac(key, 'aws4_request')
+
+
+def _canonical_query(params):
+    return '&'.join(
+        f"{quote(name, safe='~')}={quote(value, safe='~')}" for name, value in sorted(params.items())
+    )
+
+
+def _signature(config, method, path, params, headers):
+    """Підпис канонічного запиту; headers — {назва в нижньому регістрі: значення}, включно з host."""
+    amz_date = params['X-Amz-Date']
+    scope = f"{amz_date[:8]}/{config['REGION']}/s3/aws4_request"
+    canonical_request = '\n'.join([
+        method,
+        quote(path, safe='/~'),
+        _canonical_query(params),
+        ''.join(f"{name}:{headers[name].strip()}\n" for name in sorted(headers)),
+        ';'.join(sorted(headers)),
+        UNSIGNED_PAYLOAD,
+    ])
+    string_to_sign = '\n'.join([
+        SIGNING_ALGORITHM, amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest()
+    ])
+    key = _signing_key(config['SECRET_KEY'], amz_date[:8], config['REGION'])
+    return hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+
+def object_path(key, config=None):
+    """Шлях об'єкта в path-style адресації: /<префікс ендпоінта>/<bucket>/<key>."""
+    config = config or _config()
+    prefix = urlsplit(config['ENDPOINT_URL']).path.rstrip('/')
+    return f"{prefix}/{config['BUCKET']}/{key}"
+
+
+def presign(method, key, expires=None, headers=None, now=None, query=None):
+    """
+    Тимчасовий URL для прямого доступу клієнта до об'єкта (GET або PUT).
+    headers — заголовки, які клієнт зобов'язаний надіслати без змін (входять у підпис);
+    query — додаткові параметри URL (теж підписуються), напр. response-cache-control.
+    """
+    config = _config()
+    endpoint = urlsplit(config['ENDPOINT_URL'])
+    now = now or datetime.now(dt_timezone.utc)
+    expires = expires or config['URL_EXPIRES']
+    amz_date = now.strftime(AMZ_DATE_FORMAT)
+
+    signed_headers = {'host': endpoint.netloc, **{name.lower(): value for name, value in (headers or {}).items()}}
+    params = {
+        'X-Amz-Algorithm': SIGNING_ALGORITHM,
+        'X-Amz-Credential': f"{config['ACCESS_KEY']}/{amz_date[:8]}/{config['REGION']}/s3/aws4_request",
+        'X-Amz-Date': amz_date,
+        'X-Amz-Expires': str(expires),
+        'X-Amz-SignedHeaders': ';'.join(sorted(signed_headers)),
+        **(query or {}),
+    }
+    path = object_path(key, config)
+    params['X-Amz-Signature'] = _signature(config, method, path, params, signed_headers)
+    return f"{endpoint.scheme}://{endpoint.netloc}{quote(path, safe='/~')}?{_canonical_query(params)}"
+
+
+def is_immutable(key):
+    """Вміст за ключем ніколи не змінюється (ключ адресований хешем вмісту)."""
+    return key.startswith(tuple(settings.OBJECT_STORAGE['IMMUTABLE_PREFIXES']))
+
+
+def cache_control(key):
+    """Cache-Control для відповіді з об'єктом: незмінні об'єкти кешуються на рік."""
+    if is_immutable(key):
+        return f"private, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    return f"private, max-age={settings.OBJECT_STORAGE['URL_EXPIRES']}"
+
+
+def presign_download(key):
+    """
+    GET-URL, стабільний у межах вікна URL_CACHE_SECONDS: мітка часу округлюється вниз,
+    тому браузер і CDN кешують файл за однаковим URL, а строк дії не менший за URL_EXPIRES.
+    Для незмінних об'єктів вікно довше (IMMUTABLE_URL_CACHE_SECONDS).
+    Cache-Control підписується в URL (response-cache-control), тож S3/MinIO віддають
+    той самий заголовок, що й локальна заглушка, незалежно від метаданих об'єкта.
+    """
+    config = _config()
+    window = config['IMMUTABLE_URL_CACHE_SECONDS'] if is_immutable(key) else config['URL_CACHE_SECONDS']
+    timestamp = int(datetime.now(dt_timezone.utc).timestamp()) // window * window
+    return presign('GET', key, expires=config['URL_EXPIRES'] + window,
+                   now=datetime.fromtimestamp(timestamp, dt_timezone.utc),
+                   query={CACHE_CONTROL_PARAM: cache_control(key)})
+
+
+def presign_upload(key, sha256, content_type):
+    """
+    PUT-URL для прямого завантаження. Хеш входить у підпис (x-amz-checksum-sha256):
+    сховище саме відхилить вміст, що не відповідає заявленому SHA-256.
+    """
+    headers = {
+        CHECKSUM_HEADER: base64.b64encode(bytes.fromhex(sha256)).decode(),
+        'content-type': content_type,
+    }
+    return presign('PUT', key, headers=headers), headers
+
+
+def verify_presigned(request, key):
+    """Перевіряє підпис і строк дії запиту до локальної заглушки сховища."""
+    config = _config()
+    # Як і в S3, підписані всі параметри URL, крім самого підпису
+    params = {name: value for name, value in request.GET.items() if name != 'X-Amz-Signature'}
+    for name in ('X-Amz-Algorithm', 'X-Amz-Credential', 'X-Amz-Date', 'X-Amz-Expires', 'X-Amz-SignedHeaders'):
+        params.setdefault(name, '')
+    if params['X-Amz-Algorithm'] != SIGNING_ALGORITHM:
+        return False
+    try:
+        signed_at = datetime.strptime(params['X-Amz-Date'], AMZ_DATE_FORMAT).replace(tzinfo=dt_timezone.utc)
+        expires_at = signed_at + timedelta(seconds=int(params['X-Amz-Expires']))
+    except ValueError:
+        return False
+    if expires_at < datetime.now(dt_timezone.utc):
+        return False
+
+    headers = {}
+    for name in params['X-Amz-SignedHeaders'].split(';'):
+        value = request.get_host() if name == 'host' else request.headers.get(name)
+        if value is None:
+            return False
+        headers[name] = value
+
+    expected = _signature(config, request.method, object_path(key, config), params, headers)
+    return hmac.compare_digest(expected, request.GET.get('X-Amz-Signature', ''))
+
+
+class PresignedStorage(FileSystemStorage):
+    """
+    Локальне сховище, яке віддає файли через підписані URL (як S3 з querystring auth).
+    У продакшені замінюється на S3Storage з тим самим bucket — ключі об'єктів
+    збігаються з іменами файлів, тому presign_upload і finalize працюють без змін.
+    """
+
+    def url(self, name):
+        return presign_download(name)
+
+    def move(self, old_name, new_name):
+        """Переносить об'єкт на інший ключ (існуючий об'єкт за new_name замінюється); повертає new_name."""
+        target = self.path(new_name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(self.path(old_name), target)
+        return new_name
+
+
+class S3Storage(Storage):
+    """
+    Default storage для S3/MinIO (обирається, коли задано OBJECT_STORAGE_ENDPOINT_URL).
+    Кожна операція — запит за URL, підписаним presign(), тому SDK не потрібен.
+    Локального шляху немає: path() кидає NotImplementedError, і захищена віддача
+    та GC медіа переходять на свої гілки для віддаленого сховища.
+    """
+
+    def _request(self, method, name, data=None, headers=None, unsigned_headers=None):
+        headers = headers or {}
+        request = Request(presign(method, name, expires=REQUEST_TIMEOUT * 2, headers=headers),
+                          data=data, method=method, headers={**headers, **(unsigned_headers or {})})
+        try:
+            return urlopen(request, timeout=REQUEST_TIMEOUT)
+        except HTTPError as error:
+            if error.code == 404:
+                raise FileNotFoundError(name) from error
+            raise
+
+    def _open(self, name, mode='rb'):
+        buffer = SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+        with self._request('GET', name) as response:
+            shutil.copyfileobj(response, buffer, STREAM_BUFFER_SIZE)
+        buffer.seek(0)
+        return File(buffer, name=name)
+
+    def _save(self, name, content):
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        headers = {
+            'content-type': guess_mime_type(name, getattr(content, 'content_type', None)),
+            'cache-control': cache_control(name),
+        }
+        # Тіло передається потоком з файлу, тому довжину задаємо явно
+        with self._request('PUT', name, data=content, headers=headers,
+                           unsigned_headers={'Content-Length': str(content.size)}):
+            pass
+        return name
+
+    def _head(self, name):
+        with self._request('HEAD', name) as response:
+            return response.headers
+
+    def exists(self, name):
+        try:
+            self._head(name)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def size(self, name):
+        return int(self._head(name)['Content-Length'])
+
+    def delete(self, name):
+        try:
+            with self._request('DELETE', name):
+                pass
+        except FileNotFoundError:
+            pass
+
+    def url(self, name):
+        return presign_download(name)
+
+    def move(self, old_name, new_name):
+        """Серверна копія (x-amz-copy-source) на новий ключ і видалення старого; повертає new_name."""
+        headers = {
+            COPY_SOURCE_HEADER: quote(f"/{_config()['BUCKET']}/{old_name}", safe='/~'),
+            'content-type': guess_mime_type(new_name),
+            'cache-control': cache_control(new_name),
+            'x-amz-metadata-directive': 'REPLACE',
+        }
+        with self._request('PUT', new_name, data=b'', headers=headers):
+            pass
+        self.delete(old_name)
+        return new_name
@@ -0,0 +1,255 @@
+import logging
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+from .counters import incr_counters
+
+logger = logging.getLogger(__name__)
+
+PROFILING_KEY_PREFIX = 'profiling'
+PROFILING_FIELDS = ['requests', 'sql_count', 'sql_ms', 'serializer_ms', 'total_ms',
+                    'cache_hits', 'cache_misses', 'budget_exceeded']
+
+# Профіль поточного запиту (None, якщо профілювання вимкнене або це не HTTP-запит)
+_current_profile = ContextVar('request_profile', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Ендпоінт виконав більше SQL-запитів, ніж дозволяє QUERY_BUDGETS (strict-режим)."""
+
+
+class RequestProfile:
+    """Лічильники одного HTTP-запиту."""
+
+    def __init__(self):
+        self.tag = None
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.serializer_ms = 0.0
+        self.total_ms = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._in_serializer = False
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_count += 1
+            self.sql_ms += (time.perf_counter() - start) * 1000
+
+
+def record_cache(hits=0, misses=0):
+    """Хук для шарів кешу (object_cache, workload, membership): рахує влучання і промахи."""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.cache_hits += hits
+        profile.cache_misses += misses
+
+
+# --- ЧАС СЕРІАЛІЗАЦІЇ (DRF) ---
+
+_original_serializer_data = BaseSerializer.data
+
+
+def _timed_serializer_data(self):
+    profile = _current_profile.get()
+    # Вкладені серіалізатори не викликають .data, але ListSerializer -> Serializer може
+    if profile is None or profile._in_serializer:
+        return _original_serializer_data.fget(self)
+
+    profile._in_serializer = True
+    start = time.perf_counter()
+    try:
+        return _original_serializer_data.fget(self)
+    finally:
+        profile.serializer_ms += (time.perf_counter() - start) * 1000
+        profile._in_serializer = False
+
+
+def install_serializer_timing():
+    BaseSerializer.data = property(_timed_serializer_data)
+
+
+# --- АГРЕГАЦІЯ (ковзні вікна в кеші) ---
+
+def view_tag(view_func, method):
+    """Назва ендпоінта для метрик: 'TaskViewSet.list', 'CeleryMetricsView.get'."""
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return None
+    action = (getattr(view_func, 'actions', None) or {}).get(method.lower(), method.lower())
+    return f"{view_class.__name__}.{action}"
+
+
+def _window():
+    return int(time.time() // settings.PROFILING_WINDOW_SECONDS)
+
+
+def _key(window, tag, field):
+    return f"{PROFILING_KEY_PREFIX}:{window}:{tag}:{field}"
+
+
+def _latency_field(total_ms):
+    for bound in settings.PROFILING_LATENCY_BUCKETS_MS:
+        if total_ms <= bound:
+            return f"le_{bound}"
+    return "le_inf"
+
+
+def _latency_fields():
+    return [f"le_{bound}" for bound in settings.PROFILING_LATENCY_BUCKETS_MS] + ["le_inf"]
+
+
+def _register_tag(tag):
+    """
+    Реєструє тег ендпоінта один раз. cache.add атомарний: тільки перший процес отримує
+    для тегу номер слота (атомарний incr), тому паралельні запити не затирають теги один одного.
+    """
+    if cache.add(f"{PROFILING_KEY_PREFIX}:tag:{tag}", True, timeout=None):
+        cache.add(f"{PROFILING_KEY_PREFIX}:tags:count", 0, timeout=None)
+        index = cache.incr(f"{PROFILING_KEY_PREFIX}:tags:count")
+        cache.set(f"{PROFILING_KEY_PREFIX}:tags:{index}", tag, timeout=None)
+
+
+def _registered_tags():
+    count = cache.get(f"{PROFILING_KEY_PREFIX}:tags:count", 0)
+    slots = cache.get_many([f"{PROFILING_KEY_PREFIX}:tags:{index}" for index in range(1, count + 1)])
+    return sorted(set(slots.values()))
+
+
+def record_profile(profile, budget_exceeded):
+    window = _window()
+    # Вікно живе стільки, скільки охоплює ковзний діапазон
+    ttl = settings.PROFILING_WINDOW_SECONDS * (settings.PROFILING_WINDOWS + 1)
+
+    # Лічильники запиту накопичені в пам'яті (RequestProfile) і записуються одним пакетом
+    values = {
+        'requests': 1,
+        'sql_count': profile.sql_count,
+        'sql_ms': int(profile.sql_ms),
+        'serializer_ms': int(profile.serializer_ms),
+        'total_ms': int(profile.total_ms),
+        'cache_hits': profile.cache_hits,
+        'cache_misses': profile.cache_misses,
+        'budget_exceeded': int(budget_exceeded),
+        _latency_field(profile.total_ms): 1,
+    }
+    incr_counters({_key(window, profile.tag, field): value for field, value in values.items()}, timeout=ttl)
+
+    _register_tag(profile.tag)
+
+
+def _percentile_from_histogram(histogram, total, fraction):
+    """Верхня межа бакета, в який потрапляє перцентиль (оцінка з гістограми)."""
+    threshold = total * fraction
+    cumulative = 0
+    for field in _latency_fields():
+        cumulative += histogram[field]
+        if cumulative >= threshold:
+            return field[3:]
+    return 'inf'
+
+
+def collect_profiles():
+    """
+    Зведені метрики ендпоінтів за останні PROFILING_WINDOWS вікон:
+    середні значення на запит, частка влучань у кеш і гістограма латентності.
+    """
+    tags = _registered_tags()
+    current = _window()
+    windows = range(current - settings.PROFILING_WINDOWS + 1, current + 1)
+    fields = PROFILING_FIELDS + _latency_fields()
+
+    keys = [_key(window, tag, field) for tag in tags for window in windows for field in fields]
+    values = cache.get_many(keys)
+
+    result = {}
+    for tag in tags:
+        totals = {
+            field: sum(values.get(_key(window, tag, field), 0) for window in windows)
+            for field in fields
+        }
+        requests = totals['requests']
+        if not requests:
+            continue
+
+        cache_lookups = totals['cache_hits'] + totals['cache_misses']
+        histogram = {field: totals[field] for field in _latency_fields()}
+        result[tag] = {
+            'requests': requests,
+            'avg_sql_count': round(totals['sql_count'] / requests, 2),
+            'avg_sql_ms': round(totals['sql_ms'] / requests, 1),
+            'avg_serializer_ms': round(totals['serializer_ms'] / requests, 1),
+            'avg_total_ms': round(totals['total_ms'] / requests, 1),
+            'cache_hit_rate': round(totals['cache_hits'] / cache_lookups, 4) if cache_lookups else None,
+            'query_budget': settings.QUERY_BUDGETS.get(tag),
+            'budget_exceeded': totals['budget_exceeded'],
+            'latency_histogram_ms': histogram,
+            'p50_ms': _percentile_from_histogram(histogram, requests, 0.5),
+            'p95_ms': _percentile_from_histogram(histogram, requests, 0.95),
+        }
+    return {
+        'window_seconds': settings.PROFILING_WINDOW_SECONDS * settings.PROFILING_WINDOWS,
+        'endpoints': result,
+    }
+
+
+# --- MIDDLEWARE ---
+
+class ProfilingMiddleware:
+    """
+    Opt-in профілювання API (PROFILING_ENABLED).
+    Для кожного запиту до DRF-view рахує SQL (кількість і час), час серіалізації,
+    влучання в кеш і загальну латентність; перевіряє бюджет запитів ендпоінта.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        install_serializer_timing()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.sql_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        profile.total_ms = (time.perf_counter() - start) * 1000
+
+        if profile.tag is None:
+            return response
+
+        response['Server-Timing'] = (
+            f'db;dur={profile.sql_ms:.1f};desc="{profile.sql_count} queries", '
+            f'serializer;dur={profile.serializer_ms:.1f}, total;dur={profile.total_ms:.1f}'
+        )
+
+        budget = settings.QUERY_BUDGETS.get(profile.tag)
+        budget_exceeded = budget is not None and profile.sql_count > budget
+        record_profile(profile, budget_exceeded)
+
+        if budget_exceeded:
+            message = f"{profile.tag}: {profile.sql_count} SQL-запитів при бюджеті {budget} ({request.path})"
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.tag = view_tag(view_func, request.method)
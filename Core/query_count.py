@@ -0,0 +1,94 @@
+from pathlib import Path
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse, URLPattern, URLResolver
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from .object_cache import object_cache
+
+ALLOWLIST_PATH = Path(__file__).resolve().parent / 'query_count_allowlist.txt'
+
+
+def discover_viewset_routes(patterns=None):
+    """
+    Обходить усі URL-и проєкту і повертає GET-маршрути, зареєстровані роутерами DRF:
+    [{'name': 'task-list', 'view': TaskViewSet, 'action': 'list', 'detail': False}, ...]
+    Маршрути з суфіксом формату (.json) пропускаються — вони дублюють основні.
+    """
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+
+    routes = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            routes.extend(discover_viewset_routes(pattern.url_patterns))
+            continue
+        if not isinstance(pattern, URLPattern) or not pattern.name:
+            continue
+
+        callback = pattern.callback
+        actions = getattr(callback, 'actions', None)
+        kwargs = set(pattern.pattern.regex.groupindex)
+        if not actions or 'get' not in actions or 'format' in kwargs:
+            continue
+
+        routes.append({
+            'name': pattern.name,
+            'view': callback.cls,
+            'initkwargs': callback.initkwargs,
+            'action': actions['get'],
+            'detail': 'pk' in kwargs,
+        })
+
+    unique = {route['name']: route for route in routes}
+    return sorted(unique.values(), key=lambda route: route['name'])
+
+
+def first_visible_pk(route, user):
+    """Перший об'єкт, який юзер бачить через get_queryset() цього viewset."""
+    view = route['view'](**route['initkwargs'])
+    view.action = route['action']
+    view.kwargs = {}
+    view.format_kwarg = None
+    view.request = Request(APIRequestFactory().get('/'))
+    view.request.user = user
+
+    queryset = view.get_queryset()
+    return queryset.order_by('pk').values_list('pk', flat=True).first()
+
+
+def route_url(route, user):
+    if not route['detail']:
+        return reverse(route['name'])
+    pk = first_visible_pk(route, user)
+    return reverse(route['name'], kwargs={'pk': pk}) if pk is not None else None
+
+
+def count_queries(url, user):
+    """
+    Кількість SQL-запитів одного GET-виклику з "прогрітим" кешем
+    (перший виклик заповнює кеші, вимірюється другий).
+    """
+    cache.clear()
+    object_cache.clear_local()
+
+    client = APIClient(SERVER_NAME='localhost')
+    client.force_authenticate(user=user)
+    client.get(url)
+
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    return response.status_code, len(captured.captured_queries)
+
+
+def load_allowlist(path=ALLOWLIST_PATH):
+    """Назви маршрутів, яким дозволено рости з кількістю рядків (коментарі після #)."""
+    if not path.exists():
+        return set()
+    names = set()
+    for line in path.read_text(encoding='utf-8').splitlines():
+        name = line.split('#', 1)[0].strip()
+        if name:
+            names.add(name)
+    return names
@@ -1,8 +1,11 @@
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
+from django.core.exceptions import ImproperlyConfigured
 
 from celery.schedules import crontab
+from kombu import Queue
 from datetime import timedelta
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -36,6 +39,8 @@ INSTALLED_APPS = [
     'planning',
     'analytics' ,
     'notifications',
+    'sync',
+    'uploads',
     'rest_framework',
     'drf_spectacular',
     'django_celery_beat',
@@ -51,6 +56,60 @@ CELERY_RESULT_BACKEND = 'redis://127.0.0.1:6379/0'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
+
+# --- CELERY QUEUES & ROUTING ---
+# Окремі черги, щоб сплеск листів не блокував In-App сповіщення та періодичні задачі.
+# Кожна черга обслуговується окремим воркером зі своєю конкурентністю:
+#   celery -A Core worker -Q in_app,default -c 4 -n in_app@%h
+#   celery -A Core worker -Q email -c 2 -n email@%h
+#   celery -A Core worker -Q analytics -c 2 -n analytics@%h
+#   celery -A Core worker -Q maintenance -c 1 -n maintenance@%h
+#   celery -A Core worker -Q media -c 2 -n media@%h
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_DEFAULT_ROUTING_KEY = 'default'
+CELERY_TASK_QUEUES = (
+    Queue('default', routing_key='default'),
+    Queue('in_app', routing_key='in_app'),
+    Queue('email', routing_key='email'),
+    Queue('analytics', routing_key='analytics'),
+    Queue('maintenance', routing_key='maintenance'),
+    Queue('media', routing_key='media'),
+)
+CELERY_TASK_ROUTES = {
+    'notifications.tasks.send_email_async': {'queue': 'email'},
+    'notifications.tasks.create_notification_async': {'queue': 'in_app'},
+    'notifications.tasks.create_notifications_batch_async': {'queue': 'in_app'},
+    'notifications.tasks.cleanup_notifications_periodic': {'queue': 'maintenance'},
+    'tasks.tasks.check_deadlines_periodic': {'queue': 'maintenance'},
+    'sync.tasks.prune_change_log_periodic': {'queue': 'maintenance'},
+    'uploads.tasks.cleanup_upload_sessions_periodic': {'queue': 'maintenance'},
+    'uploads.tasks.collect_media_garbage_periodic': {'queue': 'maintenance'},
+    'analytics.tasks.*': {'queue': 'analytics'},
+    'users.tasks.generate_avatar_variants_async': {'queue': 'media'},
+}
+
+# Підтвердження після виконання: задача не загубиться, якщо воркер впаде
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+# Воркер бере по одній задачі, щоб довгі задачі не тримали чергу за собою
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# Для Redis: час, після якого непідтверджена задача повертається в чергу (має бути > time limit)
+CELERY_BROKER_TRANSPORT_OPTIONS = {'visibility_timeout': 3600}
+
+# Ліміти часу виконання (секунди)
+CELERY_TASK_SOFT_TIME_LIMIT = 240
+CELERY_TASK_TIME_LIMIT = 300
+
+# Ліміти швидкості та часу для окремих задач
+CELERY_TASK_ANNOTATIONS = {
+    'notifications.tasks.send_email_async': {'rate_limit': '60/m', 'soft_time_limit': 30, 'time_limit': 60},
+    'notifications.tasks.create_notification_async': {'rate_limit': '100/s'},
+    'notifications.tasks.create_notifications_batch_async': {'rate_limit': '100/s'},
+}
+# Метрики задач (/api/v1/ops/celery/) рахуються у хвилинних вікнах з TTL:
+# ендпоінт показує ковзні показники за останні TASK_METRICS_WINDOWS вікон, а не за весь час
+TASK_METRICS_WINDOW_SECONDS = 60
+TASK_METRICS_WINDOWS = 15
 # Часовий пояс для Django
 TIME_ZONE = 'Europe/Kyiv'
 CELERY_TIMEZONE = 'Europe/Kyiv'
@@ -67,7 +126,53 @@ CACHES = {
     }
 }
 
+# --- OBJECT CACHE (users / projects / sprints) ---
+# Перший рівень живе в пам'яті процесу і не синхронізується між воркерами,
+# тому його TTL короткий; другий рівень (Redis) інвалідується сигналами моделей.
+OBJECT_CACHE_LOCAL_MAXSIZE = 2048
+OBJECT_CACHE_LOCAL_TTL = 30  # секунд
+OBJECT_CACHE_SHARED_TTL = 600  # секунд
+
+# --- WORKLOAD CACHE ---
+# Кеш навантаження юзера скидається сигналами при зміні задач;
+# TTL обмежує застарілість лічильника прострочених задач (дедлайни минають без змін задачі)
+WORKLOAD_CACHE_TTL = 300  # секунд
+
+# Карта доступу юзер -> проєкти (скидається сигналами ProjectMember / Project)
+MEMBERSHIP_CACHE_TTL = 600  # секунд
+
+# --- FAST JWT ---
+# Протягом цього часу після видачі токена користувач відновлюється з підписаних claims
+# без запиту в БД; старіші токени (в т.ч. оновлені через refresh) перевіряються в БД.
+# Деактивація користувача відкликає його токени одразу через Redis, зміна ролі чи прав —
+# переводить уже видані токени на перевірку через БД. Запити, що змінюють дані, завжди читають юзера з БД.
+FAST_JWT_TRUST_SECONDS = 15 * 60
+
+# --- PROFILING / QUERY BUDGETS ---
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
+# Middleware профілювання (SQL, серіалізація, кеш, латентність по ендпоінтах).
+# У тестах увімкнене завжди, щоб перевищення бюджетів ловилось як помилка.
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False') == 'True' or TESTING
+PROFILING_WINDOW_SECONDS = 60
+PROFILING_WINDOWS = 15  # Метрики за останні 15 хвилин
+PROFILING_LATENCY_BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500]
+
+# Максимальна кількість SQL-запитів на один виклик ендпоінта ('<View>.<action>').
+# Поза тестами перевищення лише логуються; у тестах — піднімають QueryBudgetExceeded.
+QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', 'False') == 'True' or TESTING
+QUERY_BUDGETS = {
+    'TaskViewSet.list': 4,
+    'TaskViewSet.retrieve': 7,  # 6 + перевірка ETag (умовний GET — лише 1)
+    'ProjectViewSet.list': 6,  # 3 + по запиту на кожен ?expand
+    'SprintViewSet.list': 4,
+    'NotificationViewSet.list': 3,
+    'PortfolioView.get': 3,
+    'WorkloadView.get': 4,
+}
+
 MIDDLEWARE = [
+    'Core.profiling.ProfilingMiddleware',  # Вмикається через PROFILING_ENABLED (має бути першим)
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -153,6 +258,52 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# --- OBJECT STORAGE (S3-сумісне) ---
+# Клієнти завантажують і читають файли напряму за підписаними URL (Core/object_storage.py),
+# Django обробляє тільки керуючі запити. Для S3/MinIO задається OBJECT_STORAGE_ENDPOINT_URL,
+# і default storage стає S3Storage з тим самим bucket (див. STORAGES). Локальна заглушка
+# /storage/ працює тільки в режимі розробки і в тестах; без DEBUG адреса сховища обов'язкова.
+OBJECT_STORAGE_ENDPOINT_URL = os.getenv('OBJECT_STORAGE_ENDPOINT_URL')
+if not OBJECT_STORAGE_ENDPOINT_URL and not (DEBUG or TESTING):
+    raise ImproperlyConfigured("OBJECT_STORAGE_ENDPOINT_URL is required when DEBUG is off.")
+
+OBJECT_STORAGE = {
+    'ENDPOINT_URL': OBJECT_STORAGE_ENDPOINT_URL or 'http://localhost:8000/storage',
+    'BUCKET': os.getenv('OBJECT_STORAGE_BUCKET', 'coreops-media'),
+    'REGION': os.getenv('OBJECT_STORAGE_REGION', 'us-east-1'),
+    'ACCESS_KEY': os.getenv('OBJECT_STORAGE_ACCESS_KEY', 'coreops-local'),
+    # None -> підпис ключем проєкту (SECRET_KEY), достатньо для локальної заглушки
+    'SECRET_KEY': os.getenv('OBJECT_STORAGE_SECRET_KEY'),
+    # Строк дії підписаного URL і вікно, в межах якого GET-URL не змінюється (кешування)
+    'URL_EXPIRES': 3600,
+    'URL_CACHE_SECONDS': 3600,
+    # Об'єкти з незмінним вмістом (ключ містить хеш): довгий кеш і стабільний URL до 6 днів
+    # (для S3 той самий Cache-Control задається через метадані об'єктів бекенду)
+    'IMMUTABLE_PREFIXES': ('blobs/', 'avatars/variants/'),
+    'IMMUTABLE_URL_CACHE_SECONDS': 6 * 24 * 3600,
+    'LOCAL_STANDIN': not OBJECT_STORAGE_ENDPOINT_URL and (DEBUG or TESTING),
+}
+
+# --- AVATARS ---
+# Квадратні варіанти аватара (px), які фонова задача рендерить у WebP і JPEG
+AVATAR_VARIANT_SIZES = {'sm': 48, 'md': 128, 'lg': 256}
+
+# --- PROTECTED MEDIA ---
+# Як віддаються вкладення після перевірки доступу (Core/media_serving.py):
+#   'nginx'  -> X-Accel-Redirect на internal location PROTECTED_MEDIA_PREFIX (alias на MEDIA_ROOT)
+#   'apache' -> X-Sendfile з абсолютним шляхом (mod_xsendfile)
+#   'django' -> FileResponse (sendfile через wsgi.file_wrapper) з підтримкою Range
+PROTECTED_MEDIA_SERVER = os.getenv('PROTECTED_MEDIA_SERVER', 'django')
+PROTECTED_MEDIA_PREFIX = '/protected-media/'
+PROTECTED_MEDIA_MAX_AGE = 3600
+
+STORAGES = {
+    # S3/MinIO, якщо задано ендпоінт; інакше MEDIA_ROOT за локальною заглушкою /storage/
+    'default': {'BACKEND': 'Core.object_storage.S3Storage' if OBJECT_STORAGE_ENDPOINT_URL
+                else 'Core.object_storage.PresignedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -162,7 +313,7 @@ REST_FRAMEWORK = {
     # Вказуємо клас для генерації схеми
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.FastJWTAuthentication',
 
         # (Опціонально) Залишити це якщо треба щоб працювала адмінка через браузер
         'rest_framework.authentication.SessionAuthentication',
@@ -170,10 +321,12 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'Core.pagination.CoreCursorPagination',
     'PAGE_SIZE': 20,
 
+# Ліміти рахуються атомарно в Redis (Core.throttling, ковзне вікно з двох лічильників)
 'DEFAULT_THROTTLE_RATES': {
         'login': '5/min',             # Максимум 5 спроб входу на хвилину з однієї IP
         'register': '3/min',          # Захист від масового створення акаунтів ботами
         'password_reset': '3/min',    # Захист від спаму листами на пошту
+        'tasks': '600/min',           # Per-user ліміт на API задач
     }
 }
 
@@ -205,7 +358,73 @@ CELERY_BEAT_SCHEDULE = {
         # Запускати щодня о 9:00 ранку
         'schedule': crontab(hour=9, minute=0),
     },
+    'cleanup-notifications-nightly': {
+        'task': 'notifications.tasks.cleanup_notifications_periodic',
+        # Обслуговування таблиці сповіщень щоночі о 3:00
+        'schedule': crontab(hour=3, minute=0),
+    },
+    'build-task-flow-facts': {
+        'task': 'analytics.tasks.build_task_flow_facts_periodic',
+        # Інкрементальне оновлення факт-таблиці потоку задач кожні 10 хвилин
+        'schedule': crontab(minute='*/10'),
+    },
+    'prune-sync-change-log-nightly': {
+        'task': 'sync.tasks.prune_change_log_periodic',
+        # Обрізання журналу дельта-синхронізації щоночі о 3:30
+        'schedule': crontab(hour=3, minute=30),
+    },
+    'cleanup-upload-sessions-hourly': {
+        'task': 'uploads.tasks.cleanup_upload_sessions_periodic',
+        # Прибирання покинутих сесій порційного завантаження щогодини
+        'schedule': crontab(minute=15),
+    },
+    'collect-media-garbage-nightly': {
+        'task': 'uploads.tasks.collect_media_garbage_periodic',
+        # Прибирання файлів-сиріт у MEDIA_ROOT щоночі о 4:00 (великі сховища — за кілька ночей)
+        'schedule': crontab(hour=4, minute=0),
+    },
 }
 
+# --- NOTIFICATION RETENTION ---
+# Прочитані сповіщення, старші за цей вік (днів), видаляються нічною задачею
+NOTIFICATION_RETENTION_DAYS = int(os.getenv('NOTIFICATION_RETENTION_DAYS', 90))
+# Розмір пачки для видалення/згортання (щоб не тримати довгих блокувань)
+NOTIFICATION_CLEANUP_BATCH_SIZE = 1000
+
+# --- DELTA SYNC ---
+# Скільки днів зберігається журнал змін (старші курсори отримують reset=true)
+SYNC_LOG_RETENTION_DAYS = int(os.getenv('SYNC_LOG_RETENTION_DAYS', 30))
+SYNC_CLEANUP_BATCH_SIZE = 5000
+# Максимум записів журналу за один запит /sync/ (далі has_more=true)
+SYNC_PAGE_SIZE = 500
+# Записи, молодші за це (сек), віддаються наступним запитом — захист від паралельних комітів.
+# Журнал пишеться всередині транзакції, тому значення має перевищувати найдовшу транзакцію запису
+SYNC_SETTLE_SECONDS = 5
+
+# --- FLOW ANALYTICS ---
+# Події Audit Log, молодші за це (сек), потрапляють у факт-таблицю наступним запуском
+FLOW_FACTS_SETTLE_SECONDS = 60
+
+# --- RESUMABLE UPLOADS ---
+# Тимчасові файли сесій лежать поза MEDIA_ROOT (не віддаються вебсервером)
+UPLOAD_SESSION_DIR = os.getenv('UPLOAD_SESSION_DIR', os.path.join(BASE_DIR, 'upload_sessions'))
+# Рекомендований розмір чанка для клієнта і верхня межа одного PUT (байт)
+UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024
+UPLOAD_MAX_CHUNK_SIZE = 16 * 1024 * 1024
+UPLOAD_MAX_FILE_SIZE = int(os.getenv('UPLOAD_MAX_FILE_SIZE', 2 * 1024 * 1024 * 1024))
+# Незавершені сесії, неактивні довше за це (годин), видаляються разом з тимчасовими файлами
+UPLOAD_SESSION_TTL_HOURS = 24
+
+# --- MEDIA GARBAGE COLLECTION ---
+# Файли без посилань з БД, старші за цей вік (годин), прибираються (свіжі можуть бути ще не закомічені)
+MEDIA_GC_GRACE_HOURS = int(os.getenv('MEDIA_GC_GRACE_HOURS', 24))
+# Розмір пачки при читанні посилань з БД і частота збереження позиції обходу
+MEDIA_GC_BATCH_SIZE = 2000
+# Скільки файлів обходить один нічний запуск; наступний продовжує з того ж місця
+MEDIA_GC_MAX_FILES_PER_RUN = 200_000
+# Нічна задача переносить сиріт у карантин (поза MEDIA_ROOT) замість видалення
+MEDIA_GC_QUARANTINE = os.getenv('MEDIA_GC_QUARANTINE', 'true').lower() == 'true'
+MEDIA_GC_QUARANTINE_DIR = os.getenv('MEDIA_GC_QUARANTINE_DIR', os.path.join(BASE_DIR, 'media_quarantine'))
+
 # Для етапу розробки (MVP) дозволяє запити з будь-яких джерел
 CORS_ALLOW_ALL_ORIGINS = True
\ No newline at end of file
@@ -0,0 +1,142 @@
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import ListSerializer
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def _parse_csv(request, param):
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def parse_expand(request, allowed):
+    """Повертає множину дозволених зв'язків з ?expand=members,milestones."""
+    if request is None:
+        return set()
+    return (_parse_csv(request, EXPAND_PARAM) or set()) & set(allowed)
+
+
+def parse_fields(request):
+    """Множина полів з ?fields=id,title або None, якщо параметр не передано (GET/HEAD)."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    return _parse_csv(request, FIELDS_PARAM)
+
+
+def representation_key(request):
+    """
+    Нормалізований опис вибраного представлення (?fields=/?expand=) або None для повного.
+    Різні представлення одного об'єкта мають різні ETag.
+    """
+    fields = parse_fields(request)
+    expand = _parse_csv(request, EXPAND_PARAM) if request is not None else None
+    if fields is None and not expand:
+        return None
+    return f"fields={','.join(sorted(fields)) if fields is not None else '*'};expand={','.join(sorted(expand or ()))}"
+
+
+class SparseFieldsetMixin:
+    """
+    Міксин серіалізатора: ?fields=id,title лишає у відповіді тільки перелічені поля,
+    ?expand=members додає вкладені поля з Meta.expandable (ім'я -> фабрика поля).
+
+    Діє тільки на кореневий серіалізатор відповіді і тільки для читання,
+    тому валідація вхідних даних (POST/PATCH) не змінюється.
+    Meta.field_sources описує, які атрибути моделі читають поля з source='*'
+    (SerializerMethodField): {'progress': ['total_tasks', 'completed_tasks']}.
+    """
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or not self._is_root():
+            return fields
+
+        expandable = getattr(self.Meta, 'expandable', {})
+        expand = parse_expand(request, expandable)
+        for name in expand:
+            fields[name] = expandable[name]()
+
+        requested = parse_fields(request)
+        if requested is None:
+            return fields
+
+        # Невідомі імена ігноруються; id лишається завжди (ключ для клієнтського кешу)
+        keep = (requested & set(fields)) | expand | {'id'}
+        return {name: field for name, field in fields.items() if name in keep}
+
+    def get_model_sources(self):
+        """Імена атрибутів моделі (поля, зв'язки, анотації), які прочитають вибрані поля."""
+        field_sources = getattr(self.Meta, 'field_sources', {})
+        sources = set()
+        for name, field in self.fields.items():
+            if name in field_sources:
+                sources.update(field_sources[name])
+            elif field.source != '*':
+                sources.add(field.source.split('.')[0])
+        return sources
+
+
+def _lookup_root(lookup):
+    return getattr(lookup, 'prefetch_to', lookup).split(LOOKUP_SEP)[0]
+
+
+class SparseQuerysetMixin:
+    """
+    Міксин viewset-а: звужує queryset під поля, вибрані через ?fields=.
+    Читаються тільки потрібні колонки (only()), а зайві select_related/prefetch_related
+    відкидаються. Анотації view додає умовно через sparse_wants().
+    """
+
+    def get_sparse_sources(self):
+        """None — віддаються всі поля; інакше множина атрибутів моделі для серіалізатора."""
+        if not hasattr(self, '_sparse_sources'):
+            self._sparse_sources = None
+            if parse_fields(self.request) is not None:
+                serializer = self.get_serializer()
+                if isinstance(serializer, SparseFieldsetMixin):
+                    self._sparse_sources = serializer.get_model_sources()
+        return self._sparse_sources
+
+    def sparse_wants(self, *names):
+        sources = self.get_sparse_sources()
+        return sources is None or any(name in sources for name in names)
+
+    def _ordering_roots(self, queryset):
+        # Курсорна пагінація читає поле сортування з останнього об'єкта сторінки
+        paginator = self.paginator
+        if paginator is None or not hasattr(paginator, 'get_ordering'):
+            return set()
+        ordering = paginator.get_ordering(self.request, queryset, self)
+        return {name.lstrip('-').split(LOOKUP_SEP)[0] for name in ordering}
+
+    def narrow_queryset(self, queryset):
+        sources = self.get_sparse_sources()
+        if sources is None:
+            return queryset
+
+        needed = sources | self._ordering_roots(queryset)
+        opts = queryset.model._meta
+        concrete = {field.name for field in opts.concrete_fields}
+
+        select_related = queryset.query.select_related
+        if isinstance(select_related, dict):
+            keep = [name for name in select_related if name in needed]
+            queryset = queryset.select_related(None)
+            if keep:
+                queryset = queryset.select_related(*keep)
+
+        lookups = [lookup for lookup in queryset._prefetch_related_lookups if _lookup_root(lookup) in needed]
+        queryset = queryset.prefetch_related(None).prefetch_related(*lookups)
+
+        return queryset.only(opts.pk.name, *sorted(needed & concrete))
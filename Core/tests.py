@@ -0,0 +1,352 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from django.conf import settings
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from Core.celery import app
+from Core.celery_metrics import collect_metrics
+from Core.counters import incr_counters
+from Core.object_cache import object_cache
+from Core.throttling import ScopedSlidingWindowThrottle
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework import status
+from django.test import override_settings
+from Core.profiling import QueryBudgetExceeded, _register_tag, _registered_tags
+from Core.query_count import discover_viewset_routes, route_url, count_queries, load_allowlist
+from analytics.benchmarks import generate_dataset, project_key
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from planning.models import Sprint
+from tasks.models import Task
+from rest_framework.views import APIView
+from django.core.cache import cache
+from projects.models import Project, ProjectMember
+from notifications.tasks import send_email_async, create_notifications_batch_async
+
+User = get_user_model()
+
+
+class CeleryQueueLoadTests(TestCase):
+    """
+    Навантажувальний тест топології черг на in-memory брокері (без Redis).
+    """
+    EMAIL_BURST = 2000
+    IN_APP_BURST = 200
+
+    def setUp(self):
+        # Вимикає eager-режим, щоб задачі реально публікувались у брокер.
+        # app.conf читає CELERY_-налаштування Django наживо, і ключ з префіксом має пріоритет
+        # над task_always_eager, тому перевизначається саме налаштування Django
+        self.enterContext(override_settings(CELERY_TASK_ALWAYS_EAGER=False))
+
+        self.connection = app.connection_for_write('memory://')
+        # Оголошує черги та їх прив'язки до exchange (як це робить воркер при старті)
+        channel = self.connection.default_channel
+        for queue in app.amqp.queues.values():
+            queue(channel).declare()
+            queue(channel).purge()
+
+    def tearDown(self):
+        self.connection.release()
+
+    def test_email_burst_is_isolated_from_in_app_queue(self):
+        """Сплеск листів іде у власну чергу і не затримує In-App сповіщення"""
+        producer = app.amqp.Producer(self.connection)
+
+        started = time.monotonic()
+        for i in range(self.EMAIL_BURST):
+            send_email_async.apply_async(
+                args=["Subject", f"Body {i}", ["dev@test.com"]], producer=producer, ignore_result=True
+            )
+        for i in range(self.IN_APP_BURST):
+            create_notifications_batch_async.apply_async(args=[[]], producer=producer, ignore_result=True)
+        elapsed = time.monotonic() - started
+
+        queues = collect_metrics(connection=self.connection)['queues']
+
+        self.assertEqual(queues['email'], self.EMAIL_BURST)
+        self.assertEqual(queues['in_app'], self.IN_APP_BURST)
+        self.assertEqual(queues['maintenance'], 0)
+        self.assertEqual(queues['default'], 0)
+        # Публікація не повинна ставати вузьким місцем навіть при тисячах повідомлень
+        self.assertLess(elapsed, 30)
+
+    def test_metrics_endpoint_admin_only(self):
+        """Метрики черг доступні тільки адміністратору"""
+        admin = User.objects.create_superuser(username='admin', email='admin@test.com', password='123')
+        dev = User.objects.create_user(username='dev', email='dev@test.com', password='123')
+
+        self.client.force_login(dev)
+        self.assertEqual(self.client.get('/api/v1/ops/celery/').status_code, 403)
+
+        self.client.force_login(admin)
+        create_notifications_batch_async.apply(args=[[]])
+        response = self.client.get('/api/v1/ops/celery/')
+
+        self.assertEqual(response.status_code, 200)
+        stats = response.json()['tasks']['notifications.tasks.create_notifications_batch_async']
+        self.assertGreaterEqual(stats['succeeded'], 1)
+        self.assertEqual(stats['failure_rate'], 0.0)
+
+    def test_task_stats_cover_only_recent_windows(self):
+        """Виконання старші за ковзний період не потрапляють у метрики"""
+        cache.clear()
+        name = 'notifications.tasks.create_notifications_batch_async'
+        period = settings.TASK_METRICS_WINDOW_SECONDS * settings.TASK_METRICS_WINDOWS
+        with mock.patch('Core.celery_metrics.time.time', return_value=time.time() - period - 60):
+            create_notifications_batch_async.apply(args=[[]])
+        self.assertEqual(collect_metrics(connection=self.connection)['tasks'][name]['succeeded'], 0)
+
+        create_notifications_batch_async.apply(args=[[]])
+        self.assertEqual(collect_metrics(connection=self.connection)['tasks'][name]['succeeded'], 1)
+
+
+class ObjectCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        object_cache.clear_local()
+        self.owner = User.objects.create_user(username='owner', email='owner@test.com', password='123')
+        self.projects = [
+            Project.objects.create(name=f"Project {i}", key=f"OC{i}", owner=self.owner) for i in range(3)
+        ]
+
+    def test_get_many_reads_database_once(self):
+        """Пакетне читання: один запит на промахи, далі — тільки кеш"""
+        pks = [p.pk for p in self.projects]
+
+        with self.assertNumQueries(1):
+            first = object_cache.get_many(Project, pks)
+        with self.assertNumQueries(0):
+            second = object_cache.get_many(Project, pks)
+
+        self.assertEqual(set(first), set(pks))
+        self.assertEqual(second[pks[0]].name, "Project 0")
+
+    def test_save_invalidates_cached_object(self):
+        """Зміна моделі інвалідує обидва рівні кешу"""
+        project = self.projects[0]
+        object_cache.get(Project, project.pk)
+
+        project.name = "Renamed"
+        project.save()
+        object_cache.clear_local()  # Імітує інший процес (без локальної копії)
+
+        self.assertEqual(object_cache.get(Project, project.pk).name, "Renamed")
+
+    def test_caches_projection_without_password(self):
+        """У Redis потрапляють тільки поля проєкції; після update() кеш скидається явно"""
+        object_cache.get(User, self.owner.pk)
+        stored = [value for key, value in cache._cache.items() if ':obj:users.customuser:' in key]
+        self.assertEqual(len(stored), 1)
+        self.assertNotIn(self.owner.password.encode(), stored[0])
+
+        User.objects.filter(pk=self.owner.pk).update(first_name="Olena")
+        object_cache.invalidate_many(User, [self.owner.pk])
+        self.assertEqual(object_cache.get(User, self.owner.pk).get_full_name(), "Olena")
+
+    def test_local_hits_do_not_share_mutable_values(self):
+        """Зміна отриманого об'єкта не псує наступні влучання в кеш процесу"""
+        User.objects.filter(pk=self.owner.pk).update(
+            avatar='avatars/owner.png', avatar_variants={'sm': {'webp': 'avatars/variants/sm.webp'}}
+        )
+        object_cache.invalidate_many(User, [self.owner.pk])
+
+        first = object_cache.get(User, self.owner.pk)
+        first.avatar_variants['sm']['webp'] = 'changed.webp'
+        first.avatar.name = 'changed.png'
+
+        second = object_cache.get(User, self.owner.pk)
+        self.assertEqual(second.avatar_variants, {'sm': {'webp': 'avatars/variants/sm.webp'}})
+        self.assertEqual(second.avatar.name, 'avatars/owner.png')
+
+
+class SlidingWindowThrottleTests(TestCase):
+    """
+    Перевіряє точність атомарного throttle під паралельним навантаженням.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.view = APIView()
+        self.view.throttle_scope = 'login'
+
+    def _allow(self, now):
+        throttle = ScopedSlidingWindowThrottle()
+        throttle.timer = lambda: now
+        request = Request(self.factory.post('/api/v1/users/login/', REMOTE_ADDR='10.0.0.1'))
+        return throttle.allow_request(request, self.view)
+
+    def test_exact_limit_under_parallel_load(self):
+        """50 паралельних спроб входу з однієї IP: пропускає рівно 5 (ліміт login)"""
+        now = 1_000_000.0
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda _: self._allow(now), range(50)))
+
+        self.assertEqual(results.count(True), 5)
+        # Відхилені запити не "з'їдають" вікно: лічильник дорівнює кількості дозволених
+        self.assertEqual(cache.get(f"throttle_login_10.0.0.1:{int(now // 60)}"), 5)
+
+    def test_previous_window_weight_slides_out(self):
+        """Запити попереднього вікна враховуються пропорційно часу, що минув"""
+        window_start = 60 * 20_000.0
+        for _ in range(5):
+            self.assertTrue(self._allow(window_start - 1))
+
+        # Початок нового вікна: попередні 5 запитів ще майже повністю враховуються
+        self.assertFalse(self._allow(window_start + 1))
+        # Пройшло 80% вікна: 5 * 0.2 = 1 -> вільно ще 4 запити
+        allowed = [self._allow(window_start + 48) for _ in range(6)]
+        self.assertEqual(allowed.count(True), 4)
+
+
+class ProfilingMiddlewareTests(APITestCase):
+    """
+    Профілювання API та бюджети SQL-запитів (middleware увімкнене в тестах).
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username='prof_admin', email='prof@test.com', password='123')
+        self.project = Project.objects.create(name="Profiled", key="PRF", owner=self.admin)
+        ProjectMember.objects.create(project=self.project, user=self.admin, role='owner')
+        for i in range(5):
+            sprint = Sprint.objects.create(
+                project=self.project, name=f"Sprint {i}", start_date="2026-03-01", end_date="2026-03-15"
+            )
+            Task.objects.create(project=self.project, title=f"Task {i}", reporter=self.admin, sprint=sprint)
+        self.client.force_authenticate(user=self.admin)
+
+    def test_sprint_list_is_profiled_within_budget(self):
+        """Список спринтів не робить N+1 і з'являється в метриках з тегом View.action"""
+        response = self.client.get('/api/v1/planning/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertEqual(response.data['results'][0]['tasks_total'], 1)
+
+        metrics = self.client.get('/api/v1/ops/profiling/').data['endpoints']
+        sprint_list = metrics['SprintViewSet.list']
+        self.assertEqual(sprint_list['requests'], 1)
+        self.assertLessEqual(sprint_list['avg_sql_count'], sprint_list['query_budget'])
+        self.assertEqual(sum(sprint_list['latency_histogram_ms'].values()), 1)
+
+    def test_request_counters_are_flushed_in_one_batch(self):
+        """Лічильники запиту накопичуються в пам'яті і пишуться в кеш одним викликом"""
+        with mock.patch('Core.profiling.incr_counters', wraps=incr_counters) as flush:
+            self.client.get('/api/v1/planning/')
+        self.assertEqual(flush.call_count, 1)
+        self.assertIn('requests', {key.rsplit(':', 1)[1] for key in flush.call_args.args[0]})
+
+    def test_parallel_tag_registration_keeps_every_tag(self):
+        """Теги з паралельних запитів не затирають один одного"""
+        tags = [f"View{i}.list" for i in range(50)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(_register_tag, tags * 2))
+
+        self.assertEqual(_registered_tags(), sorted(tags))
+
+    def test_budget_overrun_fails_in_strict_mode(self):
+        """Перевищення бюджету в тестах піднімає QueryBudgetExceeded"""
+        with override_settings(QUERY_BUDGETS={'SprintViewSet.list': 0}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/api/v1/planning/')
+
+
+class SparseFieldsetTests(APITestCase):
+    """
+    ?fields= / ?expand=: у відповіді тільки вибрані поля, а SQL читає тільки потрібні колонки.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='sparse', email='sparse@test.com', password='123', first_name='Sparse', last_name='User'
+        )
+        self.project = Project.objects.create(name="Sparse", key="SPR", owner=self.user)
+        ProjectMember.objects.create(project=self.project, user=self.user, role='owner')
+        sprint = Sprint.objects.create(
+            project=self.project, name="Sprint", start_date="2026-03-01", end_date="2026-03-15"
+        )
+        Task.objects.create(
+            project=self.project, title="Task", description="Довгий опис", reporter=self.user,
+            assignee=self.user, sprint=sprint
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _get(self, url):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, ' '.join(query['sql'] for query in captured.captured_queries)
+
+    def test_fields_prune_payload_and_columns(self):
+        response, sql = self._get('/api/v1/tasks/?fields=id,title,status,assignee_name')
+        task = response.data['results'][0]
+        self.assertEqual(set(task), {'id', 'title', 'status', 'assignee_name'})
+        self.assertEqual(task['assignee_name'], 'Sparse User')
+        self.assertNotIn('"description"', sql)
+
+        response, sql = self._get('/api/v1/planning/?fields=id,name')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name'})
+        self.assertNotIn('COUNT(', sql)
+
+        response, sql = self._get('/api/v1/users/?fields=id,full_name')
+        self.assertEqual(response.data['results'][0], {'id': self.user.id, 'full_name': 'Sparse User'})
+        self.assertNotIn('"telegram"', sql)
+
+    def test_expand_survives_field_selection(self):
+        response, sql = self._get('/api/v1/projects/?fields=name,progress&expand=members')
+        project = response.data['results'][0]
+        self.assertEqual(set(project), {'id', 'name', 'progress', 'members'})
+        self.assertEqual(project['members'][0]['user_email'], 'sparse@test.com')
+        self.assertNotIn('"description"', sql)
+
+
+@override_settings(QUERY_BUDGET_STRICT=False)
+class QueryCountRegressionTests(TestCase):
+    """
+    Для кожного GET-маршруту роутерів порівнює кількість SQL-запитів на малому і великому
+    наборі даних: вона не повинна рости разом з кількістю рядків (N+1).
+    Відомі винятки — у Core/query_count_allowlist.txt.
+    """
+    SMALL = dict(users=4, projects=2, members_per_project=3, sprints_per_project=2, tasks_per_project=2,
+                 comments_per_task=1, checklist_per_task=1, history_per_task=1, notifications_per_user=2)
+    LARGE = dict(users=8, projects=4, members_per_project=6, sprints_per_project=4, tasks_per_project=8,
+                 comments_per_task=3, checklist_per_task=3, history_per_task=3, notifications_per_user=6)
+
+    def _measure(self, size):
+        """Сідує набір даних, міряє всі маршрути і відкочує дані (savepoint)."""
+        results = {}
+        with transaction.atomic():
+            generate_dataset(prefix='qcount', **size)
+            user = Project.objects.get(key=project_key('qcount', 0)).owner
+
+            for route in discover_viewset_routes():
+                url = route_url(route, user)
+                if url is not None:
+                    results[route['name']] = count_queries(url, user)
+            transaction.set_rollback(True)
+        return results
+
+    def test_query_count_does_not_grow_with_rows(self):
+        small = self._measure(self.SMALL)
+        large = self._measure(self.LARGE)
+        allowlist = load_allowlist()
+
+        self.assertIn('task-list', small)
+        self.assertIn('task-detail', small)
+
+        for name, (status_code, queries) in large.items():
+            if name in allowlist or name not in small:
+                continue
+            with self.subTest(route=name):
+                # Порівнюються тільки справжні відповіді: 403/404 на одному з наборів не має сенсу міряти
+                self.assertEqual((small[name][0], status_code), (200, 200))
+                self.assertLessEqual(
+                    queries, small[name][1],
+                    f"{name}: {small[name][1]} SQL-запитів на малому наборі, {queries} на великому (N+1?)"
+                )
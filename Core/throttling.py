@@ -0,0 +1,85 @@
+from rest_framework.throttling import SimpleRateThrottle, ScopedRateThrottle, UserRateThrottle
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    Атомарний throttle "ковзне вікно" на лічильниках (INCR з TTL у Redis).
+
+    Замість списку часових міток (як у DRF) на кожен ключ зберігаються лише два числа:
+    лічильник поточного і попереднього вікна. Оцінка навантаження:
+        previous * (частка попереднього вікна, що ще потрапляє у ковзне) + current
+    Інкремент виконується до перевірки, тому паралельні запити отримують різні значення
+    лічильника і ліміт не перевищується навіть між кількома воркерами.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        window = int(now // self.duration)
+        self.elapsed = (now % self.duration) / self.duration
+
+        current_key = f"{self.key}:{window}"
+        self.current = self._increment(current_key)
+        self.previous = self.cache.get(f"{self.key}:{window - 1}", 0)
+
+        if self._estimate(self.current) <= self.num_requests:
+            return True
+
+        # Відхилений запит не займає місце у вікні (як і в стандартному throttle DRF)
+        self._decrement(current_key)
+        self.current -= 1
+        return False
+
+    def wait(self):
+        """Час (сек), через який наступний запит буде дозволено."""
+        window_left = self.duration * (1 - self.elapsed)
+        if self.current + 1 > self.num_requests or not self.previous:
+            return window_left
+
+        # Внесок попереднього вікна зменшується лінійно — рахує, коли він стане достатньо малим
+        fraction = 1 - (self.num_requests - self.current - 1) / self.previous
+        return max(0.0, (fraction - self.elapsed) * self.duration)
+
+    def _estimate(self, current):
+        return self.previous * (1 - self.elapsed) + current
+
+    def _increment(self, key):
+        # Ключ живе два вікна, щоб наступне вікно могло прочитати його як "попереднє"
+        for _ in range(2):
+            self.cache.add(key, 0, timeout=self.duration * 2)
+            try:
+                return self.cache.incr(key)
+            except ValueError:
+                # Ключ встиг зникнути між add та incr — пробує ще раз
+                continue
+        return 1
+
+    def _decrement(self, key):
+        try:
+            self.cache.decr(key)
+        except ValueError:
+            pass
+
+
+class ScopedSlidingWindowThrottle(ScopedRateThrottle, SlidingWindowRateThrottle):
+    """
+    Ліміт за throttle_scope view (login, register, password_reset).
+    Анонімів ідентифікує за IP, авторизованих — за ID.
+    """
+
+
+class UserSlidingWindowThrottle(UserRateThrottle, SlidingWindowRateThrottle):
+    """
+    Базовий per-user ліміт для API. Нащадки задають власний scope,
+    ставка береться з DEFAULT_THROTTLE_RATES.
+    """
+
+
+class TaskUserRateThrottle(UserSlidingWindowThrottle):
+    scope = 'tasks'
@@ -1,8 +1,8 @@
 from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
-from django.conf.urls.static import static
 from django.conf import settings
+from .views import CeleryMetricsView, ProfilingMetricsView, LocalObjectStorageView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -12,6 +12,10 @@ urlpatterns = [
     path('api/v1/planning/', include('planning.urls')),  # <--- Підключає planning шляхи
     path('api/v1/analytics/', include('analytics.urls')), # <--- Підключає analytics шляхи
     path('api/v1/notifications/', include('notifications.urls')),# <--- Підключає notifications шляхи
+    path('api/v1/sync/', include('sync.urls')),  # <--- Дельта-синхронізація для мобільних клієнтів
+    path('api/v1/uploads/', include('uploads.urls')),  # <--- Порційне завантаження вкладень
+    path('api/v1/ops/celery/', CeleryMetricsView.as_view(), name='celery_metrics'),  # <--- Метрики черг Celery
+    path('api/v1/ops/profiling/', ProfilingMetricsView.as_view(), name='profiling_metrics'),  # <--- Профілювання API
 
     # --- SWAGGER ---
     # 1. Файл схеми (потрібен для роботи UI)
@@ -20,6 +24,10 @@ urlpatterns = [
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
 ]
 
-# роутинг для віддачі медіафайлів у режимі розробки
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+# Медіафайли віддаються за підписаними URL напряму зі сховища;
+# без S3/MinIO у режимі розробки їх обслуговує локальна заглушка з тим самим протоколом
+# (LOCAL_STANDIN вмикається лише при DEBUG або в тестах — див. settings.OBJECT_STORAGE)
+if settings.OBJECT_STORAGE['LOCAL_STANDIN']:
+    urlpatterns += [
+        path('storage/<str:bucket>/<path:key>', LocalObjectStorageView.as_view(), name='local_object_storage'),
+    ]
\ No newline at end of file
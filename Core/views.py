@@ -0,0 +1,102 @@
+import base64
+import hashlib
+import os
+from urllib.parse import unquote
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import permissions, views, response
+from .celery_metrics import collect_metrics
+from .object_storage import (
+    CACHE_CONTROL_PARAM, CHECKSUM_HEADER, COPY_SOURCE_HEADER, cache_control, verify_presigned,
+)
+from .profiling import collect_profiles
+
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+class CeleryMetricsView(views.APIView):
+    """
+    GET /api/v1/ops/celery/
+    Глибина черг, латентність та частка помилок фонових задач за ковзний період TASK_METRICS_WINDOWS (тільки для адмінів).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return response.Response(collect_metrics())
+
+
+class ProfilingMetricsView(views.APIView):
+    """
+    GET /api/v1/ops/profiling/
+    SQL, серіалізація, кеш і гістограма латентності по кожному ендпоінту (тільки для адмінів).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return response.Response(collect_profiles())
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class LocalObjectStorageView(View):
+    """
+    /storage/<bucket>/<key>
+    Локальна заглушка S3-сумісного сховища (замість MinIO у розробці й тестах).
+    Приймає тільки підписані URL (Core/object_storage.py): GET віддає об'єкт,
+    PUT приймає вміст і, як S3, відхиляє його, якщо не збігся x-amz-checksum-sha256;
+    PUT з x-amz-copy-source копіює наявний об'єкт, DELETE видаляє.
+    """
+
+    def dispatch(self, request, bucket, key):
+        if bucket != settings.OBJECT_STORAGE['BUCKET'] or not verify_presigned(request, key):
+            return HttpResponseForbidden("SignatureDoesNotMatch")
+        return super().dispatch(request, bucket, key)
+
+    def get(self, request, bucket, key):
+        if not default_storage.exists(key):
+            raise Http404
+        response = FileResponse(default_storage.open(key, 'rb'))
+        # Як S3: заголовок з підписаного response-cache-control має пріоритет
+        response['Cache-Control'] = request.GET.get(CACHE_CONTROL_PARAM) or cache_control(key)
+        return response
+
+    def put(self, request, bucket, key):
+        source = request.headers.get(COPY_SOURCE_HEADER)
+        if source:
+            return self._copy(unquote(source).lstrip('/'), key)
+
+        digest = hashlib.sha256()
+        content = TemporaryUploadedFile(os.path.basename(key), request.content_type, 0, None)
+        try:
+            for chunk in iter(lambda: request.read(STREAM_BUFFER_SIZE), b''):
+                digest.update(chunk)
+                content.write(chunk)
+            checksum = request.headers.get(CHECKSUM_HEADER)
+            if checksum and base64.b64encode(digest.digest()).decode() != checksum:
+                return HttpResponseBadRequest("BadDigest")
+
+            content.size = content.tell()
+            # SHA-256 підписаний разом із ключем: наявний об'єкт з тим самим ключем уже ідентичний
+            if not default_storage.exists(key):
+                default_storage.save(key, content)
+        finally:
+            content.close()
+        return HttpResponse(status=200)
+
+    def _copy(self, source, key):
+        source_bucket, _, source_key = source.partition('/')
+        if source_bucket != settings.OBJECT_STORAGE['BUCKET'] or not default_storage.exists(source_key):
+            raise Http404
+        if not default_storage.exists(key):
+            with default_storage.open(source_key, 'rb') as content:
+                default_storage.save(key, content)
+        return HttpResponse(status=200)
+
+    def delete(self, request, bucket, key):
+        # Як S3: видалення відсутнього об'єкта теж успішне
+        default_storage.delete(key)
+        return HttpResponse(status=204)
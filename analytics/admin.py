@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ProjectActivityLog
+from .models import ProjectActivityLog, TaskFlowFact
 
 
 @admin.register(ProjectActivityLog)
@@ -17,4 +17,17 @@ class ProjectActivityLogAdmin(admin.ModelAdmin):
 
     # Забороняє видаляти логи (опціонально)
     def has_delete_permission(self, request, obj=None):
-        return False
\ No newline at end of file
+        return False
+
+
+@admin.register(TaskFlowFact)
+class TaskFlowFactAdmin(admin.ModelAdmin):
+    list_display = ('task', 'project', 'status', 'started_at', 'completed_at', 'lead_time_hours', 'cycle_time_hours')
+    list_filter = ('project', 'status', 'task_type')
+
+    # Факти будуються тільки фоновою задачею
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,16 @@
+from django.db.models import Aggregate, FloatField
+
+
+class Percentile(Aggregate):
+    """
+    Перцентиль у SQL (PostgreSQL): percentile_cont(p) WITHIN GROUP (ORDER BY expr).
+    """
+    function = 'percentile_cont'
+    name = 'Percentile'
+    output_field = FloatField()
+    template = '%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, percentile, **extra):
+        if not 0 <= percentile <= 1:
+            raise ValueError("Перцентиль має бути в діапазоні 0..1.")
+        super().__init__(expression, percentile=percentile, **extra)
@@ -0,0 +1,252 @@
+import random
+import statistics
+import subprocess
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from projects.models import Project, ProjectMember
+from planning.models import Sprint
+from tasks.models import Task, TaskComment, TaskChecklistItem, TaskHistoryEvent
+from tasks.counters import reconcile_task_counters
+from notifications.models import Notification
+
+User = get_user_model()
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+
+def project_key(prefix, index):
+    """Ключ синтетичного проєкту: повний префікс + роздільник, щоб набори з різними префіксами не перетинались."""
+    return f"{prefix.upper()}_{index}"
+
+
+def generate_dataset(prefix='bench', users=50, projects=10, members_per_project=8, sprints_per_project=4,
+                     tasks_per_project=200, comments_per_task=3, checklist_per_task=3, history_per_task=4,
+                     notifications_per_user=20, seed=42):
+    """
+    Генерує синтетичний набір даних заданого масштабу.
+    Дані створюються через bulk_create (без сигналів) пачками, тому великий обсяг
+    генерується за секунди. Однаковий seed дає однаковий набір — результати бенчмарків
+    між комітами можна порівнювати.
+    """
+    key_length = Project._meta.get_field('key').max_length
+    if len(project_key(prefix, projects - 1)) > key_length:
+        raise ValueError(f"Префікс '{prefix}' задовгий: ключ проєкту має бути не довшим за {key_length} символів.")
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    password = make_password(BENCHMARK_PASSWORD)
+
+    with transaction.atomic():
+        user_objs = User.objects.bulk_create([
+            User(
+                username=f"{prefix}_user_{i}",
+                email=f"{prefix}_user_{i}@example.com",
+                first_name=f"User{i}",
+                last_name=prefix.capitalize(),
+                password=password,
+            )
+            for i in range(users)
+        ])
+
+        project_objs = Project.objects.bulk_create([
+            Project(
+                name=f"{prefix.capitalize()} Project {i}",
+                key=project_key(prefix, i),
+                owner=user_objs[i % users],
+                status=rng.choice([Project.STATUS_BACKLOG, Project.STATUS_IN_PROGRESS]),
+                priority=rng.choice([choice for choice, _ in Project.PRIORITY_CHOICES]),
+            )
+            for i in range(projects)
+        ])
+
+        # Учасники: власник + випадкова команда
+        members = []
+        team_by_project = {}
+        for project in project_objs:
+            others = [u for u in user_objs if u.pk != project.owner_id]
+            team = [project.owner] + rng.sample(others, min(members_per_project - 1, len(others)))
+            team_by_project[project.pk] = team
+            members.extend(
+                ProjectMember(
+                    project=project, user=user,
+                    role=ProjectMember.ROLE_OWNER if user.pk == project.owner_id else ProjectMember.ROLE_MEMBER
+                )
+                for user in team
+            )
+        ProjectMember.objects.bulk_create(members)
+
+        sprint_objs = Sprint.objects.bulk_create([
+            Sprint(
+                project=project,
+                name=f"Sprint {n + 1}",
+                start_date=(now + timedelta(days=14 * (n - 1))).date(),
+                end_date=(now + timedelta(days=14 * n - 1)).date(),
+                status='completed' if n == 0 else ('active' if n == 1 else 'planned'),
+            )
+            for project in project_objs
+            for n in range(sprints_per_project)
+        ])
+        sprints_by_project = {}
+        for sprint in sprint_objs:
+            sprints_by_project.setdefault(sprint.project_id, []).append(sprint)
+
+        statuses = [choice for choice, _ in Task.STATUS_CHOICES]
+        priorities = [choice for choice, _ in Task.PRIORITY_CHOICES]
+        task_types = [choice for choice, _ in Task.TYPE_CHOICES]
+
+        task_objs = Task.objects.bulk_create([
+            Task(
+                project=project,
+                sprint=rng.choice(sprints_by_project.get(project.pk, []) + [None]),
+                title=f"{project.key} task {n}",
+                description="Синтетична задача для бенчмарку.",
+                reporter=project.owner,
+                assignee=rng.choice(team_by_project[project.pk] + [None]),
+                status=rng.choice(statuses),
+                priority=rng.choice(priorities),
+                task_type=rng.choice(task_types),
+                estimated_hours=rng.choice([None, 1, 2, 3, 5, 8, 13]),
+                due_date=now + timedelta(days=rng.randint(-10, 30)),
+            )
+            for project in project_objs
+            for n in range(tasks_per_project)
+        ], batch_size=1000)
+
+        team_of_task = {task.pk: team_by_project[task.project_id] for task in task_objs}
+
+        TaskComment.objects.bulk_create([
+            TaskComment(task=task, author=rng.choice(team_of_task[task.pk]), content=f"Коментар {n}")
+            for task in task_objs
+            for n in range(comments_per_task)
+        ], batch_size=1000)
+
+        TaskChecklistItem.objects.bulk_create([
+            TaskChecklistItem(task=task, content=f"Пункт {n}", is_completed=rng.random() < 0.5)
+            for task in task_objs
+            for n in range(checklist_per_task)
+        ], batch_size=1000)
+
+        TaskHistoryEvent.objects.bulk_create([
+            TaskHistoryEvent(
+                task=task,
+                actor=rng.choice(team_of_task[task.pk]),
+                action_type="task_updated",
+                changes={"status": {"old_value": rng.choice(statuses), "new_value": rng.choice(statuses)}},
+            )
+            for task in task_objs
+            for _ in range(history_per_task)
+        ], batch_size=1000)
+
+        Notification.objects.bulk_create([
+            Notification(
+                recipient=user,
+                title="Синтетичне сповіщення",
+                message=f"Повідомлення {n}",
+                is_read=rng.random() < 0.5,
+            )
+            for user in user_objs
+            for n in range(notifications_per_user)
+        ], batch_size=1000)
+
+        # bulk_create не викликає сигналів — лічильники задач рахуються одним проходом
+        reconcile_task_counters([task.pk for task in task_objs])
+
+    return {
+        'users': len(user_objs),
+        'projects': len(project_objs),
+        'members': len(members),
+        'sprints': len(sprint_objs),
+        'tasks': len(task_objs),
+        'comments': len(task_objs) * comments_per_task,
+        'checklist_items': len(task_objs) * checklist_per_task,
+        'history_events': len(task_objs) * history_per_task,
+        'notifications': len(user_objs) * notifications_per_user,
+    }
+
+
+def hot_endpoints(project, task):
+    """Ендпоінти, які найчастіше викликає фронтенд (назва -> URL)."""
+    return {
+        'task_list': '/api/v1/tasks/',
+        'task_detail': f'/api/v1/tasks/{task.pk}/',
+        'project_list': '/api/v1/projects/',
+        'dashboard': f'/api/v1/analytics/dashboard/{project.pk}/',
+        'planning': f'/api/v1/planning/?project={project.pk}',
+        'notifications': '/api/v1/notifications/',
+        'export': f'/api/v1/projects/{project.pk}/export_tasks/',
+    }
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return round(ordered[index], 2)
+
+
+def _current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(prefix='bench', iterations=20, warmup=2):
+    """
+    Проганяє гарячі ендпоінти через тестовий клієнт від імені власника першого
+    синтетичного проєкту. Для кожного ендпоінта повертає перцентилі латентності
+    та кількість SQL-запитів на виклик.
+    """
+    project = Project.objects.filter(key=project_key(prefix, 0)).first()
+    if project is None:
+        raise ValueError(f"Синтетичні дані з префіксом '{prefix}' не знайдено. Запустіть seed_benchmark_data.")
+    task = project.tasks.order_by('id').first()
+
+    client = APIClient(SERVER_NAME='localhost')
+    client.force_authenticate(user=project.owner)
+
+    results = {}
+    for name, url in hot_endpoints(project, task).items():
+        for _ in range(warmup):
+            client.get(url)
+
+        latencies, queries, statuses = [], [], set()
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = client.get(url)
+                latencies.append((time.perf_counter() - start) * 1000)
+            queries.append(len(captured.captured_queries))
+            statuses.add(response.status_code)
+
+        results[name] = {
+            'url': url,
+            'status_codes': sorted(statuses),
+            'p50_ms': _percentile(latencies, 0.5),
+            'p95_ms': _percentile(latencies, 0.95),
+            'p99_ms': _percentile(latencies, 0.99),
+            'mean_ms': round(statistics.mean(latencies), 2),
+            'queries': max(queries),
+        }
+
+    return {
+        'commit': _current_commit(),
+        'timestamp': timezone.now().isoformat(),
+        'database': connection.vendor,
+        'iterations': iterations,
+        'dataset': {
+            'tasks': Task.objects.count(),
+            'projects': Project.objects.count(),
+            'users': User.objects.count(),
+        },
+        'endpoints': results,
+    }
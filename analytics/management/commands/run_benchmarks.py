@@ -0,0 +1,26 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from analytics.benchmarks import run_benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Вимірює латентність (p50/p95/p99) і кількість SQL-запитів гарячих ендпоінтів, результат — JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='bench', help='Префікс даних з seed_benchmark_data')
+        parser.add_argument('--iterations', type=int, default=20, help='Викликів кожного ендпоінта')
+        parser.add_argument('--output', help='Файл для JSON-звіту (за замовчуванням — stdout)')
+
+    def handle(self, *args, **options):
+        try:
+            report = run_benchmarks(prefix=options['prefix'], iterations=options['iterations'])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        content = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(content)
+            self.stdout.write(self.style.SUCCESS(f"Звіт збережено у {options['output']}"))
+        else:
+            self.stdout.write(content)
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from analytics.benchmarks import generate_dataset
+
+
+class Command(BaseCommand):
+    help = 'Генерує синтетичні дані (юзери, проєкти, спринти, задачі, коментарі, історія, сповіщення) для бенчмарків'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='bench', help='Префікс імен/ключів згенерованих об\'єктів')
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--projects', type=int, default=10)
+        parser.add_argument('--members', type=int, default=8, help='Учасників на проєкт')
+        parser.add_argument('--sprints', type=int, default=4, help='Спринтів на проєкт')
+        parser.add_argument('--tasks', type=int, default=200, help='Задач на проєкт')
+        parser.add_argument('--comments', type=int, default=3, help='Коментарів на задачу')
+        parser.add_argument('--checklist', type=int, default=3, help='Пунктів чекліста на задачу')
+        parser.add_argument('--history', type=int, default=4, help='Подій історії на задачу')
+        parser.add_argument('--notifications', type=int, default=20, help='Сповіщень на юзера')
+        parser.add_argument('--seed', type=int, default=42, help='Seed генератора (відтворюваний набір)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING("⏳ Генерую синтетичні дані..."))
+
+        try:
+            summary = generate_dataset(
+                prefix=options['prefix'],
+                users=options['users'],
+                projects=options['projects'],
+                members_per_project=options['members'],
+                sprints_per_project=options['sprints'],
+                tasks_per_project=options['tasks'],
+                comments_per_task=options['comments'],
+                checklist_per_task=options['checklist'],
+                history_per_task=options['history'],
+                notifications_per_user=options['notifications'],
+                seed=options['seed'],
+            )
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        details = ", ".join(f"{name}: {count}" for name, count in summary.items())
+        self.stdout.write(self.style.SUCCESS(f"Готово! {details}"))
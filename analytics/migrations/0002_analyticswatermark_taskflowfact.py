@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('projects', '0001_initial'),
+        ('tasks', '0004_taskresource_comment'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TaskFlowFact',
+            fields=[
+                ('task', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='flow_fact', serialize=False, to='tasks.task')),
+                ('task_type', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField(verbose_name='Створено')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Перший перехід в роботу')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершено')),
+                ('lead_time_hours', models.FloatField(blank=True, null=True, verbose_name='Lead time (created -> done)')),
+                ('cycle_time_hours', models.FloatField(blank=True, null=True, verbose_name='Cycle time (in_progress -> done)')),
+                ('assignee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flow_facts', to='projects.project')),
+            ],
+            options={
+                'verbose_name': 'Факт потоку задачі',
+                'verbose_name_plural': 'Факти потоку задач',
+                'indexes': [models.Index(fields=['project', 'completed_at'], name='flow_project_completed_idx'), models.Index(fields=['project', 'started_at'], name='flow_project_started_idx')],
+            },
+        ),
+    ]
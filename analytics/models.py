@@ -32,4 +32,48 @@ class ProjectActivityLog(models.Model):
         verbose_name = "Лог активності"
 
     def __str__(self):
-        return f"[{self.project.key}] {self.actor} -> {self.action_type}"
\ No newline at end of file
+        return f"[{self.project.key}] {self.actor} -> {self.action_type}"
+
+class TaskFlowFact(models.Model):
+    """
+    Факт-таблиця потоку задач (одна строка на задачу).
+    Інкрементально будується з TaskHistoryEvent фоновою задачею,
+    щоб графіки не розбирали JSON 'changes' на кожен запит.
+    """
+    task = models.OneToOneField('tasks.Task', on_delete=models.CASCADE, primary_key=True, related_name='flow_fact')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='flow_facts')
+    assignee = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='+')
+    task_type = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+
+    created_at = models.DateTimeField(verbose_name="Створено")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Перший перехід в роботу")
+    completed_at = models.DateTimeField(null=True, blank=True, verbose_name="Завершено")
+
+    # Тривалості в годинах (рахуються при побудові факту)
+    lead_time_hours = models.FloatField(null=True, blank=True, verbose_name="Lead time (created -> done)")
+    cycle_time_hours = models.FloatField(null=True, blank=True, verbose_name="Cycle time (in_progress -> done)")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'completed_at'], name='flow_project_completed_idx'),
+            models.Index(fields=['project', 'started_at'], name='flow_project_started_idx'),
+        ]
+        verbose_name = "Факт потоку задачі"
+        verbose_name_plural = "Факти потоку задач"
+
+    def __str__(self):
+        return f"Flow: task #{self.task_id} ({self.status})"
+
+
+class AnalyticsWatermark(models.Model):
+    """
+    Позиція інкрементальної обробки (ID останньої обробленої події) для фонових агрегацій.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_id}"
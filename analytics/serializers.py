@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import ProjectActivityLog
+from projects.models import Project
 
 
 class ActivityLogSerializer(serializers.ModelSerializer):
@@ -7,4 +8,43 @@ class ActivityLogSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ProjectActivityLog
-        fields = ['id', 'actor_name', 'action_type', 'target', 'timestamp']
\ No newline at end of file
+        fields = ['id', 'actor_name', 'action_type', 'target', 'timestamp']
+
+class FlowQuerySerializer(serializers.Serializer):
+    """
+    Параметри запиту для графіків потоку задач (?project=&date_from=&date_to=&group_by=).
+    """
+    GROUP_BY_CHOICES = ['project', 'assignee', 'task_type']
+
+    project = serializers.IntegerField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    group_by = serializers.ChoiceField(choices=GROUP_BY_CHOICES, default='project')
+
+    def validate(self, data):
+        if data.get('date_from') and data.get('date_to') and data['date_from'] > data['date_to']:
+            raise serializers.ValidationError({"date_to": "Кінець періоду не може бути раніше початку."})
+        return data
+
+
+class PortfolioProjectSerializer(serializers.ModelSerializer):
+    """
+    Рядок портфельного звіту: показники проєкту з анотацій одного агрегованого запиту.
+    """
+    total_tasks = serializers.IntegerField(read_only=True)
+    completed_tasks = serializers.IntegerField(read_only=True)
+    overdue_tasks = serializers.IntegerField(read_only=True)
+    critical_tasks = serializers.IntegerField(read_only=True)
+    active_sprints = serializers.IntegerField(read_only=True)
+    members_count = serializers.IntegerField(read_only=True)
+    progress_percent = serializers.FloatField(read_only=True)
+    risk_score = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Project
+        fields = [
+            'id', 'key', 'name', 'status', 'priority', 'owner', 'end_date',
+            'total_tasks', 'completed_tasks', 'progress_percent',
+            'overdue_tasks', 'critical_tasks', 'active_sprints', 'members_count',
+            'risk_score'
+        ]
@@ -1,7 +1,12 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from tasks.models import Task, TaskComment
+from planning.models import Sprint
 from .models import ProjectActivityLog
+from .workload import invalidate_workload
+
+# Поля задачі, що впливають на навантаження виконавця
+WORKLOAD_FIELDS = ['assignee_id', 'status', 'estimated_hours', 'sprint_id', 'due_date']
 
 
 # --- Слухає зміни в Задачах ---
@@ -35,4 +40,37 @@ def log_comments(sender, instance, created, **kwargs):
             actor=instance.author,
             action_type=ProjectActivityLog.ACTION_COMMENTED,
             target=f"Comment on: {instance.task.title}"
-        )
\ No newline at end of file
+        )
+
+
+# --- Інкрементальне оновлення кешу навантаження (Workload) ---
+@receiver(post_save, sender=Task)
+def refresh_workload_on_task_save(sender, instance, created, **kwargs):
+    """
+    Скидає кеш навантаження тільки для старого і нового виконавця,
+    і тільки якщо змінилось щось, що впливає на навантаження.
+    """
+    loaded = getattr(instance, '_loaded_values', None)
+    if created or loaded is None:
+        invalidate_workload([instance.assignee_id])
+        return
+
+    changed = any(loaded.get(field, getattr(instance, field)) != getattr(instance, field) for field in WORKLOAD_FIELDS)
+    if changed:
+        invalidate_workload([loaded.get('assignee_id'), instance.assignee_id])
+
+
+@receiver(post_delete, sender=Task)
+def refresh_workload_on_task_delete(sender, instance, **kwargs):
+    invalidate_workload([instance.assignee_id])
+
+
+@receiver(post_save, sender=Sprint)
+def refresh_workload_on_sprint_save(sender, instance, created, **kwargs):
+    # Старт/завершення спринту змінює спринтове навантаження всіх його виконавців
+    if created:
+        return
+    assignee_ids = Task.objects.filter(
+        sprint=instance, assignee__isnull=False
+    ).values_list('assignee_id', flat=True).distinct()
+    invalidate_workload(list(assignee_ids))
@@ -0,0 +1,120 @@
+from datetime import timedelta
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from tasks.models import Task, TaskHistoryEvent
+from .models import TaskFlowFact, AnalyticsWatermark
+
+FLOW_FACTS_WATERMARK = 'task_flow_facts'
+FLOW_FACTS_BATCH_SIZE = 2000
+
+
+def _hours_between(start, end):
+    if start and end:
+        return round((end - start).total_seconds() / 3600, 2)
+    return None
+
+
+def _apply_status_change(fact, new_status, timestamp):
+    """Оновлює часові мітки факту відповідно до нового статусу задачі."""
+    if new_status == Task.STATUS_IN_PROGRESS and fact.started_at is None:
+        fact.started_at = timestamp
+    elif new_status == Task.STATUS_TODO:
+        # Задачу повернули в беклог — вона більше не в роботі (і не старіє в WIP)
+        fact.started_at = None
+
+    if new_status == Task.STATUS_DONE:
+        fact.completed_at = timestamp
+    elif fact.completed_at is not None:
+        # Задачу відкрили повторно — вона знову в роботі
+        fact.completed_at = None
+
+    fact.status = new_status
+
+
+def build_task_flow_facts(batch_size=FLOW_FACTS_BATCH_SIZE, settle_seconds=None):
+    """
+    Обробляє нові події TaskHistoryEvent (після збереженого watermark) пачками
+    і оновлює TaskFlowFact. Повертає кількість оброблених подій.
+
+    Події, молодші за settle_seconds, чекають наступного запуску: транзакція, що комітиться
+    пізніше, може мати менший id, і watermark не повинен її перескочити.
+    """
+    if settle_seconds is None:
+        settle_seconds = settings.FLOW_FACTS_SETTLE_SECONDS
+    settled_before = timezone.now() - timedelta(seconds=settle_seconds)
+    processed = 0
+
+    while True:
+        with transaction.atomic():
+            watermark, _ = AnalyticsWatermark.objects.select_for_update().get_or_create(name=FLOW_FACTS_WATERMARK)
+
+            events = list(
+                TaskHistoryEvent.objects.filter(id__gt=watermark.last_id, timestamp__lte=settled_before)
+                .order_by('id')
+                .values('id', 'task_id', 'changes', 'timestamp')[:batch_size]
+            )
+            if not events:
+                break
+
+            task_ids = {event['task_id'] for event in events}
+            facts = TaskFlowFact.objects.in_bulk(task_ids)
+            tasks = {
+                task['id']: task
+                for task in Task.objects.filter(id__in=task_ids).values(
+                    'id', 'project_id', 'assignee_id', 'task_type', 'status', 'created_at'
+                )
+            }
+
+            new_facts = {}
+            for event in events:
+                task = tasks.get(event['task_id'])
+                if task is None:
+                    continue
+
+                fact = facts.get(task['id']) or new_facts.get(task['id'])
+                if fact is None:
+                    fact = TaskFlowFact(task_id=task['id'], created_at=task['created_at'], status=task['status'])
+                    new_facts[task['id']] = fact
+
+                status_change = (event['changes'] or {}).get('status')
+                if isinstance(status_change, dict) and status_change.get('new_value'):
+                    _apply_status_change(fact, status_change['new_value'], event['timestamp'])
+
+            touched = list(facts.values()) + list(new_facts.values())
+            for fact in touched:
+                # Вимірювання (виконавець, тип) беруться з поточного стану задачі
+                task = tasks.get(fact.task_id)
+                if task:
+                    fact.project_id = task['project_id']
+                    fact.assignee_id = task['assignee_id']
+                    fact.task_type = task['task_type']
+                fact.lead_time_hours = _hours_between(fact.created_at, fact.completed_at)
+                fact.cycle_time_hours = _hours_between(fact.started_at, fact.completed_at)
+
+            TaskFlowFact.objects.bulk_create(new_facts.values())
+            TaskFlowFact.objects.bulk_update(
+                facts.values(),
+                ['project', 'assignee', 'task_type', 'status', 'started_at', 'completed_at',
+                 'lead_time_hours', 'cycle_time_hours']
+            )
+
+            watermark.last_id = events[-1]['id']
+            watermark.save(update_fields=['last_id', 'updated_at'])
+            processed += len(events)
+
+        if len(events) < batch_size:
+            break
+
+    return processed
+
+
+@shared_task
+def build_task_flow_facts_periodic():
+    """
+    Періодична задача (Beat).
+    Інкрементально доповнює факт-таблицю потоку задач новими подіями з Audit Log.
+    """
+    processed = build_task_flow_facts()
+    return f"Flow facts updated. Processed {processed} history events."
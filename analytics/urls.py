@@ -1,7 +1,18 @@
 from django.urls import path
-from .views import ProjectDashboardView, ProjectActivityLogView
+from .views import (
+    ProjectDashboardView, ProjectActivityLogView,
+    FlowLeadCycleTimeView, FlowThroughputView, FlowAgingWipView, PortfolioView,
+    WorkloadView
+)
 
 urlpatterns = [
     path('dashboard/<int:project_id>/', ProjectDashboardView.as_view(), name='project_dashboard'),
     path('logs/<int:project_id>/', ProjectActivityLogView.as_view(), name='project_logs'),
+    path('portfolio/', PortfolioView.as_view(), name='portfolio'),
+    path('workload/', WorkloadView.as_view(), name='workload'),
+
+    # Графіки потоку задач (з факт-таблиці TaskFlowFact)
+    path('flow/lead-cycle-time/', FlowLeadCycleTimeView.as_view(), name='flow_lead_cycle_time'),
+    path('flow/throughput/', FlowThroughputView.as_view(), name='flow_throughput'),
+    path('flow/aging-wip/', FlowAgingWipView.as_view(), name='flow_aging_wip'),
 ]
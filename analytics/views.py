@@ -1,13 +1,28 @@
+import math
+from datetime import datetime, time, timedelta
 from rest_framework import viewsets, permissions, views, response
-from django.db.models import Count, Q
+from django.db import connections
+from django.db.models import Count, Q, F, Avg, Min, Case, When, Value, FloatField
+from django.db.models.functions import TruncWeek, Round
+from rest_framework import filters
 from django.utils import timezone
-from .models import ProjectActivityLog
-from .serializers import ActivityLogSerializer 
+from .models import ProjectActivityLog, TaskFlowFact
+from .serializers import ActivityLogSerializer, FlowQuerySerializer, PortfolioProjectSerializer
+from .aggregates import Percentile
 from tasks.models import Task
-from projects.models import ProjectMember
+from projects.models import Project, ProjectMember
+from projects.membership import get_member_project_ids
+from projects.querysets import project_count_subquery
+from planning.models import Sprint
+from django.contrib.auth import get_user_model
+from rest_framework.exceptions import ValidationError
+from .workload import get_workload
 from rest_framework import generics
 from Core.pagination import CoreCursorPagination
 
+User = get_user_model()
+
+
 class ProjectDashboardView(views.APIView):
     """
     GET /analytics/dashboard/{project_id}/
@@ -83,8 +98,276 @@ class ProjectActivityLogView(generics.ListAPIView):
             return ProjectActivityLog.objects.filter(project_id=project_id)
 
         # 2. Якщо це звичайний юзер - перевіряє чи є він учасником або власником
-        return ProjectActivityLog.objects.filter(
-            project_id=project_id
-        ).filter(
-            Q(project__members__user=user) | Q(project__owner=user)
-        ).distinct()
\ No newline at end of file
+        if project_id not in get_member_project_ids(user.id):
+            return ProjectActivityLog.objects.none()
+        return ProjectActivityLog.objects.filter(project_id=project_id)
+
+
+class PortfolioCursorPagination(CoreCursorPagination):
+    """
+    Пагінація портфеля: за замовчуванням найризиковіші проєкти першими.
+    risk_score не унікальний — id робить порядок однозначним, щоб курсор не губив
+    і не повторював проєкти з однаковим ризиком на межі сторінок.
+    """
+    ordering = ('-risk_score', '-id')
+
+
+class PortfolioOrderingFilter(filters.OrderingFilter):
+    """OrderingFilter, який додає id до будь-якого сортування (однозначний порядок для курсора)."""
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering = (*ordering, '-id')
+        return ordering
+
+
+class PortfolioView(generics.ListAPIView):
+    """
+    GET /api/v1/analytics/portfolio/?ordering=-risk_score&show_archived=true
+    Зведення по всіх доступних проєктах (Адмін бачить усі) одним агрегованим запитом:
+    прогрес, прострочені, критичні задачі, активні спринти, кількість учасників.
+    """
+    serializer_class = PortfolioProjectSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PortfolioCursorPagination
+
+    filter_backends = [PortfolioOrderingFilter]
+    ordering_fields = ['risk_score', 'progress_percent', 'overdue_tasks', 'critical_tasks', 'total_tasks', 'name']
+    ordering = ('-risk_score', '-id')
+
+    # Вага показників у сумарному ризику
+    OVERDUE_WEIGHT = 3
+    CRITICAL_WEIGHT = 2
+
+    def get_queryset(self):
+        user = self.request.user
+        now = timezone.now()
+        projects = Project.objects.all()
+
+        if not (user.is_staff or user.is_superuser):
+            # Підзапит замість JOIN з members, щоб не множити рядки задач
+            member_of = ProjectMember.objects.filter(user=user).values('project_id')
+            projects = projects.filter(Q(owner=user) | Q(pk__in=member_of))
+
+        if not self.request.query_params.get('show_archived'):
+            projects = projects.exclude(status=Project.STATUS_ARCHIVED)
+
+        # Єдиний JOIN — з задачами; лічильники з інших таблиць — скалярні підзапити
+        projects = projects.annotate(
+            total_tasks=Count('tasks'),
+            completed_tasks=Count('tasks', filter=Q(tasks__status=Task.STATUS_DONE)),
+            overdue_tasks=Count('tasks', filter=Q(
+                tasks__due_date__lt=now,
+                tasks__status__in=[Task.STATUS_TODO, Task.STATUS_IN_PROGRESS]
+            )),
+            critical_tasks=Count('tasks', filter=Q(tasks__priority=Task.PRIORITY_CRITICAL)),
+            active_sprints=project_count_subquery(Sprint.objects.filter(status='active')),
+            members_count=project_count_subquery(ProjectMember.objects.all()),
+        ).annotate(
+            progress_percent=Case(
+                When(total_tasks=0, then=Value(0.0)),
+                default=Round(F('completed_tasks') * 100.0 / F('total_tasks'), 1),
+                output_field=FloatField()
+            ),
+            risk_score=F('overdue_tasks') * self.OVERDUE_WEIGHT + F('critical_tasks') * self.CRITICAL_WEIGHT,
+        )
+        return projects
+
+
+class WorkloadView(views.APIView):
+    """
+    GET /api/v1/analytics/workload/?project={project_id}
+    Навантаження команди по ВСІХ проєктах: відкриті години, прострочені задачі, спринтове навантаження.
+    Команда: учасники проєкту (?project=), інакше — колеги з моїх проєктів (Адмін — всі активні юзери).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        is_admin = user.is_staff or user.is_superuser
+        project_id = request.query_params.get('project')
+
+        if project_id:
+            if not project_id.isdigit():
+                raise ValidationError({"project": "Очікується ID проєкту."})
+            if not is_admin and not ProjectMember.objects.filter(project_id=project_id, user=user).exists():
+                return response.Response({"error": "Forbidden"}, status=403)
+            team = ProjectMember.objects.filter(project_id=project_id).values_list('user_id', flat=True)
+        elif is_admin:
+            team = User.objects.filter(is_active=True).values_list('id', flat=True)
+        else:
+            my_projects = ProjectMember.objects.filter(user=user).values('project_id')
+            team = ProjectMember.objects.filter(project_id__in=my_projects).values_list('user_id', flat=True)
+
+        return response.Response({"workload": get_workload(team)})
+
+
+# --- ГРАФІКИ ПОТОКУ (Flow Analytics) ---
+# Дані беруться з факт-таблиці TaskFlowFact, яку будує analytics.tasks.build_task_flow_facts_periodic
+
+def _percentile_cont(values, percentile):
+    """Лінійна інтерполяція як у percentile_cont (фолбек для БД без перцентилів, напр. SQLite)."""
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * percentile
+    lower = math.floor(k)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (k - lower)
+
+
+class FlowMetricsView(views.APIView):
+    """
+    Базовий клас для графіків потоку: перевірка доступу, фільтр по проєкту/датах, групування.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    PERCENTILES = {'p50': 0.5, 'p85': 0.85, 'p95': 0.95}
+    GROUP_FIELDS = {
+        'project': 'project_id',
+        'assignee': 'assignee_id',
+        'task_type': 'task_type',
+    }
+
+    def get_params(self, request):
+        serializer = FlowQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    def get_facts(self, request, params):
+        user = request.user
+        facts = TaskFlowFact.objects.all()
+
+        # Звичайний юзер бачить тільки свої проєкти
+        if not (user.is_staff or user.is_superuser):
+            facts = facts.filter(project_id__in=get_member_project_ids(user.id))
+
+        if params.get('project'):
+            facts = facts.filter(project_id=params['project'])
+        return facts
+
+    @staticmethod
+    def filter_completed(facts, params):
+        """Залишає задачі, завершені в межах періоду (межі дат у поточному часовому поясі)."""
+        facts = facts.filter(completed_at__isnull=False)
+        if params.get('date_from'):
+            facts = facts.filter(completed_at__gte=timezone.make_aware(datetime.combine(params['date_from'], time.min)))
+        if params.get('date_to'):
+            end = params['date_to'] + timedelta(days=1)
+            facts = facts.filter(completed_at__lt=timezone.make_aware(datetime.combine(end, time.min)))
+        return facts
+
+    def duration_stats(self, facts, field, group_field):
+        """Кількість, середнє та перцентилі тривалості по групах."""
+        facts = facts.filter(**{f'{field}__isnull': False})
+
+        # PostgreSQL: все рахується одним GROUP BY запитом
+        if connections[facts.db].vendor == 'postgresql':
+            percentiles = {name: Percentile(field, value) for name, value in self.PERCENTILES.items()}
+            return list(
+                facts.values(group=F(group_field))
+                .annotate(count=Count('pk'), avg=Avg(field), **percentiles)
+                .order_by('group')
+            )
+
+        # Інші БД: перцентилі рахуються в Python
+        grouped = {}
+        for group, value in facts.values_list(group_field, field):
+            grouped.setdefault(group, []).append(value)
+
+        stats = []
+        for group, values in sorted(grouped.items(), key=lambda item: str(item[0])):
+            row = {'group': group, 'count': len(values), 'avg': sum(values) / len(values)}
+            for name, value in self.PERCENTILES.items():
+                row[name] = _percentile_cont(values, value)
+            stats.append(row)
+        return stats
+
+
+class FlowLeadCycleTimeView(FlowMetricsView):
+    """
+    GET /api/v1/analytics/flow/lead-cycle-time/?project=&date_from=&date_to=&group_by=
+    Lead time (created -> done) і Cycle time (in_progress -> done) у годинах: середнє та p50/p85/p95.
+    """
+
+    def get(self, request):
+        params = self.get_params(request)
+        group_field = self.GROUP_FIELDS[params['group_by']]
+        facts = self.filter_completed(self.get_facts(request, params), params)
+
+        return response.Response({
+            "group_by": params['group_by'],
+            "lead_time_hours": self.duration_stats(facts, 'lead_time_hours', group_field),
+            "cycle_time_hours": self.duration_stats(facts, 'cycle_time_hours', group_field),
+        })
+
+
+class FlowThroughputView(FlowMetricsView):
+    """
+    GET /api/v1/analytics/flow/throughput/?project=&date_from=&date_to=&group_by=
+    Кількість завершених задач по тижнях.
+    """
+
+    def get(self, request):
+        params = self.get_params(request)
+        group_field = self.GROUP_FIELDS[params['group_by']]
+        facts = self.filter_completed(self.get_facts(request, params), params)
+
+        rows = facts.values(
+            group=F(group_field), week=TruncWeek('completed_at')
+        ).annotate(count=Count('pk')).order_by('week', 'group')
+
+        return response.Response({
+            "group_by": params['group_by'],
+            "weeks": [
+                {"week": row['week'].date(), "group": row['group'], "count": row['count']}
+                for row in rows
+            ],
+        })
+
+
+class FlowAgingWipView(FlowMetricsView):
+    """
+    GET /api/v1/analytics/flow/aging-wip/?project=&group_by=
+    Задачі в роботі (почалися, але не завершені) та їх вік у днях.
+    """
+    ITEMS_LIMIT = 100
+
+    def get(self, request):
+        params = self.get_params(request)
+        group_field = self.GROUP_FIELDS[params['group_by']]
+        now = timezone.now()
+
+        wip = self.get_facts(request, params).filter(started_at__isnull=False, completed_at__isnull=True)
+
+        summary = wip.values(group=F(group_field)).annotate(
+            count=Count('pk'), oldest_started_at=Min('started_at')
+        ).order_by('group')
+
+        # Найстаріші задачі першими
+        items = wip.values(
+            'task_id', 'task__title', 'status', 'assignee_id', 'started_at'
+        ).order_by('started_at')[:self.ITEMS_LIMIT]
+
+        return response.Response({
+            "group_by": params['group_by'],
+            "summary": [
+                {
+                    "group": row['group'],
+                    "count": row['count'],
+                    "oldest_age_days": round((now - row['oldest_started_at']).total_seconds() / 86400, 1),
+                }
+                for row in summary
+            ],
+            "items": [
+                {
+                    "task_id": item['task_id'],
+                    "title": item['task__title'],
+                    "status": item['status'],
+                    "assignee_id": item['assignee_id'],
+                    "age_days": round((now - item['started_at']).total_seconds() / 86400, 1),
+                }
+                for item in items
+            ],
+        })
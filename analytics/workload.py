@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Sum, Q, FloatField, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from tasks.models import Task
+from Core.object_cache import object_cache
+from Core.profiling import record_cache
+
+User = get_user_model()
+
+WORKLOAD_KEY_PREFIX = 'workload:user'
+
+
+def _workload_key(user_id):
+    return f"{WORKLOAD_KEY_PREFIX}:{user_id}"
+
+
+def _empty_workload(user_id):
+    return {
+        'user_id': user_id,
+        'open_tasks': 0,
+        'open_hours': 0.0,
+        'unestimated_tasks': 0,
+        'overdue_tasks': 0,
+        'sprint_tasks': 0,
+        'sprint_hours': 0.0,
+    }
+
+
+def compute_workload(user_ids):
+    """
+    Рахує навантаження користувачів по ВСІХ проєктах одним агрегованим запитом:
+    відкриті задачі та години, прострочені, навантаження в активних спринтах.
+    """
+    now = timezone.now()
+    rows = Task.objects.filter(
+        assignee_id__in=user_ids
+    ).exclude(status=Task.STATUS_DONE).order_by().values('assignee_id').annotate(
+        open_tasks=Count('id'),
+        open_hours=Coalesce(Sum('estimated_hours'), Value(0.0), output_field=FloatField()),
+        unestimated_tasks=Count('id', filter=Q(estimated_hours__isnull=True)),
+        overdue_tasks=Count('id', filter=Q(due_date__lt=now)),
+        sprint_tasks=Count('id', filter=Q(sprint__status='active')),
+        sprint_hours=Coalesce(
+            Sum('estimated_hours', filter=Q(sprint__status='active')), Value(0.0), output_field=FloatField()
+        ),
+    )
+
+    workload = {user_id: _empty_workload(user_id) for user_id in user_ids}
+    for row in rows:
+        user_id = row.pop('assignee_id')
+        workload[user_id].update(row)
+    return workload
+
+
+def get_workload(user_ids):
+    """
+    Повертає навантаження з кешу (Redis); промахи рахуються одним запитом і кешуються.
+    Кеш зберігається окремо для кожного юзера, тож будь-яка команда збирається з готових рядків.
+    """
+    user_ids = list(set(user_ids))
+    cached = cache.get_many([_workload_key(user_id) for user_id in user_ids])
+
+    result = {}
+    missing = []
+    for user_id in user_ids:
+        row = cached.get(_workload_key(user_id))
+        if row is None:
+            missing.append(user_id)
+        else:
+            result[user_id] = row
+
+    record_cache(hits=len(result), misses=len(missing))
+    if missing:
+        computed = compute_workload(missing)
+        cache.set_many(
+            {_workload_key(user_id): row for user_id, row in computed.items()},
+            settings.WORKLOAD_CACHE_TTL
+        )
+        result.update(computed)
+
+    # Ім'я та email — з кешу об'єктів
+    users = object_cache.get_many(User, user_ids)
+    for user_id, row in result.items():
+        user = users.get(user_id)
+        row['name'] = user.get_full_name() if user else None
+        row['email'] = user.email if user else None
+
+    return sorted(result.values(), key=lambda row: row['open_hours'], reverse=True)
+
+
+def invalidate_workload(user_ids):
+    """
+    Скидає кеш навантаження тільки для зачеплених юзерів (одразу і після коміту,
+    щоб паралельний запит не закешував стан до коміту).
+    """
+    keys = [_workload_key(user_id) for user_id in set(user_ids) if user_id]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
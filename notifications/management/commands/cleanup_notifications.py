@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from notifications.tasks import compact_notifications, purge_read_notifications
+
+
+class Command(BaseCommand):
+    help = 'Примусове згортання повторних та видалення старих прочитаних сповіщень'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help='Вік прочитаних сповіщень для видалення (днів)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING("⏳ Починаю очищення сповіщень..."))
+
+        collapsed = compact_notifications()
+        deleted = purge_read_notifications(days=options['days'])
+
+        self.stdout.write(self.style.SUCCESS(f"Готово! Згорнуто: {collapsed}, видалено: {deleted} рядків."))
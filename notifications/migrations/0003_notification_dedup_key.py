@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_notification_grouped_count_notification_task_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='dedup_key',
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True, verbose_name='Ключ дедуплікації'),
+        ),
+    ]
@@ -27,14 +27,41 @@ class Notification(models.Model):
     message = models.TextField(verbose_name="Текст повідомлення")
     notification_type = models.CharField(max_length=20, choices=TYPE_CHOICES, default=TYPE_INFO)
 
+    # Задача, якої стосується сповіщення (потрібна для згортання повторів)
+    task = models.ForeignKey(
+        'tasks.Task',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='notifications',
+        verbose_name="Задача"
+    )
+    # Скільки однакових сповіщень згорнуто в цей запис ("5 нових коментарів")
+    grouped_count = models.PositiveIntegerField(default=1, verbose_name="Кількість подій")
+
+    # Детермінований ключ події (тип:задача:версія:отримувач).
+    # Унікальність гарантує, що повтор Celery-задачі не створить дубль.
+    dedup_key = models.CharField(max_length=255, unique=True, null=True, blank=True, verbose_name="Ключ дедуплікації")
+
     is_read = models.BooleanField(default=False, verbose_name="Прочитано")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-created_at']  # Спочатку нові
+        indexes = [
+            # Список сповіщень юзера (cursor pagination по -created_at)
+            models.Index(fields=['recipient', '-created_at'], name='notif_recipient_created_idx'),
+            # Прибирання старих прочитаних сповіщень
+            models.Index(fields=['is_read', 'created_at'], name='notif_read_created_idx'),
+        ]
         verbose_name = "Сповіщення"
         verbose_name_plural = "Сповіщення"
 
+    @staticmethod
+    def build_dedup_key(event_type, task_id, version, recipient_id):
+        """Формує ключ дедуплікації для події по задачі."""
+        return f"{event_type}:{task_id}:{version}:{recipient_id}"
+
     def __str__(self):
         status = "Read" if self.is_read else "New"
         return f"[{status}] To {self.recipient.email}: {self.title}"
\ No newline at end of file
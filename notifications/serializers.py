@@ -4,6 +4,6 @@ from .models import Notification
 class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
-        fields = ['id', 'title', 'message', 'notification_type', 'is_read', 'created_at']
-        read_only_fields = ['title', 'message', 'notification_type', 'created_at']
+        fields = ['id', 'task', 'title', 'message', 'notification_type', 'grouped_count', 'is_read', 'created_at']
+        read_only_fields = ['task', 'title', 'message', 'notification_type', 'grouped_count', 'created_at']
         # Юзер може змінювати тільки 'is_read'
\ No newline at end of file
@@ -3,9 +3,11 @@ from django.dispatch import receiver
 from django.core.mail import send_mail
 from django.conf import settings
 from tasks.models import Task, TaskComment
+from projects.models import Project
+from Core.object_cache import object_cache
 from users.models import Invitation
 from .models import Notification
-from .tasks import send_email_async, create_notification_async
+from .tasks import send_email_async, create_notifications_batch_async
 
 
 # --- 1. ЛОГІКА ДЛЯ ЗАДАЧ (Розумне відслідковування змін) ---
@@ -29,7 +31,12 @@ def store_previous_state(sender, instance, **kwargs):
 def task_notifications(sender, instance, created, **kwargs):
     """
     Головний обробник змін у задачах.
+    Всі In-App сповіщення однієї події відправляються одним батчем з ключами дедуплікації.
     """
+    # Версія задачі для ключа: updated_at змінюється при кожному save()
+    version = int(instance.updated_at.timestamp() * 1_000_000)
+    notifications = []
+
     # НОВА ЗАДАЧА (або зміна виконавця)
     new_assignee = instance.assignee
     old_assignee = getattr(instance, '_old_assignee', None)
@@ -38,14 +45,17 @@ def task_notifications(sender, instance, created, **kwargs):
     if new_assignee and (created or new_assignee != old_assignee):
         # Не спамить, якщо я призначив сам себе
         if new_assignee != instance.reporter:
+            # Назва проєкту з кешу об'єктів (без окремого запиту в БД)
+            project = object_cache.get(Project, instance.project_id)
             # In-App
-            # Асинхронний виклик замість прямого блокуючого запису в БД
-            create_notification_async.delay(
-                user_id=new_assignee.id,
-                title="Нова задача",
-                message=f"Вас призначено на задачу #{instance.id} '{instance.title}' (Проєкт: {instance.project.name})",
-                notif_type='info'
-            )
+            notifications.append({
+                'user_id': new_assignee.id,
+                'title': "Нова задача",
+                'message': f"Вас призначено на задачу #{instance.id} '{instance.title}' (Проєкт: {project.name})",
+                'notif_type': 'info',
+                'task_id': instance.id,
+                'dedup_key': Notification.build_dedup_key('task_assigned', instance.id, version, new_assignee.id),
+            })
             # Email
             send_email_async.delay(
                 subject=f"CoreOps: Вас призначено на задачу",
@@ -61,12 +71,14 @@ def task_notifications(sender, instance, created, **kwargs):
         # Сповіщає Автора (Reporter), що статус змінився
         # Але тільки якщо статус змінив не сам Автор (щоб не було само-сповіщень)
         if instance.reporter:
-            create_notification_async.delay(
-                user_id=instance.reporter.id,
-                title="Зміна статусу",
-                message=f"Задача #{instance.id} '{instance.title}' змінила статус: {old_status} -> {new_status}",
-                notif_type='success' if new_status == 'done' else 'info'
-            )
+            notifications.append({
+                'user_id': instance.reporter.id,
+                'title': "Зміна статусу",
+                'message': f"Задача #{instance.id} '{instance.title}' змінила статус: {old_status} -> {new_status}",
+                'notif_type': 'success' if new_status == 'done' else 'info',
+                'task_id': instance.id,
+                'dedup_key': Notification.build_dedup_key('status_changed', instance.id, version, instance.reporter.id),
+            })
             # Email надсилає тільки якщо задачу виконано (Done)
             if new_status == 'done':
                 send_email_async.delay(
@@ -75,6 +87,10 @@ def task_notifications(sender, instance, created, **kwargs):
                     recipient_list=[instance.reporter.email]
                 )
 
+    # Асинхронний виклик замість прямого блокуючого запису в БД
+    if notifications:
+        create_notifications_batch_async.delay(notifications)
+
 
 # --- 2. ЛОГІКА ДЛЯ КОМЕНТАРІВ ---
 
@@ -97,14 +113,20 @@ def comment_notifications(sender, instance, created, **kwargs):
         if task.reporter and task.reporter != author:
             recipients.add(task.reporter)
 
-        # Розсилає In-App сповіщення (Без Email, щоб не спамити)
-        for user in recipients:
-            create_notification_async.delay(
-                user_id=user.id,
-                title="Новий коментар",
-                message=f"{author.get_full_name()} прокоментував задачу #{task.id} '{task.title}': {instance.content[:50]}...",
-                notif_type='info'
-            )
+        # Розсилає In-App сповіщення одним батчем (Без Email, щоб не спамити)
+        # Версією події є ID коментаря
+        if recipients:
+            create_notifications_batch_async.delay([
+                {
+                    'user_id': user.id,
+                    'title': "Новий коментар",
+                    'message': f"{author.get_full_name()} прокоментував задачу #{task.id} '{task.title}': {instance.content[:50]}...",
+                    'notif_type': 'info',
+                    'task_id': task.id,
+                    'dedup_key': Notification.build_dedup_key('comment_created', task.id, instance.id, user.id),
+                }
+                for user in recipients
+            ])
 
 
 # --- 3. ЛОГІКА ДЛЯ ІНВАЙТІВ (Залишаємо як було) ---
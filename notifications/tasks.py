@@ -1,6 +1,10 @@
+from datetime import timedelta
 from celery import shared_task
 from django.core.mail import send_mail
 from django.conf import settings
+from django.db import transaction, DatabaseError, IntegrityError
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
 from .models import Notification
 from django.contrib.auth import get_user_model
 
@@ -24,13 +28,146 @@ def send_email_async(subject, message, recipient_list):
 
 User = get_user_model()
 
-@shared_task
-def create_notification_async(user_id, title, message, notif_type):
+# Скільки рядків вставляється одним INSERT
+BULK_INSERT_BATCH_SIZE = 500
+
+
+def _insert_notifications(items):
+    """
+    Вставляє сповіщення пачками як INSERT ... ON CONFLICT DO NOTHING.
+    Рядки з уже існуючим dedup_key тихо пропускаються.
+    Події для вже видалених юзерів або задач відкидаються: ignore_conflicts не покриває
+    порушення FK, а повтор задачі результату не змінить.
+    """
+    notifications = [
+        Notification(
+            recipient_id=item['user_id'],
+            task_id=item.get('task_id'),
+            title=item['title'],
+            message=item['message'],
+            notification_type=item['notif_type'],
+            dedup_key=item.get('dedup_key')
+        )
+        for item in items
+    ]
+    try:
+        with transaction.atomic():
+            Notification.objects.bulk_create(notifications, batch_size=BULK_INSERT_BATCH_SIZE, ignore_conflicts=True)
+    except IntegrityError:
+        live = _drop_orphaned(notifications)
+        if len(live) == len(notifications):
+            raise
+        Notification.objects.bulk_create(live, batch_size=BULK_INSERT_BATCH_SIZE, ignore_conflicts=True)
+
+
+def _drop_orphaned(notifications):
+    """Лишає сповіщення, одержувач і задача яких ще існують."""
+    Task = Notification._meta.get_field('task').related_model
+    user_ids = set(User.objects.filter(
+        pk__in={notification.recipient_id for notification in notifications}
+    ).values_list('pk', flat=True))
+    task_ids = set(Task.objects.filter(
+        pk__in={notification.task_id for notification in notifications if notification.task_id}
+    ).values_list('pk', flat=True))
+    return [
+        notification for notification in notifications
+        if notification.recipient_id in user_ids and (notification.task_id is None or notification.task_id in task_ids)
+    ]
+
+
+@shared_task(autoretry_for=(DatabaseError,), retry_backoff=True, max_retries=3)
+def create_notification_async(user_id, title, message, notif_type, task_id=None, dedup_key=None):
     """Фонове створення In-App сповіщення без блокування основної транзакції"""
-    user = User.objects.get(id=user_id)
-    Notification.objects.create(
-        recipient=user,
-        title=title,
-        message=message,
-        notification_type=notif_type
-    )
\ No newline at end of file
+    _insert_notifications([{
+        'user_id': user_id,
+        'title': title,
+        'message': message,
+        'notif_type': notif_type,
+        'task_id': task_id,
+        'dedup_key': dedup_key,
+    }])
+
+
+@shared_task(autoretry_for=(DatabaseError,), retry_backoff=True, max_retries=3)
+def create_notifications_batch_async(items):
+    """
+    Фонове створення кількох сповіщень одним запитом.
+    items: список словників з ключами user_id, title, message, notif_type, task_id, dedup_key.
+    Безпечна для повторного виконання (at-least-once) завдяки dedup_key.
+    """
+    _insert_notifications(items)
+
+
+# --- ОБСЛУГОВУВАННЯ ТАБЛИЦІ СПОВІЩЕНЬ ---
+
+def compact_notifications(batch_size=None):
+    """
+    Згортає повторні непрочитані сповіщення одного типу по одній задачі в один запис.
+    Залишає найновіший запис, решту видаляє. Повертає кількість видалених рядків.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_CLEANUP_BATCH_SIZE
+
+    # Один GROUP BY знаходить групи дублікатів (обмежено batch_size групами за прохід)
+    groups = Notification.objects.filter(
+        is_read=False, task__isnull=False
+    ).order_by().values(
+        'recipient_id', 'task_id', 'title'
+    ).annotate(
+        rows=Count('id'),
+        events=Sum('grouped_count'),
+        keep_id=Max('id')
+    ).filter(rows__gt=1)[:batch_size]
+
+    collapsed = 0
+    for group in groups:
+        # Кожна група в окремій короткій транзакції, щоб не тримати довгих блокувань
+        with transaction.atomic():
+            Notification.objects.filter(id=group['keep_id']).update(
+                grouped_count=group['events'],
+                message=f"{group['title']}: {group['events']} подій по задачі #{group['task_id']}"
+            )
+            deleted, _ = Notification.objects.filter(
+                recipient_id=group['recipient_id'],
+                task_id=group['task_id'],
+                title=group['title'],
+                is_read=False,
+                id__lt=group['keep_id']
+            ).delete()
+        collapsed += deleted
+
+    return collapsed
+
+
+def purge_read_notifications(days=None, batch_size=None):
+    """
+    Видаляє прочитані сповіщення, старші за NOTIFICATION_RETENTION_DAYS.
+    Видалення йде пачками по batch_size рядків. Повертає кількість видалених рядків.
+    """
+    days = settings.NOTIFICATION_RETENTION_DAYS if days is None else days
+    batch_size = batch_size or settings.NOTIFICATION_CLEANUP_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=days)
+
+    deleted_total = 0
+    while True:
+        ids = list(
+            Notification.objects.filter(is_read=True, created_at__lt=cutoff)
+            .order_by('created_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        deleted, _ = Notification.objects.filter(id__in=ids).delete()
+        deleted_total += deleted
+
+    return deleted_total
+
+
+@shared_task
+def cleanup_notifications_periodic():
+    """
+    Періодична задача (Beat).
+    Згортає повторні сповіщення і видаляє старі прочитані, щоб таблиця не росла безмежно.
+    """
+    collapsed = compact_notifications()
+    deleted = purge_read_notifications()
+    return f"Notifications cleanup. Collapsed {collapsed}, deleted {deleted} rows."
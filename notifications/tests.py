@@ -1,3 +1,99 @@
+from datetime import timedelta
+from unittest import mock
+from django.db import IntegrityError
 from django.test import TestCase
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from projects.models import Project, ProjectMember
+from tasks.models import Task
+from notifications.models import Notification
+from notifications.tasks import (
+    compact_notifications, purge_read_notifications, create_notifications_batch_async
+)
 
-# Create your tests here.
+User = get_user_model()
+
+
+class NotificationMaintenanceTests(TestCase):
+
+    def setUp(self):
+        self.dev = User.objects.create_user(username='dev_user', email='dev@test.com', password='123')
+        self.project = Project.objects.create(name="Notif Project", key="NTF", owner=self.dev)
+        ProjectMember.objects.create(project=self.project, user=self.dev, role='owner')
+        self.task = Task.objects.create(project=self.project, title="Task", reporter=self.dev)
+
+    def test_purge_removes_only_old_read_notifications(self):
+        """Видаляються тільки прочитані сповіщення, старші за термін зберігання"""
+        old_read = Notification.objects.create(recipient=self.dev, title="A", message="a", is_read=True)
+        old_unread = Notification.objects.create(recipient=self.dev, title="B", message="b")
+        fresh_read = Notification.objects.create(recipient=self.dev, title="C", message="c", is_read=True)
+        Notification.objects.filter(id__in=[old_read.id, old_unread.id]).update(
+            created_at=timezone.now() - timedelta(days=100)
+        )
+
+        deleted = purge_read_notifications(days=90, batch_size=1)
+
+        self.assertEqual(deleted, 1)
+        self.assertFalse(Notification.objects.filter(id=old_read.id).exists())
+        self.assertEqual(Notification.objects.filter(id__in=[old_unread.id, fresh_read.id]).count(), 2)
+
+    def test_compact_collapses_repeated_task_notifications(self):
+        """Повторні непрочитані сповіщення по одній задачі згортаються в одне"""
+        for i in range(5):
+            Notification.objects.create(
+                recipient=self.dev, task=self.task, title="Новий коментар", message=f"comment {i}"
+            )
+
+        collapsed = compact_notifications()
+
+        self.assertEqual(collapsed, 4)
+        notification = Notification.objects.get(recipient=self.dev, task=self.task)
+        self.assertEqual(notification.grouped_count, 5)
+        self.assertIn(f"#{self.task.id}", notification.message)
+
+
+class NotificationDedupTests(TestCase):
+
+    def setUp(self):
+        self.dev = User.objects.create_user(username='dev_user', email='dev@test.com', password='123')
+        self.project = Project.objects.create(name="Dedup Project", key="DDP", owner=self.dev)
+        self.task = Task.objects.create(project=self.project, title="Task", reporter=self.dev)
+
+    def test_repeated_delivery_does_not_duplicate(self):
+        """Повторне виконання задачі з тим самим dedup_key не створює дублів"""
+        items = [{
+            'user_id': self.dev.id,
+            'title': "Новий коментар",
+            'message': "text",
+            'notif_type': 'info',
+            'task_id': self.task.id,
+            'dedup_key': Notification.build_dedup_key('comment_created', self.task.id, 1, self.dev.id),
+        }]
+
+        create_notifications_batch_async(items)
+        create_notifications_batch_async(items)
+
+        self.assertEqual(Notification.objects.filter(recipient=self.dev).count(), 1)
+
+    def test_events_for_deleted_objects_are_dropped_without_retry(self):
+        """Порушення FK (задачу вже видалено) не ретраїться: решта пачки вставляється"""
+        items = [
+            {'user_id': self.dev.id, 'title': "Жива", 'message': "text", 'notif_type': 'info', 'task_id': self.task.id},
+            {'user_id': self.dev.id, 'title': "Видалена", 'message': "text", 'notif_type': 'info', 'task_id': 999999},
+        ]
+        # SQLite у тестах перевіряє FK лише при коміті — помилку бази імітує перший INSERT
+        bulk_create = Notification.objects.bulk_create
+        calls = []
+
+        def fail_first(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 1:
+                raise IntegrityError("FOREIGN KEY constraint failed")
+            return bulk_create(*args, **kwargs)
+
+        with mock.patch.object(Notification.objects, 'bulk_create', side_effect=fail_first), \
+                mock.patch.object(create_notifications_batch_async, 'retry') as retry:
+            create_notifications_batch_async(items)
+
+        retry.assert_not_called()
+        self.assertEqual(list(Notification.objects.values_list('title', flat=True)), ["Жива"])
@@ -1,9 +1,15 @@
 from django.contrib import admin
-from .models import Sprint
+from .models import Sprint, SprintCapacity
 
 @admin.register(Sprint)
 class SprintAdmin(admin.ModelAdmin):
     list_display = ('name', 'project', 'start_date', 'end_date', 'status', 'actual_end_date')
     list_filter = ('project', 'status')
     search_fields = ('name', 'description', 'goal')
-    ordering = ('-start_date',)
\ No newline at end of file
+    ordering = ('-start_date',)
+
+
+@admin.register(SprintCapacity)
+class SprintCapacityAdmin(admin.ModelAdmin):
+    list_display = ('sprint', 'user', 'hours')
+    list_filter = ('sprint__project',)
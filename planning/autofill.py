@@ -0,0 +1,74 @@
+from django.db.models import Sum
+from tasks.models import Task
+
+# Чим менше число, тим раніше задача потрапляє у план
+PRIORITY_RANK = {
+    Task.PRIORITY_CRITICAL: 0,
+    Task.PRIORITY_HIGH: 1,
+    Task.PRIORITY_MEDIUM: 2,
+    Task.PRIORITY_LOW: 3,
+}
+
+
+def _candidate_sort_key(task):
+    # Пріоритет -> найближчий дедлайн (без дедлайну в кінці) -> менша оцінка
+    due_date = task['due_date']
+    return (
+        PRIORITY_RANK.get(task['priority'], len(PRIORITY_RANK)),
+        due_date is None,
+        due_date.timestamp() if due_date else 0,
+        task['estimated_hours'],
+    )
+
+
+def build_autofill_plan(sprint):
+    """
+    Жадібно підбирає задачі з Backlog проєкту під вільну ємність спринту.
+
+    Кандидати читаються одним запитом; задача з виконавцем має вміститися і в його
+    особистий залишок, і в загальний залишок команди, задача без виконавця — лише в загальний.
+    Задачі без оцінки не плануються автоматично.
+    """
+    capacities = dict(sprint.capacities.values_list('user_id', 'hours'))
+
+    # Години, вже взяті у спринт (лише незавершені задачі)
+    committed = {
+        row['assignee_id']: row['hours'] or 0.0
+        for row in sprint.tasks.exclude(status=Task.STATUS_DONE)
+        .values('assignee_id').annotate(hours=Sum('estimated_hours'))
+    }
+
+    team_left = sum(capacities.values()) - sum(committed.values())
+    member_left = {user_id: hours - committed.get(user_id, 0.0) for user_id, hours in capacities.items()}
+
+    candidates = list(
+        Task.objects.filter(project_id=sprint.project_id, sprint__isnull=True)
+        .exclude(status=Task.STATUS_DONE)
+        .values('id', 'title', 'priority', 'due_date', 'estimated_hours', 'assignee_id')
+    )
+
+    selected, skipped = [], []
+    for task in sorted((t for t in candidates if t['estimated_hours']), key=_candidate_sort_key):
+        hours = task['estimated_hours']
+        assignee_id = task['assignee_id']
+
+        fits_team = hours <= team_left
+        fits_member = assignee_id is None or hours <= member_left.get(assignee_id, 0.0)
+
+        if fits_team and fits_member:
+            selected.append(task)
+            team_left -= hours
+            if assignee_id is not None:
+                member_left[assignee_id] -= hours
+        else:
+            skipped.append(task)
+
+    return {
+        'total_capacity_hours': sum(capacities.values()),
+        'committed_hours': sum(committed.values()),
+        'planned_hours': sum(task['estimated_hours'] for task in selected),
+        'remaining_hours': team_left,
+        'tasks': selected,
+        'skipped_tasks': skipped,
+        'unestimated_task_ids': [t['id'] for t in candidates if not t['estimated_hours']],
+    }
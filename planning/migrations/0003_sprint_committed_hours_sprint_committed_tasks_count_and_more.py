@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planning', '0002_remove_sprint_is_active_sprint_actual_end_date_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sprint',
+            name='committed_hours',
+            field=models.FloatField(blank=True, null=True, verbose_name='Заплановано годин'),
+        ),
+        migrations.AddField(
+            model_name='sprint',
+            name='committed_tasks_count',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Задач у спринті'),
+        ),
+        migrations.AddField(
+            model_name='sprint',
+            name='completed_hours',
+            field=models.FloatField(blank=True, null=True, verbose_name='Виконано годин'),
+        ),
+        migrations.AddField(
+            model_name='sprint',
+            name='completed_tasks_count',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Виконано задач'),
+        ),
+    ]
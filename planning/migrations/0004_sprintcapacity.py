@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:26
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planning', '0003_sprint_committed_hours_sprint_committed_tasks_count_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SprintCapacity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hours', models.FloatField(validators=[django.core.validators.MinValueValidator(0)], verbose_name='Доступно годин')),
+                ('sprint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='capacities', to='planning.sprint', verbose_name='Спринт')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sprint_capacities', to=settings.AUTH_USER_MODEL, verbose_name='Учасник')),
+            ],
+            options={
+                'verbose_name': 'Ємність учасника',
+                'verbose_name_plural': 'Ємність команди',
+                'unique_together': {('sprint', 'user')},
+            },
+        ),
+    ]
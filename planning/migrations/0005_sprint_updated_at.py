@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planning', '0004_sprintcapacity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sprint',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.conf import settings
+from django.core.validators import MinValueValidator
 from django.utils import timezone
 from projects.models import Project
 from django.core.exceptions import ValidationError
@@ -24,7 +26,14 @@ class Sprint(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='planned')
     actual_end_date = models.DateField(null=True, blank=True, help_text="Коли реально завершили спринт")
 
+    # Знімок фінальних метрик (заповнюється при завершенні спринту)
+    committed_tasks_count = models.PositiveIntegerField(null=True, blank=True, verbose_name="Задач у спринті")
+    completed_tasks_count = models.PositiveIntegerField(null=True, blank=True, verbose_name="Виконано задач")
+    committed_hours = models.FloatField(null=True, blank=True, verbose_name="Заплановано годин")
+    completed_hours = models.FloatField(null=True, blank=True, verbose_name="Виконано годин")
+
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-end_date']
@@ -38,4 +47,25 @@ class Sprint(models.Model):
         # Валідація: кінець не може бути раніше початку
 
         if self.start_date and self.end_date and self.start_date > self.end_date:
-            raise ValidationError("Дата початку не може бути пізнішою за дату завершення.")
\ No newline at end of file
+            raise ValidationError("Дата початку не може бути пізнішою за дату завершення.")
+
+class SprintCapacity(models.Model):
+    """
+    Доступні години учасника команди на конкретний спринт.
+    """
+    sprint = models.ForeignKey(Sprint, on_delete=models.CASCADE, related_name='capacities', verbose_name="Спринт")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='sprint_capacities',
+        verbose_name="Учасник"
+    )
+    hours = models.FloatField(validators=[MinValueValidator(0)], verbose_name="Доступно годин")
+
+    class Meta:
+        unique_together = ('sprint', 'user')
+        verbose_name = "Ємність учасника"
+        verbose_name_plural = "Ємність команди"
+
+    def __str__(self):
+        return f"{self.user} - {self.hours} год ({self.sprint.name})"
@@ -1,7 +1,8 @@
 from rest_framework import serializers
-from .models import Sprint
+from .models import Sprint, SprintCapacity
+from Core.sparse_fields import SparseFieldsetMixin
 
-class SprintSerializer(serializers.ModelSerializer):
+class SprintSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     tasks_total = serializers.SerializerMethodField()
     tasks_completed = serializers.SerializerMethodField()
 
@@ -11,10 +12,18 @@ class SprintSerializer(serializers.ModelSerializer):
             'id', 'project', 'name', 'goal',
             'start_date', 'end_date', 'status', 'actual_end_date',
             'tasks_total', 'tasks_completed',
+            'committed_tasks_count', 'completed_tasks_count', 'committed_hours', 'completed_hours',
             'created_at'
         ]
         # Захищаємо поля від ручного редагування
-        read_only_fields = ['status', 'actual_end_date', 'created_at', 'tasks_total', 'tasks_completed']
+        read_only_fields = [
+            'status', 'actual_end_date', 'created_at', 'tasks_total', 'tasks_completed',
+            'committed_tasks_count', 'completed_tasks_count', 'committed_hours', 'completed_hours'
+        ]
+        field_sources = {
+            'tasks_total': ['tasks_total_count'],
+            'tasks_completed': ['tasks_completed_count'],
+        }
 
     def validate(self, data):
         start_date = data.get('start_date')
@@ -29,12 +38,14 @@ class SprintSerializer(serializers.ModelSerializer):
         return data
 
     def get_tasks_total(self, obj):
-        """Рахує загальну кількість задач у цьому спринті"""
-        return obj.tasks.count()
+        """Рахує загальну кількість задач у цьому спринті (анотація з get_queryset, якщо є)"""
+        annotated = getattr(obj, 'tasks_total_count', None)
+        return annotated if annotated is not None else obj.tasks.count()
 
     def get_tasks_completed(self, obj):
         """Рахує тільки задачі зі статусом 'done'"""
-        return obj.tasks.filter(status='done').count()
+        annotated = getattr(obj, 'tasks_completed_count', None)
+        return annotated if annotated is not None else obj.tasks.filter(status='done').count()
 
 class SprintCompleteSerializer(serializers.Serializer):
     """
@@ -49,4 +60,21 @@ class SprintCompleteSerializer(serializers.Serializer):
         if value is not None:
             if not Sprint.objects.filter(id=value).exists():
                 raise serializers.ValidationError("Спринт для перенесення задач з таким ID не знайдено.")
-        return value
\ No newline at end of file
+        return value
+
+
+class SprintCapacitySerializer(serializers.ModelSerializer):
+    """Ємність одного учасника на спринт (години)."""
+    username = serializers.CharField(source='user.username', read_only=True)
+
+    class Meta:
+        model = SprintCapacity
+        fields = ['user', 'username', 'hours']
+
+
+class SprintAutofillSerializer(serializers.Serializer):
+    """
+    Параметри екшену 'Автозаповнення спринту'.
+    dry_run=True лише повертає запропонований план без змін у БД.
+    """
+    dry_run = serializers.BooleanField(default=False)
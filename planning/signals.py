@@ -0,0 +1,6 @@
+from tasks.models import Task
+from Core.conditional import track_collection
+from .models import Sprint
+
+# Лічильники задач спринту входять у його представлення — зміни задач змінюють ETag спринту
+track_collection(Task, Sprint, 'sprint_id')
@@ -3,6 +3,11 @@ from rest_framework import status
 from django.contrib.auth import get_user_model
 from projects.models import Project, ProjectMember
 from planning.models import Sprint
+from tasks.models import Task, TaskHistoryEvent
+from notifications.models import Notification
+from analytics.workload import get_workload, _workload_key
+from django.core.cache import cache
+from unittest.mock import patch
 
 User = get_user_model()
 
@@ -56,4 +61,153 @@ class PlanningAPITests(APITestCase):
         # Запит проходить (200 OK), але...
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # ...через ізоляцію (get_queryset) список результатів має бути порожнім!
-        self.assertEqual(len(response.data['results']), 0)
\ No newline at end of file
+        self.assertEqual(len(response.data['results']), 0)
+
+class SprintCompletionTests(APITestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='sprint_owner', email='so@test.com', password='123')
+        self.dev = User.objects.create_user(username='sprint_dev', email='sd@test.com', password='123')
+        self.project = Project.objects.create(name="Sprint Project", key="SPR", owner=self.owner)
+        ProjectMember.objects.create(project=self.project, user=self.owner, role='owner')
+        ProjectMember.objects.create(project=self.project, user=self.dev, role='developer')
+
+        self.sprint = Sprint.objects.create(
+            project=self.project, name="Sprint 1", start_date="2026-03-01", end_date="2026-03-15", status='active'
+        )
+        self.next_sprint = Sprint.objects.create(
+            project=self.project, name="Sprint 2", start_date="2026-03-16", end_date="2026-03-30"
+        )
+
+        self.done_task = Task.objects.create(
+            project=self.project, title="Done", reporter=self.owner, sprint=self.sprint,
+            status=Task.STATUS_DONE, estimated_hours=5
+        )
+        self.open_tasks = [
+            Task.objects.create(
+                project=self.project, title=f"Open {i}", reporter=self.owner, sprint=self.sprint,
+                estimated_hours=3
+            )
+            for i in range(3)
+        ]
+
+    def test_complete_moves_tasks_with_history_and_metrics(self):
+        """Завершення спринту переносить задачі, пише історію та фіксує метрики"""
+        self.client.force_authenticate(user=self.owner)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f'/api/v1/planning/{self.sprint.id}/complete/', {"move_to_sprint_id": self.next_sprint.id}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['moved_tasks'], 3)
+
+        # Невиконані задачі перенесено, виконана лишилась у старому спринті
+        self.assertEqual(Task.objects.filter(sprint=self.next_sprint).count(), 3)
+        self.done_task.refresh_from_db()
+        self.assertEqual(self.done_task.sprint_id, self.sprint.id)
+
+        # Одна подія історії на кожну перенесену задачу
+        events = TaskHistoryEvent.objects.filter(task__in=self.open_tasks)
+        self.assertEqual(events.count(), 3)
+        self.assertEqual(events.first().changes['sprint']['new_value'], self.next_sprint.id)
+        self.assertEqual(events.first().actor, self.owner)
+
+        self.sprint.refresh_from_db()
+        self.assertEqual(self.sprint.status, 'completed')
+        self.assertEqual(self.sprint.committed_tasks_count, 4)
+        self.assertEqual(self.sprint.completed_tasks_count, 1)
+        self.assertEqual(self.sprint.committed_hours, 14)
+        self.assertEqual(self.sprint.completed_hours, 5)
+
+        # Одне згорнуте сповіщення на кожного учасника проєкту
+        self.assertEqual(Notification.objects.filter(title="Спринт завершено").count(), 2)
+
+    def test_concurrent_completion_is_rejected_under_lock(self):
+        """Спринт, завершений паралельним запитом після першої перевірки, не завершується вдруге"""
+        self.client.force_authenticate(user=self.owner)
+        Sprint.objects.filter(pk=self.sprint.pk).update(status='completed', completed_tasks_count=1)
+
+        # Перша перевірка статусу бачить ще активний спринт (стан до паралельного коміту)
+        with patch('planning.views.SprintViewSet.get_object', return_value=self.sprint):
+            response = self.client.post(f'/api/v1/planning/{self.sprint.id}/complete/')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(TaskHistoryEvent.objects.filter(task__in=self.open_tasks).exists())
+        self.assertEqual(Task.objects.filter(sprint=self.sprint).count(), 4)
+        self.sprint.refresh_from_db()
+        self.assertEqual(self.sprint.completed_tasks_count, 1)
+
+
+class SprintAutofillTests(APITestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='plan_owner', email='po@test.com', password='123')
+        self.dev = User.objects.create_user(username='plan_dev', email='pd@test.com', password='123')
+        self.project = Project.objects.create(name="Plan Project", key="PLN", owner=self.owner)
+        ProjectMember.objects.create(project=self.project, user=self.owner, role='owner')
+        ProjectMember.objects.create(project=self.project, user=self.dev, role='developer')
+        self.sprint = Sprint.objects.create(
+            project=self.project, name="Sprint 1", start_date="2026-03-01", end_date="2026-03-15"
+        )
+        self.url = f'/api/v1/planning/{self.sprint.id}/'
+        self.client.force_authenticate(user=self.owner)
+
+        def backlog(title, priority, hours, assignee=None):
+            return Task.objects.create(
+                project=self.project, title=title, reporter=self.owner,
+                priority=priority, estimated_hours=hours, assignee=assignee
+            )
+
+        self.critical = backlog("Critical", Task.PRIORITY_CRITICAL, 6)
+        self.high_dev = backlog("High dev", Task.PRIORITY_HIGH, 5, assignee=self.dev)
+        self.low = backlog("Low", Task.PRIORITY_LOW, 4)
+        self.too_big = backlog("Too big", Task.PRIORITY_HIGH, 50)
+        self.unestimated = backlog("No estimate", Task.PRIORITY_CRITICAL, None)
+
+    def test_capacity_and_autofill_dry_run_then_apply(self):
+        """Автозаповнення підбирає задачі під ємність, dry_run нічого не змінює"""
+        response = self.client.post(
+            f'{self.url}capacity/', [{"user": self.owner.id, "hours": 8}, {"user": self.dev.id, "hours": 4}],
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+        response = self.client.post(f'{self.url}autofill/', {"dry_run": True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        planned_ids = [task['id'] for task in response.data['tasks']]
+        # 12 год: Critical (6) влазить, High dev (5) не влазить у 4 год розробника, Low (4) добирає залишок
+        self.assertEqual(planned_ids, [self.critical.id, self.low.id])
+        self.assertEqual(response.data['planned_hours'], 10)
+        self.assertIn(self.unestimated.id, response.data['unestimated_task_ids'])
+        self.assertFalse(Task.objects.filter(sprint=self.sprint).exists())
+
+        response = self.client.post(f'{self.url}autofill/', {}, format='json')
+        self.assertEqual(response.data['assigned_tasks'], 2)
+        self.assertEqual(set(Task.objects.filter(sprint=self.sprint).values_list('id', flat=True)), set(planned_ids))
+        self.assertEqual(TaskHistoryEvent.objects.filter(task_id__in=planned_ids).count(), 2)
+
+    def test_autofill_skips_tasks_taken_meanwhile_and_refreshes_workload(self):
+        """Задача, яку взяли в інший спринт після планування, не переноситься і не логується"""
+        other_sprint = Sprint.objects.create(
+            project=self.project, name="Sprint 2", start_date="2026-03-16", end_date="2026-03-30"
+        )
+        plan = {'tasks': [{'id': self.critical.id}, {'id': self.high_dev.id}]}
+        get_workload([self.dev.id])
+        Task.objects.filter(pk=self.critical.pk).update(sprint=other_sprint)
+
+        with patch('planning.views.build_autofill_plan', return_value=plan):
+            response = self.client.post(f'{self.url}autofill/', {}, format='json')
+
+        self.assertEqual(response.data['assigned_tasks'], 1)
+        self.assertEqual(Task.objects.get(pk=self.critical.pk).sprint_id, other_sprint.id)
+        self.assertEqual(list(TaskHistoryEvent.objects.values_list('task_id', flat=True)), [self.high_dev.id])
+        self.assertIsNone(cache.get(_workload_key(self.dev.id)))
+
+    def test_capacity_rejects_non_members(self):
+        """Ємність можна задати лише учасникам проєкту"""
+        stranger = User.objects.create_user(username='stranger', email='st@test.com', password='123')
+        response = self.client.post(f'{self.url}capacity/', [{"user": stranger.id, "hours": 8}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,16 +1,30 @@
 from rest_framework import viewsets, permissions
-from .models import Sprint
+from .models import Sprint, SprintCapacity
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
-from django.db import transaction
+from django.db import transaction, connection
+from django.db.models import Count, Q, Sum, Value, FloatField
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from tasks.models import Task
-from .serializers import SprintSerializer, SprintCompleteSerializer
+from tasks.models import Task, TaskHistoryEvent
+from projects.models import ProjectMember
+from projects.membership import get_member_project_ids
+from analytics.workload import invalidate_workload
+from notifications.tasks import create_notifications_batch_async
+from .serializers import (
+    SprintSerializer, SprintCompleteSerializer, SprintCapacitySerializer, SprintAutofillSerializer
+)
+from .autofill import build_autofill_plan
 from rest_framework.exceptions import PermissionDenied
 from projects.permissions import IsProjectOwnerOrAdmin
 from Core.pagination import CoreCursorPagination
-class SprintViewSet(viewsets.ModelViewSet):
+from Core.sparse_fields import SparseQuerysetMixin
+from Core.conditional import ConditionalRequestMixin, bump_versions
+from sync.changelog import record_changes
+from sync.models import ChangeLogEntry
+
+class SprintViewSet(ConditionalRequestMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     CRUD для спринтів.
     GET /planning/ -> Список спринтів (моїх проєктів).
@@ -30,14 +44,22 @@ class SprintViewSet(viewsets.ModelViewSet):
         user = self.request.user
 
         # 1. Базова фільтрація: тільки мої проєкти
-        queryset = Sprint.objects.filter(project__members__user=user).distinct()
+        queryset = Sprint.objects.filter(project_id__in=get_member_project_ids(user.id))
+
+        # Лічильники задач рахуються в тому ж SQL-запиті (без N+1 у SprintSerializer);
+        # з ?fields= без лічильників GROUP BY не потрібен
+        if self.sparse_wants('tasks_total_count', 'tasks_completed_count'):
+            queryset = queryset.annotate(
+                tasks_total_count=Count('tasks'),
+                tasks_completed_count=Count('tasks', filter=Q(tasks__status=Task.STATUS_DONE)),
+            )
 
         # 2. Додаткова фільтрація: якщо в URL передали ?project=5
         project_id = self.request.query_params.get('project')
         if project_id:
             queryset = queryset.filter(project_id=project_id)
 
-        return queryset
+        return self.narrow_queryset(queryset)
 
     # Захист створення: Тільки власник проєкту може планувати нові спринти
     def perform_create(self, serializer):
@@ -108,21 +130,188 @@ class SprintViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-        # Транзакція гарантує, що задачі та статус спринту оновляться СИНХРОННО
+        # Транзакція гарантує, що задачі, історія та статус спринту оновляться СИНХРОННО
         with transaction.atomic():
-            # 1. Завершує поточний спринт і ставимо реальну дату
+            # Повторна перевірка під блокуванням рядка: з двох паралельних завершень проходить одне,
+            # друге не перезапише знімок метрик і не продублює історію
+            sprint = Sprint.objects.select_for_update().get(pk=sprint.pk)
+            if sprint.status != 'active':
+                return Response(
+                    {"detail": "Завершити можна лише активний спринт."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            now = timezone.now()
+
+            # 1. Знімок фінальних метрик спринту (один агрегований запит)
+            metrics = Task.objects.filter(sprint=sprint).aggregate(
+                committed_tasks=Count('id'),
+                completed_tasks=Count('id', filter=Q(status=Task.STATUS_DONE)),
+                committed_hours=Coalesce(Sum('estimated_hours'), Value(0.0), output_field=FloatField()),
+                completed_hours=Coalesce(
+                    Sum('estimated_hours', filter=Q(status=Task.STATUS_DONE)), Value(0.0), output_field=FloatField()
+                ),
+            )
+
+            # 2. Завершує поточний спринт і ставить реальну дату
             sprint.status = 'completed'
-            sprint.actual_end_date = timezone.now().date()
+            sprint.actual_end_date = now.date()
+            sprint.committed_tasks_count = metrics['committed_tasks']
+            sprint.completed_tasks_count = metrics['completed_tasks']
+            sprint.committed_hours = metrics['committed_hours']
+            sprint.completed_hours = metrics['completed_hours']
             sprint.save()
 
-            # 2. Знаходить всі НЕвиконані задачі (статус НЕ 'done')
-            unfinished_tasks = Task.objects.filter(sprint=sprint).exclude(status='done')
+            # 3. Записує історію для всіх НЕвиконаних задач одним INSERT ... SELECT
+            _insert_sprint_move_history(sprint, next_sprint, request.user, now)
+
+            # 4. Переносить задачі масовим оновленням (bulk update - працює дуже швидко)
+            # updated_at оновлюється вручну, бо update() не викликає auto_now
+            moved_ids = list(
+                Task.objects.filter(sprint=sprint).exclude(status=Task.STATUS_DONE).values_list('id', flat=True)
+            )
+            moved_count = Task.objects.filter(id__in=moved_ids).update(sprint=next_sprint, updated_at=now)
+            # update() не викликає сигналів — лічильники обох спринтів і задачі для синхронізації
+            bump_versions(Sprint, [sprint.id, next_sprint and next_sprint.id])
+            record_changes(ChangeLogEntry.ENTITY_TASK, [(task_id, sprint.project_id) for task_id in moved_ids])
 
-            # 3. Переносить задачі масовим оновленням (bulk update - працює дуже швидко)
-            if next_sprint:
-                unfinished_tasks.update(sprint=next_sprint)
-            else:
-                unfinished_tasks.update(sprint=None)  # Відправляє в Backlog
+            # 5. Одне згорнуте сповіщення команді (після коміту)
+            _notify_sprint_completed(sprint, next_sprint, moved_count)
 
         action_msg = "задачі перенесено у новий спринт." if next_sprint else "задачі повернуто у Backlog."
-        return Response({"detail": f"Спринт успішно завершено, {action_msg}"}, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(
+            {
+                "detail": f"Спринт успішно завершено, {action_msg}",
+                "moved_tasks": moved_count,
+                "metrics": metrics,
+            },
+            status=status.HTTP_200_OK
+        )
+
+
+    @action(detail=True, methods=['get', 'post'])
+    def capacity(self, request, pk=None):
+        """
+        Ємність команди на спринт.
+        GET /api/v1/planning/{id}/capacity/ -> Години кожного учасника.
+        POST /api/v1/planning/{id}/capacity/ -> [{"user": 1, "hours": 30}, ...] (створює або оновлює).
+        """
+        sprint = self.get_object()
+
+        if request.method == 'POST':
+            serializer = SprintCapacitySerializer(data=request.data, many=True)
+            serializer.is_valid(raise_exception=True)
+
+            member_ids = set(
+                ProjectMember.objects.filter(project_id=sprint.project_id).values_list('user_id', flat=True)
+            )
+            outsiders = [item['user'].id for item in serializer.validated_data if item['user'].id not in member_ids]
+            if outsiders:
+                return Response(
+                    {"detail": f"Користувачі {outsiders} не є учасниками проєкту."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            SprintCapacity.objects.bulk_create(
+                [SprintCapacity(sprint=sprint, user=item['user'], hours=item['hours'])
+                 for item in serializer.validated_data],
+                update_conflicts=True,
+                unique_fields=['sprint', 'user'],
+                update_fields=['hours'],
+            )
+
+        capacities = sprint.capacities.select_related('user').order_by('user__username')
+        return Response(SprintCapacitySerializer(capacities, many=True).data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'])
+    def autofill(self, request, pk=None):
+        """
+        Автозаповнення спринту задачами з Backlog під ємність команди.
+        POST /api/v1/planning/{id}/autofill/  {"dry_run": true} -> лише план без змін.
+        """
+        sprint = self.get_object()
+
+        if sprint.status == 'completed':
+            return Response(
+                {"detail": "Неможливо заповнити завершений спринт."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = SprintAutofillSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        dry_run = serializer.validated_data['dry_run']
+
+        with transaction.atomic():
+            # Блокує спринт, щоб два паралельні автозаповнення не перевищили ємність
+            Sprint.objects.select_for_update().filter(pk=sprint.pk).first()
+            plan = build_autofill_plan(sprint)
+
+            if not dry_run and plan['tasks']:
+                now = timezone.now()
+                # Блокує задачі плану, які досі в Backlog: ті, що встигли взяти в інший спринт,
+                # не переносяться і не потрапляють в історію та журнал змін
+                matched = list(
+                    Task.objects.select_for_update()
+                    .filter(id__in=[task['id'] for task in plan['tasks']], sprint__isnull=True)
+                    .values_list('id', 'assignee_id')
+                )
+                task_ids = [task_id for task_id, _ in matched]
+                assigned = Task.objects.filter(id__in=task_ids).update(sprint=sprint, updated_at=now)
+                # update() не викликає сигналів — кеш навантаження виконавців скидається явно
+                invalidate_workload([assignee_id for _, assignee_id in matched])
+                bump_versions(Sprint, [sprint.id])
+                record_changes(ChangeLogEntry.ENTITY_TASK, [(task_id, sprint.project_id) for task_id in task_ids])
+                TaskHistoryEvent.objects.bulk_create([
+                    TaskHistoryEvent(
+                        task_id=task_id,
+                        actor=request.user,
+                        action_type="task_updated",
+                        changes={"sprint": {"old_value": None, "new_value": sprint.id}},
+                    )
+                    for task_id in task_ids
+                ])
+                plan['assigned_tasks'] = assigned
+
+        plan['dry_run'] = dry_run
+        return Response(plan, status=status.HTTP_200_OK)
+
+
+def _insert_sprint_move_history(sprint, next_sprint, actor, timestamp):
+    """
+    Set-based запис історії: одна подія на кожну незавершену задачу спринту
+    одним запитом INSERT ... SELECT (без завантаження задач у Python).
+    """
+    history_table = connection.ops.quote_name(TaskHistoryEvent._meta.db_table)
+    task_table = connection.ops.quote_name(Task._meta.db_table)
+
+    changes = {"sprint": {"old_value": sprint.id, "new_value": next_sprint.id if next_sprint else None}}
+    # Підготовка значень засобами полів моделі (jsonb для PostgreSQL, текст для SQLite)
+    changes_value = TaskHistoryEvent._meta.get_field('changes').get_db_prep_save(changes, connection)
+    timestamp_value = TaskHistoryEvent._meta.get_field('timestamp').get_db_prep_save(timestamp, connection)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {history_table} (task_id, actor_id, action_type, changes, timestamp) "
+            f"SELECT id, %s, %s, %s, %s FROM {task_table} WHERE sprint_id = %s AND status <> %s",
+            [actor.id, "task_updated", changes_value, timestamp_value, sprint.id, Task.STATUS_DONE]
+        )
+
+
+def _notify_sprint_completed(sprint, next_sprint, moved_count):
+    """Одне сповіщення кожному учаснику проєкту одним Celery-повідомленням."""
+    target = f"у спринт '{next_sprint.name}'" if next_sprint else "у Backlog"
+    message = (
+        f"Спринт '{sprint.name}' завершено: виконано {sprint.completed_tasks_count} з "
+        f"{sprint.committed_tasks_count} задач. {moved_count} задач перенесено {target}."
+    )
+    items = [
+        {
+            'user_id': user_id,
+            'title': "Спринт завершено",
+            'message': message,
+            'notif_type': 'success',
+            'dedup_key': f"sprint_completed:{sprint.id}:{user_id}",
+        }
+        for user_id in ProjectMember.objects.filter(project_id=sprint.project_id).values_list('user_id', flat=True)
+    ]
+    if items:
+        transaction.on_commit(lambda: create_notifications_batch_async.delay(items))
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from Core.profiling import record_cache
+from .models import Project
+
+MEMBERSHIP_KEY_PREFIX = 'membership:user'
+
+
+def _membership_key(user_id):
+    return f"{MEMBERSHIP_KEY_PREFIX}:{user_id}"
+
+
+def get_member_project_ids(user_id):
+    """
+    Повертає множину ID проєктів, до яких юзер має доступ (власник або учасник).
+    Карта береться з кешу; при промаху — один запит у БД.
+    """
+    key = _membership_key(user_id)
+    project_ids = cache.get(key)
+    record_cache(hits=int(project_ids is not None), misses=int(project_ids is None))
+    if project_ids is None:
+        project_ids = list(
+            Project.objects.filter(Q(owner_id=user_id) | Q(members__user_id=user_id))
+            .values_list('id', flat=True).distinct()
+        )
+        cache.set(key, project_ids, settings.MEMBERSHIP_CACHE_TTL)
+    return set(project_ids)
+
+
+def invalidate_membership(user_ids):
+    """Скидає карту доступу зачеплених юзерів (одразу і після коміту)."""
+    keys = [_membership_key(user_id) for user_id in set(user_ids) if user_id]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
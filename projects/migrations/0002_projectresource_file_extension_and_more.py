@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectresource',
+            name='file_extension',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20, verbose_name='Розширення'),
+        ),
+        migrations.AddField(
+            model_name='projectresource',
+            name='file_size',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='Розмір (байт)'),
+        ),
+        migrations.AddField(
+            model_name='projectresource',
+            name='mime_type',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100, verbose_name='MIME-тип'),
+        ),
+        migrations.AddField(
+            model_name='projectresource',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=64, verbose_name='SHA-256'),
+        ),
+    ]
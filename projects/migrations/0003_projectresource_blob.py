@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_projectresource_file_extension_and_more'),
+        ('uploads', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectresource',
+            name='blob',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='uploads.fileblob'),
+        ),
+    ]
@@ -1,7 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 # можна буде додати переклад
 from django.utils.translation import gettext_lazy as _
+from Core.files import fill_file_metadata, METADATA_FIELDS
+from uploads.blobs import link_blob
 
 
 class Project(models.Model):
@@ -36,6 +38,9 @@ class Project(models.Model):
         (PRIORITY_CRITICAL, 'Critical'),
     ]
 
+    # Поля, які показуються в задачах проєкту — зміна оновлює їх ETag
+    DISPLAY_FIELDS = ('key', 'name')
+
     # --- Основні поля ---
     key = models.CharField(max_length=10, unique=True, verbose_name="Project Key (ID)",
                            help_text="Унікальний ключ, напр. MYPRJ")
@@ -63,6 +68,13 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запам'ятовує стан з БД (сигнали порівнюють попереднього власника без повторного запиту)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     def __str__(self):
         return f"[{self.key}] {self.name}"
 
@@ -115,8 +127,36 @@ class ProjectResource(models.Model):
     url = models.URLField(blank=True, null=True, verbose_name="URL")
     file = models.FileField(upload_to='project_resources/', blank=True, null=True, verbose_name="Файл")
 
+    # Метадані файлу рахуються один раз при завантаженні (Core/files.py), а не при серіалізації
+    file_size = models.BigIntegerField(null=True, blank=True, editable=False, verbose_name="Розмір (байт)")
+    file_extension = models.CharField(max_length=20, blank=True, default='', editable=False, verbose_name="Розширення")
+    mime_type = models.CharField(max_length=100, blank=True, default='', editable=False, verbose_name="MIME-тип")
+    sha256 = models.CharField(max_length=64, blank=True, default='', editable=False, db_index=True, verbose_name="SHA-256")
+    # Спільний вміст (uploads.FileBlob): file вказує на файл блоба, однакові файли не дублюються
+    blob = models.ForeignKey(
+        'uploads.FileBlob', on_delete=models.PROTECT, null=True, blank=True, editable=False, related_name='+'
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Попередній blob_id потрібен сигналам лічильника посилань (uploads/signals.py)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Блоб лишається заблокованим, доки вкладення і лічильник посилань не збережено
+        with transaction.atomic():
+            if fill_file_metadata(self):
+                link_blob(self)
+                if kwargs.get('update_fields') is not None:
+                    kwargs['update_fields'] = {*kwargs['update_fields'], *METADATA_FIELDS, 'file', 'blob'}
+            elif not self.file:
+                self.blob = None
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.name} ({self.resource_type})"
 
@@ -0,0 +1,8 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def project_count_subquery(queryset):
+    """Підзапит COUNT(*) по проєкту (щоб не множити рядки JOIN-ами з різних таблиць)."""
+    counted = queryset.filter(project=OuterRef('pk')).order_by().values('project').annotate(c=Count('pk')).values('c')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
@@ -1,15 +1,31 @@
 from rest_framework import serializers
+from rest_framework.reverse import reverse
 from .models import Project, ProjectMember, ProjectResource, ProjectMilestone
 from django.contrib.auth import get_user_model
+from Core.object_cache import CachedRelationsListSerializer
+from Core.sparse_fields import SparseFieldsetMixin
 
 User = get_user_model()
 
 # --- Допоміжні серіалізатори (для вкладеності) ---
 
 class ProjectResourceSerializer(serializers.ModelSerializer):
+    # Захищене завантаження з перевіркою членства (Core/media_serving.py)
+    download_url = serializers.SerializerMethodField()
+
     class Meta:
         model = ProjectResource
-        fields = ['id', 'name', 'resource_type', 'url', 'file', 'created_at']
+        fields = [
+            'id', 'name', 'resource_type', 'url', 'file', 'download_url',
+            'file_size', 'file_extension', 'mime_type', 'created_at'
+        ]
+        # file тільки приймається: підписаний URL сховища відкривався б без перевірки доступу
+        extra_kwargs = {'file': {'write_only': True}}
+
+    def get_download_url(self, obj):
+        if not obj.file:
+            return None
+        return reverse('project-resource-download', args=[obj.pk], request=self.context.get('request'))
 
 
 class ProjectMilestoneSerializer(serializers.ModelSerializer):
@@ -60,7 +76,7 @@ class AddProjectMemberSerializer(serializers.Serializer):
 
 # --- Головний серіалізатор Проєкту ---
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     # Підключає вкладені списки (тільки для читання)
     members = ProjectMemberSerializer(many=True, read_only=True)
     resources = ProjectResourceSerializer(many=True, read_only=True)
@@ -81,6 +97,14 @@ class ProjectSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['owner', 'created_at', 'updated_at']
+        # Власник підтягується з кешу об'єктів замість JOIN у агрегованому запиті списку
+        list_serializer_class = CachedRelationsListSerializer
+        cached_relations = ['owner']
+        # Анотації, які читають SerializerMethodField (для ?fields=)
+        field_sources = {
+            'activeTasksCount': ['active_tasks'],
+            'progress': ['total_tasks', 'completed_tasks'],
+        }
 
     def get_activeTasksCount(self, obj):
         # Якщо запит йде з get_queryset, де зроблено оптимізований annotate
@@ -102,6 +126,34 @@ class ProjectSerializer(serializers.ModelSerializer):
             return 0.0
         return round(completed / total, 2)  # Повертає дробове значення 0.0 - 1.0
 
+class ProjectListSerializer(ProjectSerializer):
+    """
+    Компактне представлення проєкту для списку: лічильники замість вкладених масивів.
+    Вкладені списки додаються тільки на запит: ?expand=members,milestones,resources.
+    """
+    members = None
+    resources = None
+    milestones = None
+
+    members_count = serializers.IntegerField(read_only=True)
+    milestones_count = serializers.IntegerField(read_only=True)
+    resources_count = serializers.IntegerField(read_only=True)
+
+    class Meta(ProjectSerializer.Meta):
+        fields = [
+            'id', 'key', 'name', 'status', 'priority', 'start_date', 'end_date',
+            'owner', 'owner_email',
+            'members_count', 'milestones_count', 'resources_count',
+            'activeTasksCount', 'progress',
+            'created_at', 'updated_at'
+        ]
+        expandable = {
+            'members': lambda: ProjectMemberSerializer(many=True, read_only=True),
+            'milestones': lambda: ProjectMilestoneSerializer(many=True, read_only=True),
+            'resources': lambda: ProjectResourceSerializer(many=True, read_only=True),
+        }
+
+
 class ProjectCreateSerializer(serializers.ModelSerializer):
     """
     Окремий серіалізатор для створення, щоб не вимагати зайвих полів.
@@ -0,0 +1,30 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.contrib.auth import get_user_model
+from Core.conditional import track_collection, track_display_fields
+from .models import Project, ProjectMember, ProjectResource, ProjectMilestone
+from .membership import invalidate_membership
+
+
+@receiver([post_save, post_delete], sender=ProjectMember)
+def invalidate_member_access(sender, instance, **kwargs):
+    invalidate_membership([instance.user_id])
+
+
+@receiver([post_save, post_delete], sender=Project)
+def invalidate_owner_access(sender, instance, **kwargs):
+    # При зміні власника доступ втрачає і попередній власник
+    previous_owner_id = getattr(instance, '_loaded_values', {}).get('owner_id')
+    invalidate_membership([instance.owner_id, previous_owner_id])
+
+
+# Вкладені списки проєкту (ETag деталей проєкту)
+track_collection(ProjectMember, Project, 'project_id')
+track_collection(ProjectResource, Project, 'project_id')
+track_collection(ProjectMilestone, Project, 'project_id')
+# Назва і ключ проєкту показуються в задачах
+track_display_fields(Project, Project.DISPLAY_FIELDS)
+# Ім'я та email учасника показуються у вкладеному списку учасників проєкту
+track_display_fields(get_user_model(), get_user_model().DISPLAY_FIELDS, dependents=[
+    (Project, lambda user: ProjectMember.objects.filter(user_id=user.pk).values_list('project_id', flat=True)),
+])
@@ -1,7 +1,7 @@
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from projects.models import Project
+from projects.models import Project, ProjectMember, ProjectMilestone
 
 User = get_user_model()
 
@@ -49,4 +49,28 @@ class ProjectAPITests(APITestCase):
         self.client.force_authenticate(user=self.dev)
         response_get = self.client.get(url_get)
 
-        self.assertEqual(response_get.status_code, status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+        self.assertEqual(response_get.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_is_compact_and_expand_keeps_queries_flat(self):
+        """Список без вкладених масивів; ?expand додає їх без N+1"""
+        for i in range(3):
+            project = Project.objects.create(name=f"Beta {i}", key=f"BET{i}", owner=self.owner)
+            ProjectMember.objects.create(project=project, user=self.owner, role='owner')
+            ProjectMember.objects.create(project=project, user=self.dev, role='member')
+            ProjectMilestone.objects.create(project=project, name="MVP", deadline="2026-06-01")
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get('/api/v1/projects/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        beta = next(p for p in response.data['results'] if p['key'] == 'BET0')
+        self.assertNotIn('members', beta)
+        self.assertEqual(beta['members_count'], 2)
+        self.assertEqual(beta['milestones_count'], 1)
+
+        # Кеш прогрітий першим запитом: проєкти + учасники + етапи = 3 запити незалежно від кількості проєктів
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/v1/projects/?expand=members,milestones')
+        beta = next(p for p in response.data['results'] if p['key'] == 'BET0')
+        self.assertEqual({m['user_email'] for m in beta['members']}, {'owner@test.com', 'dev@test.com'})
+        self.assertEqual(beta['milestones'][0]['name'], "MVP")
+        self.assertNotIn('resources', beta)
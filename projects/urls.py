@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProjectViewSet
+from .views import ProjectViewSet, ProjectResourceDownloadView
 
 # Router автоматично створить URL:
 # GET /projects/
@@ -10,5 +10,6 @@ router = DefaultRouter()
 router.register(r'', ProjectViewSet, basename='project')
 
 urlpatterns = [
+    path('resources/<int:pk>/download/', ProjectResourceDownloadView.as_view(), name='project-resource-download'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
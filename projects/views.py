@@ -1,29 +1,43 @@
 import csv
-from django.db.models import Q, Count
+from django.db.models import Q, Count, Prefetch
 from rest_framework import viewsets, permissions, status, filters
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.exceptions import NotFound
+from rest_framework.views import APIView
 from django.db import transaction
-from .models import Project, ProjectMember
-from .serializers import ProjectSerializer, ProjectCreateSerializer, AddProjectMemberSerializer
+from .models import Project, ProjectMember, ProjectResource, ProjectMilestone
+from .serializers import (
+    ProjectSerializer, ProjectListSerializer, ProjectCreateSerializer, AddProjectMemberSerializer
+)
+from .membership import get_member_project_ids
+from .querysets import project_count_subquery
 from rest_framework.decorators import action
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
 from django.http import HttpResponse
+from django.utils import timezone
 from .permissions import IsProjectOwnerOrAdmin
 from Core.pagination import CoreCursorPagination
+from Core.sparse_fields import SparseQuerysetMixin, parse_expand
+from Core.conditional import ConditionalRequestMixin
+from Core.media_serving import serve_resource_file
+from sync.changelog import record_changes
+from sync.models import ChangeLogEntry
 
 User = get_user_model()
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ConditionalRequestMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     Повний CRUD для проєктів.
     GET /projects/ -> Список проєктів, де я учасник.
     POST /projects/ -> Створити новий.
-    GET, PATCH, PUT /projects/{id}/ -> Деталі.
+    GET, PATCH, PUT /projects/{id}/ -> Деталі (ETag / If-None-Match / If-Match).
     """
     permission_classes = [permissions.IsAuthenticated, IsProjectOwnerOrAdmin]
     pagination_class = CoreCursorPagination
+    # Email власника входить у представлення (ETag)
+    related_versions = {'owner_id': User}
 
     # 1. Підключає "двигуни" фільтрації
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -37,29 +51,73 @@ class ProjectViewSet(viewsets.ModelViewSet):
     # ?ordering=-due_date (спочатку термінові)
     ordering_fields = ['name', 'priority', 'start_date', 'due_date']
 
+    # Пакетне завантаження вкладених списків (тільки поля, потрібні серіалізаторам)
+    PREFETCHES = {
+        'members': Prefetch(
+            'members',
+            queryset=ProjectMember.objects.select_related('user').only(
+                'id', 'project_id', 'role', 'joined_at',
+                'user__id', 'user__email', 'user__first_name', 'user__last_name'
+            )
+        ),
+        'milestones': Prefetch('milestones'),
+        'resources': Prefetch('resources'),
+    }
+
+    # Агрегати задач (рахуються тільки якщо їх читає серіалізатор або фільтр)
+    TASK_AGGREGATES = {
+        'total_tasks': Count('tasks', distinct=True),
+        'active_tasks': Count('tasks', filter=~Q(tasks__status='done'), distinct=True),
+        'completed_tasks': Count('tasks', filter=Q(tasks__status='done'), distinct=True),
+    }
+
+    # Лічильники вкладених списків для компактного списку
+    LIST_COUNTS = {
+        'members_count': ProjectMember,
+        'milestones_count': ProjectMilestone,
+        'resources_count': ProjectResource,
+    }
+
     def get_queryset(self):
         """
         Логіка видимості проєктів.
         """
         user = self.request.user
+        params = self.request.query_params
 
-        # Існуючі оптимізації (Big O(1) SQL агрегація)
-        queryset = Project.objects.select_related('owner').prefetch_related('members').annotate(
-            total_tasks=Count('tasks', distinct=True),
-            active_tasks=Count('tasks', filter=~Q(tasks__status='done'), distinct=True),
-            completed_tasks=Count('tasks', filter=Q(tasks__status='done'), distinct=True)
-        )
+        # Існуючі оптимізації (Big O(1) SQL агрегація).
+        # З ?fields= рахуються тільки агрегати, потрібні вибраним полям або фільтрам списку
+        aggregates = {name for name in self.TASK_AGGREGATES if self.sparse_wants(name)}
+        if self.action == 'list':
+            if params.get('has_active_tasks'):
+                aggregates.add('active_tasks')
+            if params.get('is_completed'):
+                aggregates.update({'total_tasks', 'completed_tasks'})
+        queryset = Project.objects.annotate(**{
+            name: expression for name, expression in self.TASK_AGGREGATES.items() if name in aggregates
+        })
+
+        if self.action == 'list':
+            # Список: лічильники підзапитами + тільки запитані через ?expand вкладені списки.
+            # Власник береться з кешу об'єктів (ProjectListSerializer)
+            queryset = queryset.annotate(**{
+                name: project_count_subquery(model.objects.all())
+                for name, model in self.LIST_COUNTS.items() if self.sparse_wants(name)
+            })
+            expand = parse_expand(self.request, ProjectListSerializer.Meta.expandable)
+            queryset = queryset.prefetch_related(*[self.PREFETCHES[name] for name in expand])
+        else:
+            # Деталі: всі вкладені списки пакетно (по одному запиту на зв'язок)
+            queryset = queryset.select_related('owner').prefetch_related(*self.PREFETCHES.values())
 
         # 1. Логіка "Хто бачить?"
         if user.is_staff or user.is_superuser:
             # Адмін бачить ВСІ проєкти в системі
             pass
         else:
-            # Використовує Q, щоб гарантувати доступ власнику,
-            # навіть якщо він випадково зник з списку members.
-            queryset = queryset.filter(
-                Q(owner=user) | Q(members__user=user)
-            ).distinct()
+            # Карта доступу (власник або учасник) з кешу — гарантує доступ власнику,
+            # навіть якщо він випадково зник з списку members, і не потребує JOIN + DISTINCT
+            queryset = queryset.filter(pk__in=get_member_project_ids(user.id))
 
         # 2. Логіка фільтрації списк
         # ВАЖЛИВА ЗМІНА: Ховає архів ТІЛЬКИ якщо це список (action == 'list').
@@ -98,12 +156,14 @@ class ProjectViewSet(viewsets.ModelViewSet):
                 elif is_completed.lower() == 'false':
                     queryset = queryset.exclude(completed_condition)
 
-        return queryset
+        return self.narrow_queryset(queryset)
 
     def get_serializer_class(self):
         # Для створення використовується спрощений серіалізатор
         if self.action == 'create':
             return ProjectCreateSerializer
+        if self.action == 'list':
+            return ProjectListSerializer
         return ProjectSerializer
 
     def perform_create(self, serializer):
@@ -190,8 +250,10 @@ class ProjectViewSet(viewsets.ModelViewSet):
             assignee_id=user_id
         ).exclude(status=Task.STATUS_DONE)
 
-        # Очищає поле assignee
-        updated_count = user_tasks.update(assignee=None)
+        # Очищає поле assignee (updated_at вручну — update() не викликає auto_now)
+        task_ids = list(user_tasks.values_list('id', flat=True))
+        updated_count = Task.objects.filter(id__in=task_ids).update(assignee=None, updated_at=timezone.now())
+        record_changes(ChangeLogEntry.ENTITY_TASK, [(task_id, project.id) for task_id in task_ids])
         # ----------------------------------------------------
 
         # 3. Видаляє учасника
@@ -209,7 +271,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         Ендпоінт: GET /api/v1/projects/{id}/export_tasks/
         """
         project = self.get_object()  # Отримує поточний проєкт
-        tasks = project.tasks.all()  # Дістає всі задачі
+        tasks = project.tasks.select_related('assignee')  # Дістає всі задачі разом з виконавцями
 
         # Створює HTTP-відповідь спеціально для файлу
         response = HttpResponse(content_type='text/csv')
@@ -234,3 +296,24 @@ class ProjectViewSet(viewsets.ModelViewSet):
             ])
 
         return response
+
+
+class ProjectResourceDownloadView(APIView):
+    """
+    Захищене завантаження матеріалу проєкту: GET /api/v1/projects/resources/{id}/download/
+    Доступ перевіряється за кешованою картою членства.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        resource = (
+            ProjectResource.objects.filter(pk=pk, resource_type=ProjectResource.TYPE_FILE)
+            .only('project_id', 'file', 'name', 'mime_type', 'sha256', 'created_at')
+            .first()
+        )
+        user = request.user
+        if resource is None or not resource.file or not (
+            user.is_staff or user.is_superuser or resource.project_id in get_member_project_ids(user.id)
+        ):
+            raise NotFound()
+        return serve_resource_file(request, resource)
@@ -0,0 +1,7 @@
+from django.contrib import admin
+from .models import ChangeLogEntry
+
+@admin.register(ChangeLogEntry)
+class ChangeLogEntryAdmin(admin.ModelAdmin):
+    list_display = ('id', 'entity', 'object_id', 'project_id', 'is_deleted', 'created_at')
+    list_filter = ('entity', 'is_deleted')
@@ -0,0 +1,22 @@
+from .models import ChangeLogEntry
+
+
+def record_change(entity, object_id, project_id, deleted=False, user_id=None):
+    """Додає запис у журнал змін (див. record_changes)."""
+    record_changes(entity, [(object_id, project_id)], deleted=deleted, user_id=user_id)
+
+
+def record_changes(entity, rows, deleted=False, user_id=None):
+    """
+    Записує зміни [(object_id, project_id), ...] одним INSERT у поточній транзакції:
+    запис комітиться (або відкочується) разом зі зміною, тож журнал не втрачає змін
+    через збій між комітом і записом. Порядок id може розходитись з порядком комітів —
+    читач пропускає записи, молодші за SYNC_SETTLE_SECONDS.
+    """
+    entries = [
+        ChangeLogEntry(entity=entity, object_id=object_id, project_id=project_id, is_deleted=deleted, user_id=user_id)
+        for object_id, project_id in rows
+        if project_id is not None
+    ]
+    if entries:
+        ChangeLogEntry.objects.bulk_create(entries)
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('project_id', models.BigIntegerField(verbose_name='Проєкт')),
+                ('user_id', models.BigIntegerField(blank=True, null=True, verbose_name='Користувач')),
+                ('entity', models.CharField(choices=[('task', 'Задача'), ('comment', 'Коментар'), ('checklist_item', 'Пункт чекліста'), ('sprint', 'Спринт'), ('membership', 'Учасник проєкту')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('is_deleted', models.BooleanField(default=False, verbose_name='Надгробок')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Запис журналу змін',
+                'verbose_name_plural': 'Журнал змін',
+                'indexes': [models.Index(fields=['project_id', 'id'], name='changelog_project_seq_idx'), models.Index(condition=models.Q(('user_id__isnull', False)), fields=['user_id', 'id'], name='changelog_user_seq_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import models
+from django.db.models import Q
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Журнал змін для дельта-синхронізації клієнтів (лише додавання).
+    id — монотонна послідовність, яка слугує курсором ?since=.
+    project_id і user_id — звичайні числа, а не FK: надгробки (is_deleted)
+    мають пережити видалення проєкту чи учасника.
+    """
+    ENTITY_TASK = 'task'
+    ENTITY_COMMENT = 'comment'
+    ENTITY_CHECKLIST_ITEM = 'checklist_item'
+    ENTITY_SPRINT = 'sprint'
+    ENTITY_MEMBERSHIP = 'membership'
+
+    ENTITY_CHOICES = [
+        (ENTITY_TASK, 'Задача'),
+        (ENTITY_COMMENT, 'Коментар'),
+        (ENTITY_CHECKLIST_ITEM, 'Пункт чекліста'),
+        (ENTITY_SPRINT, 'Спринт'),
+        (ENTITY_MEMBERSHIP, 'Учасник проєкту'),
+    ]
+
+    project_id = models.BigIntegerField(verbose_name="Проєкт")
+    # Для членства: кого стосується зміна (щоб виключений учасник теж отримав надгробок)
+    user_id = models.BigIntegerField(null=True, blank=True, verbose_name="Користувач")
+
+    entity = models.CharField(max_length=20, choices=ENTITY_CHOICES)
+    object_id = models.BigIntegerField()
+    is_deleted = models.BooleanField(default=False, verbose_name="Надгробок")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project_id', 'id'], name='changelog_project_seq_idx'),
+            models.Index(fields=['user_id', 'id'], name='changelog_user_seq_idx', condition=Q(user_id__isnull=False)),
+        ]
+        verbose_name = "Запис журналу змін"
+        verbose_name_plural = "Журнал змін"
+
+    def __str__(self):
+        action = "delete" if self.is_deleted else "upsert"
+        return f"#{self.id} {self.entity}:{self.object_id} {action}"
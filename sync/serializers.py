@@ -0,0 +1,13 @@
+from rest_framework import serializers
+from projects.serializers import ProjectMemberSerializer
+
+
+class SyncMembershipSerializer(ProjectMemberSerializer):
+    """Учасник проєкту для синхронізації: клієнту потрібен ще й ID проєкту."""
+
+    class Meta(ProjectMemberSerializer.Meta):
+        fields = ProjectMemberSerializer.Meta.fields + ['project']
+
+
+class SyncQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(required=False, min_value=0)
@@ -0,0 +1,64 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from projects.models import Project, ProjectMember
+from planning.models import Sprint
+from tasks.models import Task, TaskComment, TaskChecklistItem, TaskResource
+from .changelog import record_change
+from .models import ChangeLogEntry
+
+# Моделі, зміни яких потрапляють у журнал синхронізації
+SYNCED_MODELS = {
+    Task: ChangeLogEntry.ENTITY_TASK,
+    TaskComment: ChangeLogEntry.ENTITY_COMMENT,
+    TaskChecklistItem: ChangeLogEntry.ENTITY_CHECKLIST_ITEM,
+    Sprint: ChangeLogEntry.ENTITY_SPRINT,
+    ProjectMember: ChangeLogEntry.ENTITY_MEMBERSHIP,
+}
+
+
+def _project_id(instance):
+    if hasattr(instance, 'project_id'):
+        return instance.project_id
+    # Коментар / пункт чекліста / вкладення — проєкт їхньої задачі
+    if type(instance).task.is_cached(instance):
+        return instance.task.project_id
+    return Task.objects.filter(pk=instance.task_id).values_list('project_id', flat=True).first()
+
+
+def _deleted_with_parent(sender, origin):
+    """
+    Каскадне видалення разом із задачею або проєктом: клієнт прибирає дочірні об'єкти
+    сам за надгробком батька, тому окремі записи не потрібні.
+    """
+    origin_model = getattr(origin, 'model', None) or type(origin)
+    return origin is not None and origin_model is not sender and origin_model in (Task, Project)
+
+
+def _user_id(instance):
+    return instance.user_id if isinstance(instance, ProjectMember) else None
+
+
+@receiver(post_save)
+def log_synced_save(sender, instance, created, **kwargs):
+    entity = SYNCED_MODELS.get(sender)
+    if entity is not None:
+        record_change(entity, instance.pk, _project_id(instance), user_id=_user_id(instance))
+
+    # Новий коментар чи вкладення змінює лічильники в представленні задачі
+    if created and sender in (TaskComment, TaskResource):
+        record_change(ChangeLogEntry.ENTITY_TASK, instance.task_id, _project_id(instance))
+
+
+@receiver(post_delete)
+def log_synced_delete(sender, instance, origin=None, **kwargs):
+    entity = SYNCED_MODELS.get(sender)
+    if entity is None and sender is not TaskResource:
+        return
+    # Членство логується завжди: виключений учасник має дізнатися, що втратив доступ
+    if sender is not ProjectMember and _deleted_with_parent(sender, origin):
+        return
+
+    if entity is not None:
+        record_change(entity, instance.pk, _project_id(instance), deleted=True, user_id=_user_id(instance))
+    if sender in (TaskComment, TaskResource):
+        record_change(ChangeLogEntry.ENTITY_TASK, instance.task_id, _project_id(instance))
@@ -0,0 +1,37 @@
+from datetime import timedelta
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+from .models import ChangeLogEntry
+
+
+def prune_change_log(days=None, batch_size=None):
+    """
+    Видаляє записи журналу змін, старші за SYNC_LOG_RETENTION_DAYS, пачками.
+    Клієнти з курсором, старшим за журнал, отримають reset=true.
+    """
+    days = settings.SYNC_LOG_RETENTION_DAYS if days is None else days
+    batch_size = batch_size or settings.SYNC_CLEANUP_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=days)
+
+    deleted_total = 0
+    while True:
+        # Найстаріші записи на початку послідовності — читання йде за первинним ключем
+        ids = list(
+            ChangeLogEntry.objects.filter(created_at__lt=cutoff)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        deleted, _ = ChangeLogEntry.objects.filter(id__in=ids).delete()
+        deleted_total += deleted
+
+    return deleted_total
+
+
+@shared_task
+def prune_change_log_periodic():
+    """Періодична задача (Beat): обрізає журнал синхронізації."""
+    deleted = prune_change_log()
+    return f"Sync change log cleanup. Deleted {deleted} rows."
@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from projects.models import Project, ProjectMember
+from tasks.models import Task, TaskComment, TaskChecklistItem
+from .models import ChangeLogEntry
+
+User = get_user_model()
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class DeltaSyncTests(APITestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='sync_owner', email='sync_owner@test.com', password='123')
+        self.dev = User.objects.create_user(username='sync_dev', email='sync_dev@test.com', password='123')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project = Project.objects.create(name="Sync", key="SYN", owner=self.owner)
+            ProjectMember.objects.create(project=self.project, user=self.owner, role='owner')
+            self.membership = ProjectMember.objects.create(project=self.project, user=self.dev, role='member')
+            self.task = Task.objects.create(project=self.project, title="Синхронізація", reporter=self.owner)
+
+            # Чужий проєкт — його зміни не повинні потрапити у відповідь
+            stranger = User.objects.create_user(username='sync_other', email='sync_other@test.com', password='123')
+            other = Project.objects.create(name="Other", key="OTH", owner=stranger)
+            Task.objects.create(project=other, title="Чужа задача", reporter=stranger)
+
+    def _sync(self, since):
+        response = self.client.get('/api/v1/sync/', {'since': since})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_changes_since_cursor_with_tombstones(self):
+        self.client.force_authenticate(user=self.dev)
+        cursor = self._sync(0)['next']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            comment = TaskComment.objects.create(task=self.task, author=self.dev, content="Привіт")
+            item = TaskChecklistItem.objects.create(task=self.task, content="Тимчасовий пункт")
+            item_id = item.id
+            self.task.title = "Нова назва"
+            self.task.save()
+            item.delete()
+
+        data = self._sync(cursor)
+        self.assertFalse(data['reset'])
+        changes = data['changes']
+        # Задача змінювалась кілька разів, але повертається один раз (останній стан)
+        self.assertEqual([task['title'] for task in changes['task']['upserts']], ["Нова назва"])
+        self.assertEqual(changes['task']['upserts'][0]['comments_count'], 1)
+        self.assertEqual([c['id'] for c in changes['comment']['upserts']], [comment.id])
+        self.assertEqual(changes['checklist_item'], {'upserts': [], 'deletes': [item_id]})
+
+        # Наступний виклик з новим курсором — порожній
+        empty = self._sync(data['next'])
+        self.assertEqual(empty['changes'], {})
+        self.assertEqual(empty['next'], data['next'])
+
+    def test_removed_member_gets_membership_tombstone(self):
+        self.client.force_authenticate(user=self.dev)
+        self.assertTrue(self.client.get('/api/v1/sync/').data['reset'])
+        cursor = self._sync(0)['next']
+
+        membership_id = self.membership.id
+        with self.captureOnCommitCallbacks(execute=True):
+            self.membership.delete()
+            Task.objects.create(project=self.project, title="Вже не моя", reporter=self.owner)
+
+        changes = self._sync(cursor)['changes']
+        self.assertEqual(changes, {'membership': {'upserts': [], 'deletes': [membership_id]}})
+        # Зміни в проєкті журналюються, але колишньому учаснику вже не віддаються
+        self.assertTrue(
+            ChangeLogEntry.objects.filter(entity=ChangeLogEntry.ENTITY_TASK, project_id=self.project.id).exists()
+        )
+
+    def test_cursor_after_log_pruned_to_empty_requests_reset(self):
+        """Якщо очищення видалило весь журнал, старий курсор отримує reset, а не порожню дельту"""
+        self.client.force_authenticate(user=self.dev)
+        cursor = self._sync(0)['next']
+        ChangeLogEntry.objects.all().delete()
+
+        self.assertTrue(self._sync(cursor)['reset'])
+        self.assertFalse(self._sync(0)['reset'])
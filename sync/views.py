@@ -0,0 +1,126 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Count, Q, Min, Max, Prefetch
+from django.utils import timezone
+from rest_framework import permissions, views
+from rest_framework.response import Response
+from projects.membership import get_member_project_ids
+from projects.models import ProjectMember
+from planning.models import Sprint
+from planning.serializers import SprintSerializer
+from tasks.models import Task, TaskComment, TaskChecklistItem, TaskResource
+from tasks.serializers import TaskListSerializer, TaskCommentSerializer, TaskChecklistItemSerializer
+from .models import ChangeLogEntry
+from .serializers import SyncMembershipSerializer, SyncQuerySerializer
+
+
+def _sprints():
+    # Лічильники задач одним запитом (як у SprintViewSet)
+    return Sprint.objects.annotate(
+        tasks_total_count=Count('tasks'),
+        tasks_completed_count=Count('tasks', filter=Q(tasks__status=Task.STATUS_DONE)),
+    )
+
+
+# Сутність -> (queryset, серіалізатор, шлях до проєкту для перевірки доступу)
+SYNC_ENTITIES = {
+    ChangeLogEntry.ENTITY_TASK: (lambda: Task.objects.all(), TaskListSerializer, 'project_id'),
+    ChangeLogEntry.ENTITY_COMMENT: (
+        lambda: TaskComment.objects.select_related('author').prefetch_related(
+            Prefetch('attachments', queryset=TaskResource.objects.all())
+        ),
+        TaskCommentSerializer, 'task__project_id',
+    ),
+    ChangeLogEntry.ENTITY_CHECKLIST_ITEM: (
+        lambda: TaskChecklistItem.objects.all(), TaskChecklistItemSerializer, 'task__project_id'
+    ),
+    ChangeLogEntry.ENTITY_SPRINT: (_sprints, SprintSerializer, 'project_id'),
+    ChangeLogEntry.ENTITY_MEMBERSHIP: (
+        lambda: ProjectMember.objects.select_related('user'), SyncMembershipSerializer, 'project_id'
+    ),
+}
+
+
+class SyncView(views.APIView):
+    """
+    GET /api/v1/sync/?since=<token>
+    Дельта-синхронізація для офлайн/мобільних клієнтів: усі задачі, коментарі, пункти чекліста,
+    спринти та учасники моїх проєктів, створені, змінені або видалені після курсора.
+
+    Кожна сутність повертається один раз (останній стан): {"upserts": [...], "deletes": [id, ...]}.
+    Вартість — O(змін): читання журналу ChangeLogEntry за індексом (project_id, id).
+    Без since (або якщо курсор старший за журнал) повертається reset=true: клієнт
+    один раз завантажує дані звичайними списками і далі синхронізується з next.
+    resync_projects — проєкти, куди мене додали: їх історію треба завантажити повністю.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        query = SyncQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        since = query.validated_data.get('since')
+        user = request.user
+
+        bounds = ChangeLogEntry.objects.aggregate(first=Min('id'), head=Max('id'))
+        head, first = bounds['head'] or 0, bounds['first']
+        # Журнал обрізається за давністю — старий курсор міг пропустити видалені записи.
+        # Порожній журнал при ненульовому курсорі означає, що очищення видалило все
+        pruned = since is not None and (since < first - 1 if first is not None else since > 0)
+        if since is None or pruned:
+            return Response({'next': str(head), 'has_more': False, 'reset': True, 'changes': {}, 'resync_projects': []})
+
+        is_admin = user.is_staff or user.is_superuser
+        project_ids = None if is_admin else get_member_project_ids(user.id)
+
+        entries = ChangeLogEntry.objects.filter(
+            id__gt=since,
+            # Свіжі записи почекають наступного запиту: запис, що комітиться паралельно
+            # з меншим id, не буде пропущено
+            created_at__lte=timezone.now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS),
+        )
+        if project_ids is not None:
+            entries = entries.filter(Q(project_id__in=project_ids) | Q(user_id=user.id))
+
+        page_size = settings.SYNC_PAGE_SIZE
+        rows = list(
+            entries.order_by('id').values_list('id', 'entity', 'object_id', 'is_deleted')[:page_size + 1]
+        )
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        # Останній стан кожного об'єкта у вікні
+        latest = {}
+        for _, entity, object_id, is_deleted in rows:
+            latest[(entity, object_id)] = is_deleted
+
+        changes = {}
+        resync_projects = set()
+        for entity, (get_queryset, serializer_class, project_path) in SYNC_ENTITIES.items():
+            deleted = sorted(pk for (name, pk), is_deleted in latest.items() if name == entity and is_deleted)
+            upserted = [pk for (name, pk), is_deleted in latest.items() if name == entity and not is_deleted]
+            if not (deleted or upserted):
+                continue
+
+            objects = []
+            if upserted:
+                queryset = get_queryset().filter(pk__in=upserted).order_by('pk')
+                if project_ids is not None:
+                    queryset = queryset.filter(**{f"{project_path}__in": project_ids})
+                # Об'єкт, видалений пізніше за вікно, пропускається — надгробок прийде далі
+                objects = list(queryset)
+
+            if entity == ChangeLogEntry.ENTITY_MEMBERSHIP:
+                resync_projects.update(member.project_id for member in objects if member.user_id == user.id)
+
+            changes[entity] = {
+                'upserts': serializer_class(objects, many=True, context={'request': request}).data,
+                'deletes': deleted,
+            }
+
+        return Response({
+            'next': str(rows[-1][0] if rows else since),
+            'has_more': has_more,
+            'reset': False,
+            'changes': changes,
+            'resync_projects': sorted(resync_projects),
+        })
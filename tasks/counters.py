@@ -0,0 +1,52 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from .models import Task, TaskComment, TaskResource
+
+RECONCILE_BATCH_SIZE = 1000
+
+# Лічильник задачі -> модель, рядки якої він рахує
+COUNTERS = {
+    'comments_count': TaskComment,
+    'resources_count': TaskResource,
+}
+
+
+def adjust_task_counter(task_id, field, delta):
+    """Атомарно змінює лічильник задачі на рівні БД (без read-modify-write у Python)."""
+    Task.objects.filter(pk=task_id).update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def _actual_count(model):
+    counted = model.objects.filter(task=OuterRef('pk')).order_by().values('task').annotate(c=Count('pk')).values('c')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def reconcile_task_counters(task_ids=None, batch_size=RECONCILE_BATCH_SIZE):
+    """
+    Перераховує comments_count / resources_count з фактичних рядків і виправляє розбіжності
+    (після bulk-операцій, ручних правок у БД тощо). Працює пачками по id.
+    Повертає кількість виправлених задач.
+    """
+    tasks = Task.objects.all()
+    if task_ids is not None:
+        tasks = tasks.filter(pk__in=task_ids)
+
+    actual = {field: _actual_count(model) for field, model in COUNTERS.items()}
+    fixed = 0
+    last_id = 0
+
+    while True:
+        batch_ids = list(tasks.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not batch_ids:
+            break
+        last_id = batch_ids[-1]
+
+        mismatched = (
+            Task.objects.filter(pk__in=batch_ids)
+            .annotate(**{f"actual_{field}": expression for field, expression in actual.items()})
+            .exclude(**{field: F(f"actual_{field}") for field in COUNTERS})
+            .values_list('pk', flat=True)
+        )
+        fixed += Task.objects.filter(pk__in=list(mismatched)).update(**actual)
+
+    return fixed
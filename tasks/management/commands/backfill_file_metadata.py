@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from Core.files import file_metadata, METADATA_FIELDS
+from projects.models import ProjectResource
+from tasks.models import TaskResource
+
+
+class Command(BaseCommand):
+    help = 'Заповнює розмір, розширення, MIME-тип і SHA-256 для вже завантажених файлів'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Скільки рядків оновлювати за раз')
+
+    def handle(self, *args, **options):
+        for model in (TaskResource, ProjectResource):
+            self.stdout.write(self.style.WARNING(f"⏳ {model.__name__}: рахую метадані файлів..."))
+            filled, missing = self.backfill(model, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Готово! Заповнено: {filled}, файлів не знайдено у сховищі: {missing}"
+            ))
+
+    def backfill(self, model, batch_size):
+        """Проходить рядки без хешу пачками за pk (можна перервати і запустити знову)."""
+        filled = missing = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                model.objects.filter(pk__gt=last_pk, sha256='')
+                .exclude(file='').exclude(file__isnull=True)
+                .order_by('pk')[:batch_size]
+            )
+            if not batch:
+                return filled, missing
+            last_pk = batch[-1].pk
+
+            updated = []
+            for resource in batch:
+                try:
+                    with resource.file.open('rb') as stored:
+                        metadata = file_metadata(stored, name=resource.file.name)
+                except (FileNotFoundError, OSError):
+                    missing += 1
+                    continue
+                for name, value in metadata.items():
+                    setattr(resource, name, value)
+                updated.append(resource)
+
+            model.objects.bulk_update(updated, METADATA_FIELDS)
+            filled += len(updated)
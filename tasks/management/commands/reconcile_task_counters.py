@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from tasks.counters import reconcile_task_counters
+
+
+class Command(BaseCommand):
+    help = 'Перераховує лічильники коментарів і вкладень задач з фактичних даних'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING("⏳ Звіряю лічильники задач..."))
+
+        fixed = reconcile_task_counters()
+
+        self.stdout.write(self.style.SUCCESS(f"Готово! Виправлено задач: {fixed}"))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:39
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskComment = apps.get_model('tasks', 'TaskComment')
+    TaskResource = apps.get_model('tasks', 'TaskResource')
+
+    def actual_count(model):
+        counted = model.objects.filter(task=OuterRef('pk')).order_by().values('task').annotate(c=Count('pk')).values('c')
+        return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+    Task.objects.update(comments_count=actual_count(TaskComment), resources_count=actual_count(TaskResource))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_taskresource_comment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Коментарів'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='resources_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Вкладень'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,8 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from projects.models import Project, ProjectMilestone
+from Core.files import fill_file_metadata, METADATA_FIELDS
+from uploads.blobs import link_blob
 
 
 class Task(models.Model):
@@ -94,9 +96,33 @@ class Task(models.Model):
     estimated_hours = models.FloatField(null=True, blank=True, verbose_name="Оцінка (год)")
     due_date = models.DateTimeField(null=True, blank=True, verbose_name="Дедлайн")
 
+    # --- Лічильники (денормалізовані, оновлюються сигналами tasks/signals.py) ---
+    comments_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Коментарів")
+    resources_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Вкладень")
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запам'ятовує стан з БД, щоб сигнали могли порівняти "Було" і "Стало" без повторного запиту
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    COUNTER_FIELDS = ('comments_count', 'resources_count')
+
+    def save(self, *args, **kwargs):
+        # Лічильники змінюються тільки атомарними F()-оновленнями (tasks/counters.py):
+        # збереження задачі з застарілими значеннями в пам'яті не повинно їх перезаписати
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"[{self.project.key}-{self.id}] {self.title}"
 
@@ -132,8 +158,36 @@ class TaskResource(models.Model):
     file = models.FileField(upload_to='task_attachments/', blank=True, null=True)
     url = models.URLField(blank=True, null=True)
 
+    # Метадані файлу рахуються один раз при завантаженні (Core/files.py), а не при серіалізації
+    file_size = models.BigIntegerField(null=True, blank=True, editable=False, verbose_name="Розмір (байт)")
+    file_extension = models.CharField(max_length=20, blank=True, default='', editable=False, verbose_name="Розширення")
+    mime_type = models.CharField(max_length=100, blank=True, default='', editable=False, verbose_name="MIME-тип")
+    sha256 = models.CharField(max_length=64, blank=True, default='', editable=False, db_index=True, verbose_name="SHA-256")
+    # Спільний вміст (uploads.FileBlob): file вказує на файл блоба, однакові файли не дублюються
+    blob = models.ForeignKey(
+        'uploads.FileBlob', on_delete=models.PROTECT, null=True, blank=True, editable=False, related_name='+'
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Попередній blob_id потрібен сигналам лічильника посилань (uploads/signals.py)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Блоб лишається заблокованим, доки вкладення і лічильник посилань не збережено
+        with transaction.atomic():
+            if fill_file_metadata(self):
+                link_blob(self)
+                if kwargs.get('update_fields') is not None:
+                    kwargs['update_fields'] = {*kwargs['update_fields'], *METADATA_FIELDS, 'file', 'blob'}
+            elif not self.file:
+                self.blob = None
+            super().save(*args, **kwargs)
+
 
 class TaskComment(models.Model):
     """
@@ -1,8 +1,11 @@
-import os
 from rest_framework import serializers
+from rest_framework.reverse import reverse
 from django.contrib.auth import get_user_model
 from .models import Task, TaskResource, TaskComment, TaskChecklistItem, TaskHistoryEvent
 from projects.models import ProjectMember
+from Core.object_cache import CachedRelationsListSerializer
+from Core.sparse_fields import SparseFieldsetMixin
+from users.avatars import AvatarField
 
 User = get_user_model()
 
@@ -13,6 +16,7 @@ class UserMiniSerializer(serializers.ModelSerializer):
     Міні-серіалізатор для вкладення об'єктів людей (Автора, Виконавця).
     """
     name = serializers.ReadOnlyField(source='get_full_name')
+    avatar = AvatarField('md', source='*')
 
     class Meta:
         model = User
@@ -21,29 +25,37 @@ class UserMiniSerializer(serializers.ModelSerializer):
 
 # --- Допоміжні серіалізатори ---
 class TaskResourceSerializer(serializers.ModelSerializer):
-    # Додано поля для метаданих файлів
+    # Метадані файлів зберігаються в моделі при завантаженні (без звернень до сховища)
     file_size = serializers.SerializerMethodField()
     file_extension = serializers.SerializerMethodField()
+    # Захищене завантаження з перевіркою членства (Core/media_serving.py)
+    download_url = serializers.SerializerMethodField()
 
     class Meta:
         model = TaskResource
-        fields = ['id', 'task', 'comment', 'name', 'resource_type', 'file', 'url', 'file_size', 'file_extension', 'uploaded_by', 'created_at']
+        fields = [
+            'id', 'task', 'comment', 'name', 'resource_type', 'file', 'url', 'download_url',
+            'file_size', 'file_extension', 'mime_type', 'sha256', 'uploaded_by', 'created_at'
+        ]
         read_only_fields = ['uploaded_by', 'created_at']
+        # file тільки приймається: підписаний URL сховища відкривався б без перевірки доступу
+        extra_kwargs = {'file': {'write_only': True}}
 
     def get_file_size(self, obj):
-        if obj.file and hasattr(obj.file, 'size'):
-            return obj.file.size
-        return None
+        return obj.file_size
 
     def get_file_extension(self, obj):
-        if obj.file and hasattr(obj.file, 'name'):
-            return os.path.splitext(obj.file.name)[1].lower()
-        return None
+        return obj.file_extension or None
+
+    def get_download_url(self, obj):
+        if not obj.file:
+            return None
+        return reverse('task-resource-download', args=[obj.pk], request=self.context.get('request'))
 
 
 class TaskCommentSerializer(serializers.ModelSerializer):
     author_name = serializers.ReadOnlyField(source='author.get_full_name')
-    author_avatar = serializers.ImageField(source='author.avatar', read_only=True)
+    author_avatar = AvatarField('sm', source='author')
 
     attachments = TaskResourceSerializer(many=True, read_only=True)
 
@@ -72,9 +84,12 @@ class TaskHistoryEventSerializer(serializers.ModelSerializer):
     class Meta:
         model = TaskHistoryEvent
         fields = ['id', 'actor', 'action_type', 'changes', 'timestamp']
+        # Автори подій підтягуються одним пакетом з кешу об'єктів
+        list_serializer_class = CachedRelationsListSerializer
+        cached_relations = ['actor']
 
 
-class TaskListSerializer(serializers.ModelSerializer):
+class TaskListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Легкий серіалізатор для списку задач.
     Віддає лічильники замість вкладених масивів.
@@ -84,10 +99,11 @@ class TaskListSerializer(serializers.ModelSerializer):
     reporter_name = serializers.ReadOnlyField(source='reporter.get_full_name')
     project_name = serializers.ReadOnlyField(source='project.name')
     project_key = serializers.ReadOnlyField(source='project.key')
-    assignee_avatar = serializers.ImageField(source='assignee.avatar', read_only=True)
-    reporter_avatar = serializers.ImageField(source='reporter.avatar', read_only=True)
+    # Мініатюри замість оригіналів (users/avatars.py)
+    assignee_avatar = AvatarField('sm', source='assignee')
+    reporter_avatar = AvatarField('sm', source='reporter')
 
-    # Використовує анотовані поля з бази даних
+    # Лічильники зберігаються в самій задачі (оновлюються сигналами)
     comments_count = serializers.IntegerField(read_only=True)
     resources_count = serializers.IntegerField(read_only=True)
 
@@ -101,12 +117,16 @@ class TaskListSerializer(serializers.ModelSerializer):
             'sprint', 'estimated_hours', 'due_date','assignee_avatar',
             'reporter_avatar'
         ]
+        # Проєкт та люди підтягуються з кешу об'єктів замість JOIN у запиті списку
+        list_serializer_class = CachedRelationsListSerializer
+        cached_relations = ['project', 'assignee', 'reporter']
+        field_sources = {'task_key': ['project']}
 
     def get_task_key(self, obj):
         return f"{obj.project.key}-{obj.id}"
 
 
-class TaskDetailSerializer(serializers.ModelSerializer):
+class TaskDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Важкий серіалізатор для конкретної задачі.
     Містить усі поля + вкладені коментарі та ресурси.
@@ -138,6 +158,7 @@ class TaskDetailSerializer(serializers.ModelSerializer):
         ]
 
         read_only_fields = ['reporter', 'created_at', 'updated_at']
+        field_sources = {'task_key': ['project']}
 
     def get_task_key(self, obj):
         return f"{obj.project.key}-{obj.id}"
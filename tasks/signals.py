@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from projects.models import Project
+from Core.conditional import track_collection, track_display_fields
+from .models import Task, TaskComment, TaskResource, TaskChecklistItem
+from .counters import adjust_task_counter
+
+
+# --- Лічильники коментарів і вкладень задачі ---
+# post_delete спрацьовує і для каскадного видалення (коментар -> його вкладення)
+
+@receiver(post_save, sender=TaskComment)
+def increment_comments_count(sender, instance, created, **kwargs):
+    if created:
+        adjust_task_counter(instance.task_id, 'comments_count', 1)
+
+
+@receiver(post_delete, sender=TaskComment)
+def decrement_comments_count(sender, instance, **kwargs):
+    adjust_task_counter(instance.task_id, 'comments_count', -1)
+
+
+@receiver(post_save, sender=TaskResource)
+def increment_resources_count(sender, instance, created, **kwargs):
+    if created:
+        adjust_task_counter(instance.task_id, 'resources_count', 1)
+
+
+@receiver(post_delete, sender=TaskResource)
+def decrement_resources_count(sender, instance, **kwargs):
+    adjust_task_counter(instance.task_id, 'resources_count', -1)
+
+
+# --- Версії вкладених колекцій (ETag деталей задачі та проєкту) ---
+
+track_collection(TaskComment, Task, 'task_id')
+track_collection(TaskResource, Task, 'task_id')
+track_collection(TaskChecklistItem, Task, 'task_id')
+# Прогрес і кількість активних задач входять у представлення проєкту
+track_collection(Task, Project, 'project_id')
+# Ім'я та аватар автора показуються у вкладених коментарях задачі
+track_display_fields(get_user_model(), get_user_model().DISPLAY_FIELDS, dependents=[
+    (Task, lambda user: TaskComment.objects.filter(author_id=user.pk).values_list('task_id', flat=True).distinct()),
+])
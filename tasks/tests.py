@@ -1,8 +1,16 @@
+import hashlib
+import tempfile
+from unittest import mock
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from projects.models import Project, ProjectMember
-from tasks.models import Task, TaskComment
+from tasks.models import Task, TaskComment, TaskResource
+from tasks.counters import reconcile_task_counters
 
 User = get_user_model()
 
@@ -77,4 +85,187 @@ class TaskAPITests(APITestCase):
         response = self.client.delete(url)
 
         # Boss має права на видалення будь-якого коментаря у своєму проєкті
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_comment_and_resource_counters_follow_cascades(self):
+        """Лічильники задачі оновлюються при створенні/видаленні (в т.ч. каскадному) і звіряються командою"""
+        self.client.force_authenticate(user=self.dev)
+        response = self.client.post('/api/v1/tasks/comments/', {'task': self.task_todo.id, 'content': 'Перший'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        comment = TaskComment.objects.get(pk=response.data['id'])
+        TaskComment.objects.create(task=self.task_todo, author=self.boss, content='Другий')
+        TaskResource.objects.create(task=self.task_todo, comment=comment, resource_type='url', url='https://a.test')
+
+        # + коментар з setUp
+        self.task_todo.refresh_from_db()
+        self.assertEqual((self.task_todo.comments_count, self.task_todo.resources_count), (3, 1))
+
+        # Видалення коментаря каскадно видаляє його вкладення
+        comment.delete()
+        self.task_todo.refresh_from_db()
+        self.assertEqual((self.task_todo.comments_count, self.task_todo.resources_count), (2, 0))
+
+        # Розбіжність після "ручної" правки в БД виправляє reconcile
+        Task.objects.filter(pk=self.task_todo.pk).update(comments_count=7)
+        self.assertEqual(reconcile_task_counters(), 1)
+        self.task_todo.refresh_from_db()
+        self.assertEqual(self.task_todo.comments_count, 2)
+
+    def test_conditional_get_returns_304_until_comment_added(self):
+        """Деталі задачі з If-None-Match: 304 одним запитом, новий коментар змінює ETag"""
+        self.client.force_authenticate(user=self.dev)
+        url = f'/api/v1/tasks/{self.task_todo.id}/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        TaskComment.objects.create(task=self.task_todo, author=self.boss, content="Новий")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_follows_related_names_and_representation(self):
+        """ETag змінюється з ім'ям автора й назвою проєкту і різний для ?fields="""
+        self.client.force_authenticate(user=self.dev)
+        url = f'/api/v1/tasks/{self.task_todo.id}/'
+        etag = self.client.get(url)['ETag']
+        sparse_etag = self.client.get(f'{url}?fields=id,title')['ETag']
+        self.assertNotEqual(sparse_etag, etag)
+
+        reporter = self.task_todo.reporter
+        reporter.first_name = "Перейменований"
+        reporter.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+        etag = self.client.get(url)['ETag']
+        self.project.name = "Нова назва"
+        self.project.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+        # ETag вибраного представлення підтверджує ту саму версію об'єкта для PATCH
+        sparse_etag = self.client.get(f'{url}?fields=id,title')['ETag']
+        response = self.client.patch(url, {'title': 'Правка'}, HTTP_IF_MATCH=sparse_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_patch_with_stale_if_match_is_rejected(self):
+        """PATCH з застарілим If-Match -> 412 (lost update), з актуальним -> 200 і новий ETag"""
+        self.client.force_authenticate(user=self.dev)
+        url = f'/api/v1/tasks/{self.task_todo.id}/'
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.patch(url, {'title': 'Перша правка'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        new_etag = response['ETag']
+        self.assertNotEqual(new_etag, etag)
+
+        response = self.client.patch(url, {'title': 'Друга правка'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.task_todo.refresh_from_db()
+        self.assertEqual(self.task_todo.title, 'Перша правка')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class AttachmentMetadataTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='files_user', email='files@test.com', password='123')
+        self.project = Project.objects.create(name="Files", key="FIL", owner=self.user)
+        ProjectMember.objects.create(project=self.project, user=self.user, role='owner')
+        self.task = Task.objects.create(project=self.project, title="З файлами", reporter=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def test_metadata_is_stored_on_upload_and_served_without_storage_io(self):
+        content = b"%PDF-1.4 " + b"x" * 200_000
+        response = self.client.post('/api/v1/tasks/resources/', {
+            'task': self.task.id, 'resource_type': 'file',
+            'file': SimpleUploadedFile('Spec.PDF', content, content_type='application/pdf'),
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        resource = TaskResource.objects.get(pk=response.data['id'])
+        self.assertEqual(resource.file_size, len(content))
+        self.assertEqual(resource.file_extension, '.pdf')
+        self.assertEqual(resource.mime_type, 'application/pdf')
+        self.assertEqual(resource.sha256, hashlib.sha256(content).hexdigest())
+
+        # Серіалізація деталей задачі не звертається до сховища
+        with mock.patch.object(FileSystemStorage, 'size', side_effect=AssertionError("storage stat")), \
+                mock.patch.object(FileSystemStorage, 'open', side_effect=AssertionError("storage open")):
+            response = self.client.get(f'/api/v1/tasks/{self.task.id}/')
+        self.assertEqual(response.data['resources'][0]['file_size'], len(content))
+
+    def test_long_extension_and_mime_type_fit_columns(self):
+        response = self.client.post('/api/v1/tasks/resources/', {
+            'task': self.task.id, 'resource_type': 'file',
+            'file': SimpleUploadedFile('notes.final-approved-version-2026', b"draft",
+                                       content_type='application/' + 'x' * 120),
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        resource = TaskResource.objects.get(pk=response.data['id'])
+        self.assertEqual(resource.file_extension, '')
+        self.assertEqual(resource.mime_type, 'application/octet-stream')
+
+    def test_backfill_command_fills_existing_rows(self):
+        resource = TaskResource.objects.create(
+            task=self.task, resource_type='file', file=SimpleUploadedFile('notes.txt', b"old file")
+        )
+        TaskResource.objects.filter(pk=resource.pk).update(file_size=None, file_extension='', mime_type='', sha256='')
+
+        call_command('backfill_file_metadata', stdout=mock.MagicMock())
+
+        resource.refresh_from_db()
+        self.assertEqual((resource.file_size, resource.file_extension, resource.mime_type), (8, '.txt', 'text/plain'))
+        self.assertEqual(resource.sha256, hashlib.sha256(b"old file").hexdigest())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ProtectedDownloadTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='dl_user', email='dl@test.com', password='123')
+        self.outsider = User.objects.create_user(username='dl_outsider', email='dl_out@test.com', password='123')
+        self.project = Project.objects.create(name="Downloads", key="DWN", owner=self.user)
+        ProjectMember.objects.create(project=self.project, user=self.user, role='owner')
+        task = Task.objects.create(project=self.project, title="Відео", reporter=self.user)
+        self.content = bytes(range(256)) * 40
+        self.resource = TaskResource.objects.create(
+            task=task, name='demo.mp4', resource_type='file', file=SimpleUploadedFile('demo.mp4', self.content)
+        )
+        self.url = f'/api/v1/tasks/resources/{self.resource.id}/download/'
+
+    def test_download_checks_membership_and_supports_range_and_revalidation(self):
+        self.client.force_authenticate(user=self.outsider)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['ETag'], f'"{self.resource.sha256}"')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('filename="demo.mp4"', response['Content-Disposition'])
+
+        partial = self.client.get(self.url, HTTP_RANGE='bytes=100-299')
+        self.assertEqual(partial.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(partial['Content-Range'], f'bytes 100-299/{len(self.content)}')
+        self.assertEqual(b''.join(partial.streaming_content), self.content[100:300])
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=99999-').status_code,
+                         status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+
+        cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @override_settings(PROTECTED_MEDIA_SERVER='nginx')
+    def test_transfer_is_delegated_to_proxy(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.resource.file.name}')
+        self.assertEqual(response.content, b'')
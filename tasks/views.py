@@ -2,9 +2,11 @@ import django_filters
 from rest_framework import viewsets, permissions, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count
+from django.db import transaction
+from django.db.models import F, Q, Prefetch
+from django.contrib.auth import get_user_model
 from .models import Task, TaskComment, TaskResource, TaskChecklistItem, TaskHistoryEvent
 from .serializers import (
     TaskListSerializer, TaskDetailSerializer, TaskCommentSerializer,
@@ -12,6 +14,14 @@ from .serializers import (
 )
 from .permissions import IsAuthorOrProjectOwnerOrAdmin
 from Core.pagination import CoreCursorPagination
+from Core.throttling import TaskUserRateThrottle
+from Core.sparse_fields import SparseQuerysetMixin
+from Core.conditional import ConditionalRequestMixin
+from Core.media_serving import serve_resource_file
+from projects.models import Project
+from projects.membership import get_member_project_ids
+
+User = get_user_model()
 
 class HistoryCursorPagination(CoreCursorPagination):
     """
@@ -34,15 +44,21 @@ class TaskFilter(django_filters.FilterSet):
         fields = ['project', 'status', 'priority', 'assignee', 'reporter', 'task_type']
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ConditionalRequestMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     CRUD для задач.
     GET /tasks/ -> Всі задачі (з моїх проєктів).
+    GET /tasks/?fields=id,title,status -> Тільки вибрані поля (і тільки потрібні колонки).
+    GET /tasks/{id}/ з If-None-Match -> 304, якщо задача не змінилась.
+    PATCH /tasks/{id}/ з If-Match -> 412, якщо задачу вже змінив хтось інший.
     POST /tasks/ -> Створити.
     """
 
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = CoreCursorPagination
+    throttle_classes = [TaskUserRateThrottle]
+    # Назва проєкту, імена й аватари виконавця та автора входять у представлення (ETag)
+    related_versions = {'project_id': Project, 'assignee_id': User, 'reporter_id': User}
 
     # --- ПІДКЛЮЧАЄ ФІЛЬТРИ ---
     filter_backends = [
@@ -75,17 +91,23 @@ class TaskViewSet(viewsets.ModelViewSet):
         # Показує тільки задачі з проєктів де користувач є учасником.
         # Адмін бачить все.
         user = self.request.user
-        qs = Task.objects.select_related('project', 'assignee', 'reporter')
+        qs = Task.objects.all()
+
+        # Для списку проєкт і люди беруться з кешу об'єктів (TaskListSerializer),
+        # для інших дій потрібні повні об'єкти для перевірки прав
+        if self.action != 'list':
+            qs = qs.select_related('project', 'assignee', 'reporter').prefetch_related(
+                Prefetch('comments', queryset=TaskComment.objects.select_related('author').prefetch_related('attachments')),
+                'resources',
+                'checklist_items',
+            )
 
         if not (user.is_staff or user.is_superuser):
-            qs = qs.filter(project__members__user=user).distinct()
+            # Карта доступу з кешу замість JOIN на учасників (і без DISTINCT)
+            qs = qs.filter(project_id__in=get_member_project_ids(user.id))
 
-        # Анотує кількість коментарів та вкладень на рівні БД (1 SQL запит)
-        qs = qs.annotate(
-            comments_count=Count('comments', distinct=True),
-            resources_count=Count('resources', distinct=True)
-        )
-        return qs
+        # Кількість коментарів та вкладень — денормалізовані поля задачі (без JOIN-ів)
+        return self.narrow_queryset(qs)
 
     def perform_create(self, serializer):
         # Автоматично ставить поточного юзера як Автора (Reporter)
@@ -197,12 +219,15 @@ class TaskCommentViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
 
+        # Автор і вкладення потрібні серіалізатору для кожного коментаря
+        queryset = TaskComment.objects.select_related('author').prefetch_related('attachments')
+
         # Адмін бачить всі коментарі
         if user.is_staff or user.is_superuser:
-            return TaskComment.objects.all()
+            return queryset
 
         # Звичайний юзер бачить тільки ті, де він учасник проєкту АБО власник проєкту
-        return TaskComment.objects.filter(
+        return queryset.filter(
             Q(task__project__members__user=user) | Q(task__project__owner=user)
         ).distinct()
 
@@ -218,8 +243,10 @@ class TaskCommentViewSet(viewsets.ModelViewSet):
             if not (is_member or is_owner):
                 raise PermissionDenied("Ви не можете коментувати задачу з проєкту, до якого не маєте доступу.")
 
-        # Зберігає коментар, примусово встановлюючи автора (захист від підробки)
-        serializer.save(author=user)
+        # Зберігає коментар, примусово встановлюючи автора (захист від підробки).
+        # Лічильник задачі оновлюється сигналом у тій самій транзакції
+        with transaction.atomic():
+            serializer.save(author=user)
 
 
 class TaskResourceViewSet(viewsets.ModelViewSet):
@@ -227,9 +254,11 @@ class TaskResourceViewSet(viewsets.ModelViewSet):
     CRUD для файлів/ресурсів задачі.
     GET /resources/?task=5 -> Отримати файли конкретної задачі.
     POST /resources/ -> Завантажити файл.
+    GET /resources/{id}/download/ -> Завантажити сам файл (з перевіркою доступу, Range, 304).
     """
     serializer_class = TaskResourceSerializer
     permission_classes = [permissions.IsAuthenticated, IsAuthorOrProjectOwnerOrAdmin]
+    lookup_value_regex = r'\d+'
     pagination_class = CoreCursorPagination
 
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -271,7 +300,27 @@ class TaskResourceViewSet(viewsets.ModelViewSet):
                 name = serializer.validated_data['url']
 
         # Зберігає ресурс, примусово встановлюючи автора та сформовану назву
-        serializer.save(uploaded_by=user, name=name)
+        with transaction.atomic():
+            serializer.save(uploaded_by=user, name=name)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """
+        Захищене завантаження файлу: GET /api/v1/tasks/resources/{id}/download/
+        Доступ перевіряється за кешованою картою членства, без JOIN-ів get_queryset.
+        """
+        resource = (
+            TaskResource.objects.filter(pk=pk, resource_type=TaskResource.TYPE_FILE)
+            .annotate(project_id=F('task__project_id'))
+            .only('file', 'name', 'mime_type', 'sha256', 'created_at')
+            .first()
+        )
+        user = request.user
+        if resource is None or not resource.file or not (
+            user.is_staff or user.is_superuser or resource.project_id in get_member_project_ids(user.id)
+        ):
+            raise NotFound()
+        return serve_resource_file(request, resource)
 
 
 class IsTaskParticipant(permissions.BasePermission):
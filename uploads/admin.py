@@ -0,0 +1,12 @@
+from django.contrib import admin
+from .models import FileBlob, UploadSession
+
+@admin.register(FileBlob)
+class FileBlobAdmin(admin.ModelAdmin):
+    list_display = ('sha256', 'file_size', 'mime_type', 'ref_count', 'created_at')
+    search_fields = ('sha256',)
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'filename', 'received_bytes', 'total_size', 'status', 'updated_at')
+    list_filter = ('status',)
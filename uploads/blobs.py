@@ -0,0 +1,81 @@
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from .models import FileBlob, blob_upload_to
+
+
+class SessionFile(File):
+    """Тимчасовий файл на диску: FileSystemStorage перемістить його замість копіювання."""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def store_blob(content, sha256, file_size, mime_type, name):
+    """
+    Повертає FileBlob для вмісту з хешем sha256.
+    У сховище файл пишеться тільки якщо такого вмісту ще немає.
+    Рядок блоба блокується до кінця транзакції виклику: збирач сміття
+    (release_unreferenced_blobs) не видалить його, поки вкладення ще не збережено.
+    """
+    blob = FileBlob.objects.select_for_update().filter(sha256=sha256).first()
+    if blob is not None:
+        return blob
+
+    blob = FileBlob(sha256=sha256, file_size=file_size, mime_type=mime_type)
+    blob.file.save(name, content, save=False)
+    try:
+        with transaction.atomic():
+            blob.save()
+    except IntegrityError:
+        # Паралельне завантаження того ж вмісту встигло першим — власна копія зайва
+        blob.file.storage.delete(blob.file.name)
+        return FileBlob.objects.get(sha256=sha256)
+    return blob
+
+
+def register_blob(name, sha256, file_size, mime_type, filename):
+    """
+    Реєструє об'єкт, який клієнт завантажив напряму у сховище під ключем своєї сесії
+    (вміст не читається: хеш перевірило саме сховище за підписаним x-amz-checksum-sha256).
+    Об'єкт переноситься на ключ блоба, а якщо такий вміст уже є — зайва копія видаляється.
+    Рядок блокується так само, як у store_blob. None — об'єкта сесії у сховищі немає.
+    """
+    blob = FileBlob.objects.select_for_update().filter(sha256=sha256).first()
+    if blob is not None:
+        default_storage.delete(name)
+        return blob
+
+    if not default_storage.exists(name):
+        return None
+    blob = FileBlob(sha256=sha256, file_size=file_size, mime_type=mime_type)
+    blob.file.name = default_storage.move(name, blob_upload_to(blob, filename))
+    try:
+        with transaction.atomic():
+            blob.save()
+    except IntegrityError:
+        # Паралельна реєстрація того ж вмісту встигла першою; інше розширення — інший ключ, копія зайва
+        existing = FileBlob.objects.select_for_update().get(sha256=sha256)
+        if existing.file.name != blob.file.name:
+            default_storage.delete(blob.file.name)
+        return existing
+    return blob
+
+
+def link_blob(resource):
+    """
+    Переводить щойно завантажений файл вкладення (метадані вже пораховані)
+    на спільний блоб: повторний вміст не пишеться в сховище вдруге.
+    Викликається в транзакції збереження вкладення (блокування блоба, див. store_blob).
+    """
+    blob = store_blob(resource.file.file, resource.sha256, resource.file_size, resource.mime_type, resource.file.name)
+    resource.blob = blob
+    resource.file = blob.file.name
+
+
+def adjust_ref_count(blob_id, delta):
+    if blob_id is None or not delta:
+        return
+    FileBlob.objects.filter(pk=blob_id).update(ref_count=Greatest(F('ref_count') + delta, 0))
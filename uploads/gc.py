@@ -0,0 +1,199 @@
+import os
+import shutil
+import time
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from projects.models import ProjectResource
+from tasks.models import TaskResource
+from .models import FileBlob, UploadSession
+
+CURSOR_KEY = 'media_gc:cursor'
+
+
+def _iter_values(queryset, field, batch_size):
+    """Значення поля пачками за pk — без одного величезного SELECT на всю таблицю."""
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk).order_by('pk').values_list('pk', field)[:batch_size])
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        for _, value in rows:
+            yield value
+
+
+def referenced_paths(batch_size):
+    """Множина шляхів (відносно MEDIA_ROOT), на які посилається хоча б один рядок БД."""
+    User = get_user_model()
+    paths = set()
+    for model, field in ((TaskResource, 'file'), (ProjectResource, 'file'), (FileBlob, 'file'), (User, 'avatar')):
+        queryset = model.objects.exclude(**{field: ''}).exclude(**{f"{field}__isnull": True})
+        paths.update(_iter_values(queryset, field, batch_size))
+
+    # Об'єкти прямих завантажень, які ще чекають на finalize
+    pending = UploadSession.objects.exclude(storage_key='').exclude(status=UploadSession.STATUS_FINALIZED)
+    paths.update(_iter_values(pending, 'storage_key', batch_size))
+
+    for variants in _iter_values(User.objects.exclude(avatar_variants={}), 'avatar_variants', batch_size):
+        for formats in variants.values():
+            paths.update(formats.values())
+    return paths
+
+
+def is_referenced(relative_path):
+    """
+    Повторна перевірка одного шляху в БД безпосередньо перед видаленням:
+    множина referenced_paths — знімок на початок обходу, а файл міг отримати посилання пізніше.
+    """
+    User = get_user_model()
+    for model, field in ((TaskResource, 'file'), (ProjectResource, 'file'), (FileBlob, 'file'), (User, 'avatar')):
+        if model.objects.filter(**{field: relative_path}).exists():
+            return True
+    if UploadSession.objects.filter(storage_key=relative_path).exclude(status=UploadSession.STATUS_FINALIZED).exists():
+        return True
+    return User.objects.filter(avatar_variants__icontains=relative_path).exists()
+
+
+def release_unreferenced_blobs(cutoff, batch_size, dry_run=False):
+    """
+    Видаляє блоби без посилань (ref_count=0), старші за cutoff, пачками: рядок і файл
+    прибираються разом, під блокуванням рядка (store_blob чекає на нього).
+    Лічильник перевіряється ще й фактичною відсутністю вкладень (захист від розбіжності лічильника).
+    """
+    unreferenced = (
+        FileBlob.objects.filter(ref_count=0, created_at__lt=cutoff)
+        .exclude(Exists(TaskResource.objects.filter(blob=OuterRef('pk'))))
+        .exclude(Exists(ProjectResource.objects.filter(blob=OuterRef('pk'))))
+        .exclude(Exists(TaskResource.objects.filter(file=OuterRef('file'))))
+        .exclude(Exists(ProjectResource.objects.filter(file=OuterRef('file'))))
+        # Сесія з дедуплікацією при init ще може прикріпити цей блоб
+        .exclude(Exists(UploadSession.objects.filter(blob=OuterRef('pk')).exclude(
+            status=UploadSession.STATUS_FINALIZED
+        )))
+    )
+    if dry_run:
+        return unreferenced.count()
+
+    released = 0
+    while True:
+        with transaction.atomic():
+            ids = list(unreferenced.select_for_update().order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return released
+            # Після блокування умови перевіряються заново: паралельне вкладення могло встигнути
+            # закомітитись між вибіркою кандидатів і отриманням блокування
+            rows = list(unreferenced.filter(pk__in=ids).values_list('pk', 'file'))
+            FileBlob.objects.filter(pk__in=[pk for pk, _ in rows]).delete()
+            for _, name in rows:
+                default_storage.delete(name)
+            released += len(rows)
+
+
+def _walk(root, parts=(), cursor=None):
+    """
+    Файли під root у детермінованому порядку (за іменем на кожному рівні): (шлях-кортеж, DirEntry).
+    Піддерева і файли до cursor включно пропускаються — так обхід продовжується з місця зупинки.
+    """
+    with os.scandir(os.path.join(root, *parts)) as iterator:
+        entries = sorted(iterator, key=lambda entry: entry.name)
+    for entry in entries:
+        entry_parts = parts + (entry.name,)
+        if cursor is not None and entry_parts < cursor[:len(entry_parts)]:
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            yield from _walk(root, entry_parts, cursor)
+        elif entry.is_file(follow_symlinks=False):
+            if cursor is not None and entry_parts <= cursor:
+                continue
+            yield entry_parts, entry
+
+
+def _quarantine(entry, relative_path):
+    target = os.path.join(settings.MEDIA_GC_QUARANTINE_DIR, relative_path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.move(entry.path, target)
+
+
+def collect_media_garbage(dry_run=False, quarantine=False, grace_hours=None, max_files=None, batch_size=None):
+    """
+    Прибирає файли MEDIA_ROOT, на які не посилається жоден рядок БД і які старші за grace_hours
+    (свіжі файли можуть належати завантаженню, чий рядок ще не закомічено).
+    Файли видаляються або переносяться в карантин (MEDIA_GC_QUARANTINE_DIR).
+
+    Обхід відновлюваний: після max_files файлів позиція зберігається в кеші,
+    наступний запуск продовжує з неї. dry_run нічого не змінює і позицію не зберігає.
+    """
+    grace_hours = settings.MEDIA_GC_GRACE_HOURS if grace_hours is None else grace_hours
+    batch_size = batch_size or settings.MEDIA_GC_BATCH_SIZE
+    cutoff = time.time() - grace_hours * 3600
+    report = {
+        'dry_run': dry_run, 'mode': 'quarantine' if quarantine else 'delete',
+        'scanned': 0, 'recent': 0, 'orphaned': 0, 'reclaimed_bytes': 0,
+        'blobs_released': 0, 'complete': False,
+    }
+
+    try:
+        root = default_storage.path('')
+    except NotImplementedError:
+        # Віддалене сховище (S3): сиріт прибирає lifecycle-політика bucket-а
+        report['complete'] = True
+        return report
+
+    report['blobs_released'] = release_unreferenced_blobs(
+        datetime.fromtimestamp(cutoff, dt_timezone.utc), batch_size, dry_run=dry_run
+    )
+    referenced = referenced_paths(batch_size)
+    if not os.path.isdir(root):
+        report['complete'] = True
+        return report
+
+    stored_cursor = None if dry_run else cache.get(CURSOR_KEY)
+    cursor = tuple(stored_cursor) if stored_cursor else None
+
+    for parts, entry in _walk(root, cursor=cursor):
+        if max_files and report['scanned'] >= max_files:
+            if not dry_run:
+                cache.set(CURSOR_KEY, list(cursor), timeout=None)
+            return report
+
+        report['scanned'] += 1
+        cursor = parts
+        relative_path = '/'.join(parts)
+        if relative_path in referenced:
+            continue
+
+        try:
+            stat = entry.stat(follow_symlinks=False)
+        except FileNotFoundError:
+            continue
+        if stat.st_mtime > cutoff:
+            report['recent'] += 1
+            continue
+
+        if is_referenced(relative_path):
+            continue
+
+        report['orphaned'] += 1
+        report['reclaimed_bytes'] += stat.st_size
+        if dry_run:
+            continue
+        try:
+            if quarantine:
+                _quarantine(entry, relative_path)
+            else:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+        if report['orphaned'] % batch_size == 0:
+            cache.set(CURSOR_KEY, list(cursor), timeout=None)
+
+    if not dry_run:
+        cache.delete(CURSOR_KEY)
+    report['complete'] = True
+    return report
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from uploads.gc import collect_media_garbage
+
+
+class Command(BaseCommand):
+    help = 'Прибирає файли MEDIA_ROOT, на які не посилається жоден запис БД (вкладення, блоби, аватари)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Тільки показати, що буде прибрано')
+        parser.add_argument('--quarantine', action='store_true', help='Переносити в карантин замість видалення')
+        parser.add_argument('--grace-hours', type=int, default=None, help='Не чіпати файли, молодші за це')
+        parser.add_argument('--max-files', type=int, default=None, help='Зупинитися після N файлів (продовження наступним запуском)')
+        parser.add_argument('--batch-size', type=int, default=None, help='Розмір пачки для читання посилань з БД')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING("⏳ Шукаю файли-сироти..."))
+        report = collect_media_garbage(
+            dry_run=options['dry_run'], quarantine=options['quarantine'], grace_hours=options['grace_hours'],
+            max_files=options['max_files'], batch_size=options['batch_size'],
+        )
+
+        action = "Буде звільнено" if report['dry_run'] else "Звільнено"
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово! Переглянуто: {report['scanned']}, сиріт: {report['orphaned']}, "
+            f"{action}: {report['reclaimed_bytes'] / 1024 / 1024:.1f} MB, "
+            f"блобів без посилань: {report['blobs_released']}"
+        ))
+        if not report['complete']:
+            self.stdout.write(self.style.WARNING("Обхід не завершено — наступний запуск продовжить з цього місця."))
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:58
+
+import django.db.models.deletion
+import uploads.models
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('file', models.FileField(max_length=255, upload_to=uploads.models.blob_upload_to, verbose_name='Файл')),
+                ('file_size', models.BigIntegerField(verbose_name='Розмір (байт)')),
+                ('mime_type', models.CharField(blank=True, default='', max_length=100, verbose_name='MIME-тип')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Посилань')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Блоб файлу',
+                'verbose_name_plural': 'Блоби файлів',
+            },
+        ),
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, verbose_name='Назва файлу')),
+                ('total_size', models.BigIntegerField(verbose_name='Розмір (байт)')),
+                ('received_bytes', models.BigIntegerField(default=0, verbose_name='Отримано (байт)')),
+                ('sha256', models.CharField(blank=True, default='', max_length=64, verbose_name='Очікуваний SHA-256')),
+                ('status', models.CharField(choices=[('active', 'Завантажується'), ('uploaded', 'Завантажено'), ('finalized', 'Прикріплено')], default='active', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('blob', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='uploads.fileblob')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Сесія завантаження',
+                'verbose_name_plural': 'Сесії завантаження',
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+import os
+import uuid
+from django.conf import settings
+from django.db import models
+from Core.files import file_extension
+
+
+def blob_upload_to(instance, filename):
+    """blobs/ab/cd/<sha256>.ext — шлях визначається вмістом, а не назвою файлу."""
+    extension = file_extension(filename)
+    return f"blobs/{instance.sha256[:2]}/{instance.sha256[2:4]}/{instance.sha256}{extension}"
+
+
+def direct_upload_key():
+    """
+    Власний ключ об'єкта для кожного прямого завантаження. Ключі блобів адресовані вмістом,
+    тож наявний об'єкт за ключем блоба нічого не доводить — клієнт завантажує байти сюди,
+    а finalize переносить їх у блоб.
+    """
+    return f"uploads/direct/{uuid.uuid4().hex}"
+
+
+class FileBlob(models.Model):
+    """
+    Вміст файлу, адресований SHA-256: однаковий файл, завантажений до багатьох задач,
+    зберігається один раз. ref_count — кількість вкладень (TaskResource, ProjectResource),
+    що посилаються на блоб; блоби з нульовим лічильником прибирає збирач сміття.
+    """
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name="SHA-256")
+    file = models.FileField(upload_to=blob_upload_to, max_length=255, verbose_name="Файл")
+    file_size = models.BigIntegerField(verbose_name="Розмір (байт)")
+    mime_type = models.CharField(max_length=100, blank=True, default='', verbose_name="MIME-тип")
+    ref_count = models.PositiveIntegerField(default=0, verbose_name="Посилань")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Блоб файлу"
+        verbose_name_plural = "Блоби файлів"
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.file_size} B, refs: {self.ref_count})"
+
+
+class UploadSession(models.Model):
+    """
+    Сесія порційного (resumable) завантаження: init -> PUT чанків -> finalize.
+    Чанки дописуються у тимчасовий файл сесії, тому перерване завантаження
+    продовжується з received_bytes.
+    """
+    STATUS_ACTIVE = 'active'
+    STATUS_UPLOADED = 'uploaded'
+    STATUS_FINALIZED = 'finalized'
+
+    STATUS_CHOICES = [
+        (STATUS_ACTIVE, 'Завантажується'),
+        (STATUS_UPLOADED, 'Завантажено'),
+        (STATUS_FINALIZED, 'Прикріплено'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+
+    filename = models.CharField(max_length=255, verbose_name="Назва файлу")
+    total_size = models.BigIntegerField(verbose_name="Розмір (байт)")
+    received_bytes = models.BigIntegerField(default=0, verbose_name="Отримано (байт)")
+    # Хеш від клієнта (необов'язково): дозволяє пропустити завантаження вже відомого вмісту
+    sha256 = models.CharField(max_length=64, blank=True, default='', verbose_name="Очікуваний SHA-256")
+
+    # Пряме завантаження у сховище за підписаним URL: ключ об'єкта сесії (порожній — чанки через API)
+    storage_key = models.CharField(max_length=255, blank=True, default='', verbose_name="Ключ об'єкта")
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_ACTIVE)
+    blob = models.ForeignKey(FileBlob, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Сесія завантаження"
+        verbose_name_plural = "Сесії завантаження"
+
+    @property
+    def temp_path(self):
+        return os.path.join(settings.UPLOAD_SESSION_DIR, f"{self.id}.part")
+
+    def __str__(self):
+        return f"{self.filename} ({self.received_bytes}/{self.total_size})"
@@ -0,0 +1,60 @@
+from django.conf import settings
+from rest_framework import serializers
+from Core.files import guess_mime_type
+from Core.object_storage import presign_upload
+from projects.models import Project
+from tasks.models import Task, TaskComment
+from .models import UploadSession
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    # Рекомендований розмір чанка — клієнт ріже файл на частини саме такого розміру
+    chunk_size = serializers.SerializerMethodField()
+    # Для прямого завантаження: куди і з якими заголовками клієнт робить PUT (свіжий підпис на кожен GET)
+    upload = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id', 'filename', 'total_size', 'sha256', 'received_bytes', 'status',
+            'chunk_size', 'upload', 'created_at'
+        ]
+        read_only_fields = ['id', 'received_bytes', 'status', 'created_at']
+
+    def get_chunk_size(self, obj):
+        return settings.UPLOAD_CHUNK_SIZE
+
+    def get_upload(self, obj):
+        if not obj.storage_key or obj.status != UploadSession.STATUS_ACTIVE:
+            return None
+        url, headers = presign_upload(obj.storage_key, obj.sha256, guess_mime_type(obj.filename))
+        return {'method': 'PUT', 'url': url, 'headers': headers}
+
+    def validate_total_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Розмір файлу має бути більше нуля.")
+        if value > settings.UPLOAD_MAX_FILE_SIZE:
+            raise serializers.ValidationError(f"Максимальний розмір файлу — {settings.UPLOAD_MAX_FILE_SIZE} байт.")
+        return value
+
+    def validate_sha256(self, value):
+        value = value.lower()
+        if value and (len(value) != 64 or any(char not in '0123456789abcdef' for char in value)):
+            raise serializers.ValidationError("Очікується SHA-256 у hex (64 символи).")
+        return value
+
+
+class UploadFinalizeSerializer(serializers.Serializer):
+    """Куди прикріпити завантажений файл: до задачі (і коментаря) або до проєкту."""
+    task = serializers.PrimaryKeyRelatedField(queryset=Task.objects.select_related('project'), required=False)
+    comment = serializers.PrimaryKeyRelatedField(queryset=TaskComment.objects.all(), required=False)
+    project = serializers.PrimaryKeyRelatedField(queryset=Project.objects.all(), required=False)
+    name = serializers.CharField(max_length=255, required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        if bool(attrs.get('task')) == bool(attrs.get('project')):
+            raise serializers.ValidationError("Вкажіть або task, або project.")
+        comment = attrs.get('comment')
+        if comment is not None and comment.task_id != getattr(attrs.get('task'), 'pk', None):
+            raise serializers.ValidationError({"comment": "Коментар належить іншій задачі."})
+        return attrs
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from projects.models import ProjectResource
+from tasks.models import TaskResource
+from .blobs import adjust_ref_count
+
+
+# --- Лічильники посилань на блоби ---
+
+@receiver(post_save, sender=TaskResource)
+@receiver(post_save, sender=ProjectResource)
+def count_blob_reference(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_loaded_values', {}).get('blob_id')
+    if previous != instance.blob_id:
+        adjust_ref_count(instance.blob_id, 1)
+        adjust_ref_count(previous, -1)
+        # Наступне збереження цього ж об'єкта порівнює вже з новим блобом
+        if hasattr(instance, '_loaded_values'):
+            instance._loaded_values['blob_id'] = instance.blob_id
+
+
+@receiver(post_delete, sender=TaskResource)
+@receiver(post_delete, sender=ProjectResource)
+def release_blob_reference(sender, instance, **kwargs):
+    adjust_ref_count(instance.blob_id, -1)
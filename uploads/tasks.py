@@ -0,0 +1,46 @@
+import os
+from datetime import timedelta
+from celery import shared_task
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from .gc import collect_media_garbage
+from .models import UploadSession
+
+
+def cleanup_upload_sessions(hours=None):
+    """
+    Видаляє сесії завантаження, неактивні довше за UPLOAD_SESSION_TTL_HOURS,
+    разом з їхніми тимчасовими файлами та об'єктами незавершених прямих завантажень.
+    Прикріплені сесії більше не потрібні одразу.
+    """
+    hours = settings.UPLOAD_SESSION_TTL_HOURS if hours is None else hours
+    cutoff = timezone.now() - timedelta(hours=hours)
+
+    stale = list(UploadSession.objects.filter(updated_at__lt=cutoff).only('id', 'storage_key', 'status'))
+    for session in stale:
+        if os.path.exists(session.temp_path):
+            os.remove(session.temp_path)
+        if session.storage_key and session.status != UploadSession.STATUS_FINALIZED:
+            default_storage.delete(session.storage_key)
+    UploadSession.objects.filter(id__in=[session.id for session in stale]).delete()
+    return len(stale)
+
+
+@shared_task
+def cleanup_upload_sessions_periodic():
+    """Періодична задача (Beat): прибирає покинуті сесії порційного завантаження."""
+    deleted = cleanup_upload_sessions()
+    return f"Upload sessions cleanup. Deleted {deleted} sessions."
+
+
+@shared_task
+def collect_media_garbage_periodic():
+    """Періодична задача (Beat): прибирає файли-сироти в MEDIA_ROOT (з продовженням обходу)."""
+    report = collect_media_garbage(
+        quarantine=settings.MEDIA_GC_QUARANTINE, max_files=settings.MEDIA_GC_MAX_FILES_PER_RUN
+    )
+    return (
+        f"Media GC. Scanned {report['scanned']}, orphaned {report['orphaned']}, "
+        f"reclaimed {report['reclaimed_bytes']} bytes, complete: {report['complete']}."
+    )
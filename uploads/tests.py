@@ -0,0 +1,296 @@
+import hashlib
+import io
+import os
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
+from urllib.error import HTTPError
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from Core.object_storage import S3Storage
+from projects.models import Project, ProjectMember
+from tasks.models import Task, TaskResource
+from .gc import CURSOR_KEY, collect_media_garbage
+from .models import FileBlob, UploadSession
+
+User = get_user_model()
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), UPLOAD_SESSION_DIR=tempfile.mkdtemp(), UPLOAD_MAX_CHUNK_SIZE=1024)
+class ChunkedUploadTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='upload_user', email='upload@test.com', password='123')
+        self.project = Project.objects.create(name="Uploads", key="UPL", owner=self.user)
+        ProjectMember.objects.create(project=self.project, user=self.user, role='owner')
+        self.task = Task.objects.create(project=self.project, title="Макети", reporter=self.user)
+        self.other_task = Task.objects.create(project=self.project, title="Ще макети", reporter=self.user)
+        self.client.force_authenticate(user=self.user)
+        self.content = os.urandom(2500)
+
+    def _put_chunk(self, session_id, start, end):
+        return self.client.generic(
+            'PUT', f'/api/v1/uploads/{session_id}/chunk/', self.content[start:end + 1],
+            content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{end}/{len(self.content)}'
+        )
+
+    def test_chunked_upload_resumes_and_finalizes_into_blob(self):
+        response = self.client.post('/api/v1/uploads/', {'filename': 'layout.fig', 'total_size': len(self.content)})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        session_id = response.data['id']
+
+        self.assertEqual(self._put_chunk(session_id, 0, 999).status_code, status.HTTP_200_OK)
+        # Чанк з неправильної позиції відхиляється з підказкою, звідки продовжувати
+        response = self._put_chunk(session_id, 2000, 2499)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['received_bytes'], 1000)
+        # Чанк більший за UPLOAD_MAX_CHUNK_SIZE
+        self.assertEqual(self._put_chunk(session_id, 1000, 2499).status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        # Після обриву клієнт питає позицію і продовжує з неї
+        self.assertEqual(self.client.get(f'/api/v1/uploads/{session_id}/').data['received_bytes'], 1000)
+        self.assertEqual(self._put_chunk(session_id, 1000, 1999).status_code, status.HTTP_200_OK)
+        self.assertEqual(self._put_chunk(session_id, 2000, 2499).data['received_bytes'], 2500)
+
+        response = self.client.post(f'/api/v1/uploads/{session_id}/finalize/', {'task': self.task.id})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        digest = hashlib.sha256(self.content).hexdigest()
+        resource = TaskResource.objects.get(pk=response.data['id'])
+        self.assertEqual((resource.name, resource.sha256, resource.file_size), ('layout.fig', digest, 2500))
+        self.assertEqual(resource.blob.ref_count, 1)
+        self.assertTrue(resource.file.name.startswith(f"blobs/{digest[:2]}/{digest[2:4]}/{digest}"))
+        with resource.file.open('rb') as stored:
+            self.assertEqual(stored.read(), self.content)
+        self.assertFalse(os.path.exists(UploadSession.objects.get(pk=session_id).temp_path))
+
+    def test_identical_content_is_stored_once_with_ref_count(self):
+        digest = hashlib.sha256(self.content).hexdigest()
+        first = self.client.post('/api/v1/tasks/resources/', {
+            'task': self.task.id, 'resource_type': 'file', 'file': SimpleUploadedFile('a.bin', self.content),
+        }, format='multipart')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+
+        # Клієнт знає хеш — сесія завершується без передачі байтів
+        response = self.client.post('/api/v1/uploads/', {
+            'filename': 'b.bin', 'total_size': len(self.content), 'sha256': digest
+        })
+        self.assertEqual(response.data['status'], UploadSession.STATUS_UPLOADED)
+        response = self.client.post(f"/api/v1/uploads/{response.data['id']}/finalize/", {'task': self.other_task.id})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        blob = FileBlob.objects.get(sha256=digest)
+        self.assertEqual(FileBlob.objects.count(), 1)
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(set(TaskResource.objects.values_list('file', flat=True)), {blob.file.name})
+
+        TaskResource.objects.get(pk=first.data['id']).delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+
+    def test_outsider_cannot_claim_content_by_hash(self):
+        digest = hashlib.sha256(self.content).hexdigest()
+        self.client.post('/api/v1/tasks/resources/', {
+            'task': self.task.id, 'resource_type': 'file', 'file': SimpleUploadedFile('a.bin', self.content),
+        }, format='multipart')
+
+        outsider = User.objects.create_user(username='outsider', email='outsider@test.com', password='123')
+        own_project = Project.objects.create(name="Own", key="OWN", owner=outsider)
+        ProjectMember.objects.create(project=own_project, user=outsider, role='owner')
+        own_task = Task.objects.create(project=own_project, title="Своя", reporter=outsider)
+        self.client.force_authenticate(user=outsider)
+
+        # Хеш чужого файлу не завершує сесію і не видає, що такий вміст існує
+        response = self.client.post('/api/v1/uploads/', {
+            'filename': 'stolen.bin', 'total_size': len(self.content), 'sha256': digest
+        })
+        self.assertEqual(response.data['status'], UploadSession.STATUS_ACTIVE)
+        self.assertEqual(response.data['received_bytes'], 0)
+        response = self.client.post(f"/api/v1/uploads/{response.data['id']}/finalize/", {'task': own_task.id})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(TaskResource.objects.filter(task=own_task).exists())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), OBJECT_STORAGE={
+    **settings.OBJECT_STORAGE, 'ENDPOINT_URL': 'http://testserver/storage', 'SECRET_KEY': 'object-storage-test',
+})
+class DirectUploadTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='direct_user', email='direct@test.com', password='123')
+        self.project = Project.objects.create(name="Direct", key="DIR", owner=self.user)
+        ProjectMember.objects.create(project=self.project, user=self.user, role='owner')
+        self.task = Task.objects.create(project=self.project, title="Прямо у сховище", reporter=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def test_presigned_put_and_get_bypass_the_api(self):
+        content = os.urandom(4096)
+        response = self.client.post('/api/v1/uploads/direct/', {
+            'filename': 'scan.png', 'total_size': len(content), 'sha256': hashlib.sha256(content).hexdigest()
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        session_id, upload = response.data['id'], response.data['upload']
+
+        # Сховище перевіряє підпис і підписаний SHA-256 вмісту
+        tampered = self.client.generic('PUT', upload['url'], b'x' * 4096, content_type='image/png',
+                                       headers=upload['headers'])
+        self.assertEqual(tampered.status_code, status.HTTP_400_BAD_REQUEST)
+        forged = self.client.generic('PUT', upload['url'].replace('/uploads/direct/', '/uploads/other/'), content,
+                                     content_type='image/png', headers=upload['headers'])
+        self.assertEqual(forged.status_code, status.HTTP_403_FORBIDDEN)
+
+        stored = self.client.generic('PUT', upload['url'], content, content_type='image/png', headers=upload['headers'])
+        self.assertEqual(stored.status_code, status.HTTP_200_OK)
+
+        response = self.client.post(f'/api/v1/uploads/{session_id}/finalize/', {'task': self.task.id})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['file_size'], response.data['mime_type']), (4096, 'image/png'))
+        # Об'єкт сесії перенесено на ключ блоба
+        digest = hashlib.sha256(content).hexdigest()
+        self.assertEqual(TaskResource.objects.get(pk=response.data['id']).file.name,
+                         f"blobs/{digest[:2]}/{digest[2:4]}/{digest}.png")
+
+        # Підписаний GET-URL сховища у відповідь не потрапляє — тільки download_url з перевіркою доступу
+        self.assertNotIn('file', response.data)
+        download = self.client.get(response.data['download_url'])
+        self.assertEqual(b''.join(download.streaming_content), content)
+
+        # Сховище віддає об'єкт за підписом, стабільним у межах вікна кешування
+        signed_url = TaskResource.objects.get(pk=response.data['id']).file.url
+        self.assertIn('X-Amz-Signature=', signed_url)
+        self.assertEqual(TaskResource.objects.get(pk=response.data['id']).file.url, signed_url)
+        download = self.client.get(signed_url)
+        self.assertEqual(b''.join(download.streaming_content), content)
+
+    def test_outsider_cannot_claim_stored_blob_by_hash(self):
+        content = os.urandom(4096)
+        digest = hashlib.sha256(content).hexdigest()
+        session = self.client.post('/api/v1/uploads/direct/', {
+            'filename': 'secret.png', 'total_size': len(content), 'sha256': digest
+        }).data
+        self.client.generic('PUT', session['upload']['url'], content, content_type='image/png',
+                            headers=session['upload']['headers'])
+        self.client.post(f"/api/v1/uploads/{session['id']}/finalize/", {'task': self.task.id})
+
+        outsider = User.objects.create_user(username='direct_outsider', email='do@test.com', password='123')
+        own_project = Project.objects.create(name="Own direct", key="ODR", owner=outsider)
+        ProjectMember.objects.create(project=own_project, user=outsider, role='owner')
+        own_task = Task.objects.create(project=own_project, title="Своя", reporter=outsider)
+        self.client.force_authenticate(user=outsider)
+
+        # Об'єкт за ключем блоба вже існує, але finalize без власного PUT його не зараховує
+        response = self.client.post('/api/v1/uploads/direct/', {
+            'filename': 'stolen.png', 'total_size': len(content), 'sha256': digest
+        })
+        self.assertEqual(response.data['status'], UploadSession.STATUS_ACTIVE)
+        self.assertNotIn('/blobs/', response.data['upload']['url'])
+        response = self.client.post(f"/api/v1/uploads/{response.data['id']}/finalize/", {'task': own_task.id})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(TaskResource.objects.filter(task=own_task).exists())
+
+    def _urlopen_via_client(self, request, timeout=None):
+        """Відправляє запити S3Storage у локальну заглушку через тестовий клієнт."""
+        body = request.data.read() if hasattr(request.data, 'read') else request.data or b''
+        headers = {name: value for name, value in request.header_items()
+                   if name.lower() not in ('content-type', 'content-length')}
+        response = self.client.generic(request.get_method(), request.full_url, body,
+                                       content_type=request.get_header('Content-type', ''), headers=headers)
+        if response.status_code >= 400:
+            raise HTTPError(request.full_url, response.status_code, '', response.headers, None)
+        result = io.BytesIO(b''.join(response.streaming_content) if response.streaming else response.content)
+        result.headers = response.headers
+        return result
+
+    def test_s3_storage_works_through_signed_requests(self):
+        storage = S3Storage()
+        content = os.urandom(2048)
+        with mock.patch('Core.object_storage.urlopen', side_effect=self._urlopen_via_client):
+            name = storage.save('uploads/direct/s3-check', ContentFile(content))
+            self.assertEqual((storage.exists(name), storage.size(name)), (True, 2048))
+
+            # Перенесення на ключ блоба — серверна копія + видалення сесійного об'єкта
+            moved = storage.move(name, 'blobs/aa/bb/s3-check.bin')
+            self.assertFalse(storage.exists(name))
+            with storage.open(moved) as stored:
+                self.assertEqual(stored.read(), content)
+
+            storage.delete(moved)
+            with self.assertRaises(FileNotFoundError):
+                storage.open(moved)
+
+
+class MediaGarbageCollectionTests(APITestCase):
+
+    def setUp(self):
+        # Окреме сховище на кожен тест: обхід рахує всі файли в MEDIA_ROOT
+        self.enterContext(override_settings(MEDIA_ROOT=tempfile.mkdtemp(), MEDIA_GC_QUARANTINE_DIR=tempfile.mkdtemp()))
+        self.user = User.objects.create_user(username='gc_user', email='gc@test.com', password='123')
+        self.project = Project.objects.create(name="GC", key="GCX", owner=self.user)
+        self.task = Task.objects.create(project=self.project, title="Сміття", reporter=self.user)
+        self.kept = TaskResource.objects.create(
+            task=self.task, resource_type='file', file=SimpleUploadedFile('kept.txt', b"still attached")
+        )
+        removed = TaskResource.objects.create(
+            task=self.task, resource_type='file', file=SimpleUploadedFile('gone.txt', b"detached later")
+        )
+        self.released_blob_id = removed.blob_id
+        removed.delete()
+
+        self.orphan = os.path.join(settings.MEDIA_ROOT, 'avatars', 'replaced.png')
+        self.fresh = os.path.join(settings.MEDIA_ROOT, 'task_attachments', 'uploading.bin')
+        for path in (self.orphan, self.fresh):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as target:
+                target.write(b"x" * 1000)
+
+        # Усе, крім "свіжого" файлу, старше за grace-період
+        old = time.time() - 3 * 24 * 3600
+        FileBlob.objects.update(created_at=timezone.now() - timedelta(days=3))
+        for root, _, files in os.walk(settings.MEDIA_ROOT):
+            for name in files:
+                if os.path.join(root, name) != self.fresh:
+                    os.utime(os.path.join(root, name), (old, old))
+
+    def test_dry_run_reports_and_run_removes_only_unreferenced_old_files(self):
+        blob_path = FileBlob.objects.get(pk=self.released_blob_id).file.path
+
+        report = collect_media_garbage(dry_run=True)
+        self.assertEqual((report['orphaned'], report['reclaimed_bytes'], report['blobs_released']), (1, 1000, 1))
+        self.assertTrue(os.path.exists(self.orphan))
+
+        report = collect_media_garbage()
+        self.assertTrue(report['complete'])
+        # Файл звільненого блоба видаляється разом з його рядком, обхід його вже не бачить
+        self.assertEqual((report['orphaned'], report['reclaimed_bytes'], report['blobs_released']), (1, 1000, 1))
+        self.assertFalse(os.path.exists(self.orphan))
+        self.assertFalse(os.path.exists(blob_path))
+        self.assertFalse(FileBlob.objects.filter(pk=self.released_blob_id).exists())
+        self.assertTrue(os.path.exists(self.fresh))
+        self.assertTrue(os.path.exists(self.kept.file.path))
+
+    def test_files_referenced_after_snapshot_are_kept(self):
+        # Вкладення з'явилось після знімка referenced_paths — перевірка перед видаленням його бачить
+        with mock.patch('uploads.gc.referenced_paths', return_value=set()):
+            report = collect_media_garbage()
+        self.assertEqual(report['orphaned'], 1)
+        self.assertTrue(os.path.exists(self.kept.file.path))
+        self.assertFalse(os.path.exists(self.orphan))
+
+    def test_walk_resumes_from_saved_position_and_quarantines(self):
+        cache.delete(CURSOR_KEY)
+        first = collect_media_garbage(quarantine=True, max_files=1)
+        self.assertFalse(first['complete'])
+
+        second = collect_media_garbage(quarantine=True)
+        self.assertTrue(second['complete'])
+        self.assertEqual(first['scanned'] + second['scanned'], 3)
+        self.assertTrue(os.path.exists(os.path.join(settings.MEDIA_GC_QUARANTINE_DIR, 'avatars', 'replaced.png')))
@@ -0,0 +1,264 @@
+import os
+import re
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+from Core.files import file_extension, file_metadata, guess_mime_type
+from projects.membership import get_member_project_ids
+from projects.models import ProjectResource
+from projects.serializers import ProjectResourceSerializer
+from tasks.models import TaskResource
+from tasks.serializers import TaskResourceSerializer
+from .blobs import SessionFile, register_blob, store_blob
+from .models import FileBlob, UploadSession, direct_upload_key
+from .serializers import UploadFinalizeSerializer, UploadSessionSerializer
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+# Розмір буфера при записі чанка на диск (пам'ять на запит не залежить від розміру чанка)
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+def parse_content_range(value):
+    """'bytes 0-1023/4096' -> (0, 1023, 4096); ValueError для некоректного заголовка."""
+    match = CONTENT_RANGE_RE.match(value or '')
+    if match is None:
+        raise ValueError(value)
+    start, end, total = (int(group) for group in match.groups())
+    if start > end or end >= total:
+        raise ValueError(value)
+    return start, end, total
+
+
+def write_chunk(path, offset, stream, length):
+    """Потоково пише length байт з stream у файл з позиції offset; повертає кількість записаних."""
+    written = 0
+    with open(path, 'r+b') as target:
+        target.seek(offset)
+        while written < length:
+            buffer = stream.read(min(STREAM_BUFFER_SIZE, length - written))
+            if not buffer:
+                break
+            target.write(buffer)
+            written += len(buffer)
+    return written
+
+
+class UploadSessionViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                           mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Порційне (resumable) завантаження вкладень.
+    POST /uploads/ -> Почати сесію (filename, total_size, необов'язково sha256).
+    GET /uploads/{id}/ -> Скільки байт уже отримано (звідки продовжувати після обриву).
+    PUT /uploads/{id}/chunk/ з Content-Range: bytes 0-5242879/73400320 -> Дописати чанк.
+    POST /uploads/direct/ -> Почати пряме завантаження у сховище (sha256 обов'язковий):
+                             відповідь містить підписаний PUT-URL, байти йдуть повз Django.
+    POST /uploads/{id}/finalize/ -> Перевірити хеш і прикріпити файл до задачі або проєкту.
+    DELETE /uploads/{id}/ -> Скасувати завантаження.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(user=self.request.user)
+
+    def _reachable_blob(self, sha256, file_size):
+        """
+        Блоб з таким вмістом, якщо користувач уже має доступ до вкладення з ним.
+        Хеш і розмір — не доказ володіння файлом: інакше будь-хто отримав би чужий файл,
+        знаючи лише його SHA-256, а статус сесії видавав би, чи такий вміст існує.
+        """
+        blobs = FileBlob.objects.filter(sha256=sha256, file_size=file_size)
+        user = self.request.user
+        if not (user.is_staff or user.is_superuser):
+            project_ids = get_member_project_ids(user.id)
+            blobs = blobs.filter(
+                Exists(TaskResource.objects.filter(blob=OuterRef('pk'), task__project_id__in=project_ids))
+                | Exists(ProjectResource.objects.filter(blob=OuterRef('pk'), project_id__in=project_ids))
+            )
+        return blobs.first()
+
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        # Такий вміст уже доступний користувачу — байти можна не передавати взагалі.
+        # Для решти сесія звичайна: вміст доведеться передати, а дублікат відсіє store_blob
+        blob = None
+        if data.get('sha256'):
+            blob = self._reachable_blob(data['sha256'], data['total_size'])
+
+        if blob is not None:
+            serializer.save(
+                user=self.request.user, blob=blob,
+                status=UploadSession.STATUS_UPLOADED, received_bytes=data['total_size']
+            )
+            return
+
+        if self.action == 'direct':
+            serializer.save(user=self.request.user, storage_key=direct_upload_key())
+            return
+
+        session = serializer.save(user=self.request.user)
+        os.makedirs(settings.UPLOAD_SESSION_DIR, exist_ok=True)
+        open(session.temp_path, 'wb').close()
+
+    @action(detail=False, methods=['post'])
+    def direct(self, request):
+        if not request.data.get('sha256'):
+            return Response({"sha256": ["Для прямого завантаження потрібен SHA-256 файлу."]},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return self.create(request)
+
+    def perform_destroy(self, instance):
+        path, storage_key = instance.temp_path, instance.storage_key
+        instance.delete()
+        if os.path.exists(path):
+            os.remove(path)
+        if storage_key and instance.status != UploadSession.STATUS_FINALIZED:
+            default_storage.delete(storage_key)
+
+    @action(detail=True, methods=['put'])
+    def chunk(self, request, pk=None):
+        session = self.get_object()
+        if session.status != UploadSession.STATUS_ACTIVE:
+            return Response({"error": "Файл уже завантажено."}, status=status.HTTP_409_CONFLICT)
+        if session.storage_key:
+            return Response({"error": "Файл цієї сесії завантажується напряму у сховище (upload.url)."},
+                            status=status.HTTP_409_CONFLICT)
+
+        try:
+            start, end, total = parse_content_range(request.headers.get('Content-Range'))
+        except ValueError:
+            return Response({"error": "Потрібен заголовок Content-Range: bytes start-end/total."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if total != session.total_size:
+            return Response({"error": "Розмір файлу не збігається з сесією."}, status=status.HTTP_400_BAD_REQUEST)
+
+        length = end - start + 1
+        if length > settings.UPLOAD_MAX_CHUNK_SIZE:
+            return Response({"error": f"Максимальний розмір чанка — {settings.UPLOAD_MAX_CHUNK_SIZE} байт."},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        # Повтор уже отриманого чанка (клієнт не дочекався відповіді) — нічого не пише
+        if end < session.received_bytes:
+            return Response(self.get_serializer(session).data)
+        # Чанки пишуться строго послідовно: клієнт продовжує з received_bytes
+        if start != session.received_bytes or request.stream is None:
+            return Response(
+                {"error": "Очікується чанк з іншої позиції.", "received_bytes": session.received_bytes},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        written = write_chunk(session.temp_path, start, request.stream, length)
+        if written != length:
+            return Response({"error": "Чанк отримано не повністю.", "received_bytes": session.received_bytes},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # Оптимістичне оновлення: з двох паралельних PUT однієї позиції зараховується один
+        updated = UploadSession.objects.filter(pk=session.pk, received_bytes=start).update(
+            received_bytes=end + 1, updated_at=timezone.now()
+        )
+        if not updated:
+            session.refresh_from_db(fields=['received_bytes'])
+            return Response(
+                {"error": "Чанк уже записано паралельним запитом.", "received_bytes": session.received_bytes},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        session.received_bytes = end + 1
+        return Response(self.get_serializer(session).data)
+
+    def _check_target_access(self, data):
+        user = self.request.user
+        if user.is_staff or user.is_superuser:
+            return
+        if 'task' in data:
+            if data['task'].project_id not in get_member_project_ids(user.id):
+                raise PermissionDenied("Ви не можете завантажувати файли до задачі з чужого проєкту.")
+        elif data['project'].owner_id != user.id:
+            raise PermissionDenied("Додавати матеріали проєкту може лише власник або адмін.")
+
+    def _store_session_file(self, session):
+        """Перевіряє розмір і хеш отриманого файлу та переносить його у спільний блоб."""
+        if session.received_bytes != session.total_size:
+            return None, f"Отримано {session.received_bytes} з {session.total_size} байт."
+
+        with SessionFile(open(session.temp_path, 'rb'), name=session.filename) as content:
+            metadata = file_metadata(content, name=session.filename)
+            if metadata['file_size'] != session.total_size:
+                return None, "Розмір отриманого файлу не збігається з сесією."
+            if session.sha256 and metadata['sha256'] != session.sha256:
+                return None, "SHA-256 отриманого файлу не збігається з очікуваним."
+            blob = store_blob(content, metadata['sha256'], metadata['file_size'],
+                              metadata['mime_type'], session.filename)
+
+        # FileSystemStorage переносить тимчасовий файл; інші сховища його копіюють
+        if os.path.exists(session.temp_path):
+            os.remove(session.temp_path)
+        return blob, None
+
+    def _register_direct_upload(self, session):
+        """Реєструє об'єкт, завантажений напряму у сховище: тільки HEAD, без читання вмісту."""
+        if not default_storage.exists(session.storage_key):
+            return None, "Файл ще не завантажено у сховище."
+        size = default_storage.size(session.storage_key)
+        if size != session.total_size:
+            return None, "Розмір завантаженого об'єкта не збігається з сесією."
+        blob = register_blob(session.storage_key, session.sha256, size, guess_mime_type(session.filename),
+                             session.filename)
+        if blob is None:
+            return None, "Файл ще не завантажено у сховище."
+        return blob, None
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        finalize_serializer = UploadFinalizeSerializer(data=request.data)
+        finalize_serializer.is_valid(raise_exception=True)
+        data = finalize_serializer.validated_data
+        self._check_target_access(data)
+
+        with transaction.atomic():
+            session = self.get_queryset().select_for_update().get(pk=self.get_object().pk)
+            if session.status == UploadSession.STATUS_FINALIZED:
+                return Response({"error": "Файл уже прикріплено."}, status=status.HTTP_409_CONFLICT)
+
+            if session.status == UploadSession.STATUS_ACTIVE:
+                store = self._register_direct_upload if session.storage_key else self._store_session_file
+                blob, error = store(session)
+                if error:
+                    return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+                session.blob = blob
+
+            blob = session.blob
+            if blob is None:
+                return Response({"error": "Вміст сесії більше не доступний, почніть завантаження заново."},
+                                status=status.HTTP_409_CONFLICT)
+            metadata = {
+                'file': blob.file.name,
+                'blob': blob,
+                'file_size': blob.file_size,
+                'file_extension': file_extension(session.filename),
+                'mime_type': blob.mime_type,
+                'sha256': blob.sha256,
+            }
+            name = data.get('name', '').strip() or session.filename
+            if 'task' in data:
+                resource = TaskResource.objects.create(
+                    task=data['task'], comment=data.get('comment'), uploaded_by=request.user,
+                    name=name, resource_type=TaskResource.TYPE_FILE, **metadata
+                )
+                payload = TaskResourceSerializer(resource, context=self.get_serializer_context()).data
+            else:
+                resource = ProjectResource.objects.create(
+                    project=data['project'], name=name, resource_type=ProjectResource.TYPE_FILE, **metadata
+                )
+                payload = ProjectResourceSerializer(resource, context=self.get_serializer_context()).data
+
+            session.status = UploadSession.STATUS_FINALIZED
+            session.save(update_fields=['status', 'blob', 'updated_at'])
+
+        return Response(payload, status=status.HTTP_201_CREATED)
@@ -0,0 +1,124 @@
+import time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+REVOKED_KEY_PREFIX = 'auth:revoked'
+CLAIMS_CHANGED_KEY_PREFIX = 'auth:claims_changed'
+
+# Claims, з яких відновлюється користувач (поле моделі -> claim)
+USER_CLAIMS = {
+    'is_staff': 'is_staff',
+    'is_superuser': 'is_superuser',
+    'global_role': 'global_role',
+    'is_active': 'is_active',
+}
+CLAIMS_ISSUED_AT = 'claims_at'
+
+
+def _revoked_key(user_id):
+    return f"{REVOKED_KEY_PREFIX}:{user_id}"
+
+
+def _claims_changed_key(user_id):
+    return f"{CLAIMS_CHANGED_KEY_PREFIX}:{user_id}"
+
+
+def add_user_claims(token, user):
+    """Додає в токен дані, достатні для авторизації без запиту в БД."""
+    for field, claim in USER_CLAIMS.items():
+        token[claim] = getattr(user, field)
+    # Окрема мітка, бо refresh копіює claims у новий access-токен зі свіжим iat
+    token[CLAIMS_ISSUED_AT] = int(time.time())
+    return token
+
+
+def revoke_user_tokens(user_id):
+    """
+    Відкликає всі видані токени юзера (деактивація).
+    Запис живе стільки ж, скільки access-токен, — потім старі токени недійсні самі.
+    """
+    lifetime = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+    cache.set(_revoked_key(user_id), True, lifetime)
+
+
+def restore_user_tokens(user_id):
+    cache.delete(_revoked_key(user_id))
+
+
+def is_user_revoked(user_id):
+    return bool(cache.get(_revoked_key(user_id)))
+
+
+def invalidate_user_claims(user_id):
+    """
+    Змінились права юзера (роль, staff): claims уже виданих токенів застарілі.
+    Такі токени лишаються дійсними, але користувач для них читається з БД.
+    """
+    lifetime = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+    cache.set(_claims_changed_key(user_id), int(time.time()), lifetime)
+
+
+class FastJWTAuthentication(JWTAuthentication):
+    """
+    JWT-автентифікація без SELECT користувача на кожен запит.
+
+    Поки токен свіжий (FAST_JWT_TRUST_SECONDS), користувач відновлюється з підписаних claims
+    як модель з відкладеними (deferred) полями: FK, фільтри і права працюють без БД,
+    а звернення до інших полів (email, аватар) дочитає їх за потребою.
+    Деактивовані юзери відсікаються через Redis ще до перевірки claims.
+
+    Запити, що змінюють дані (POST/PUT/PATCH/DELETE), читають юзера з БД одним SELECT:
+    вони зазвичай записують ім'я та аватар автора, і кожне відкладене поле коштувало б
+    окремого запиту.
+    """
+    load_from_db = False
+
+    def authenticate(self, request):
+        self.load_from_db = request.method not in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        try:
+            user_id = int(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, TypeError, ValueError):
+            return super().get_user(validated_token)
+
+        flags = cache.get_many([_revoked_key(user_id), _claims_changed_key(user_id)])
+        if flags.get(_revoked_key(user_id)):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        claims_at = validated_token.get(CLAIMS_ISSUED_AT)
+        claims_changed_at = flags.get(_claims_changed_key(user_id))
+        if (
+            self.load_from_db
+            or claims_at is None
+            or time.time() - claims_at > settings.FAST_JWT_TRUST_SECONDS
+            # Права змінились після видачі токена — claims застарілі
+            or (claims_changed_at is not None and claims_at <= claims_changed_at)
+        ):
+            # Звичайна перевірка через БД
+            return super().get_user(validated_token)
+
+        if not validated_token.get('is_active', False):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return self.hydrate_user(user_id, validated_token)
+
+    @staticmethod
+    def hydrate_user(user_id, validated_token):
+        values = {'id': user_id}
+        values.update({field: validated_token[claim] for field, claim in USER_CLAIMS.items()})
+
+        # from_db очікує значення в порядку полів моделі; решта полів стають deferred,
+        # тому save() такого об'єкта оновить лише ці поля
+        field_names = [f.attname for f in User._meta.concrete_fields if f.attname in values]
+        return User.from_db(DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names])
@@ -0,0 +1,113 @@
+import hashlib
+import logging
+from io import BytesIO
+from PIL import Image, ImageOps, UnidentifiedImageError
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = 'avatars/variants'
+DEFAULT_FORMAT = 'webp'
+# Формат -> (кодек Pillow, параметри збереження). JPEG — для клієнтів без WebP (листи, старі застосунки)
+VARIANT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 6}),
+    'jpeg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+
+def _flatten(image):
+    """RGB без прозорості: прозорий фон PNG/WebP стає білим, а не чорним."""
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render_variants(source, prefix):
+    """
+    Рендерить квадратні варіанти всіх розмірів AVATAR_VARIANT_SIZES у всіх форматах
+    і зберігає їх у сховище. Повертає {розмір: {формат: шлях}}.
+    """
+    variants = {}
+    with Image.open(source) as image:
+        # JPEG декодується одразу у зменшеному масштабі — великий оригінал не розгортається повністю
+        largest = max(settings.AVATAR_VARIANT_SIZES.values())
+        image.draft('RGB', (largest * 2, largest * 2))
+        image = _flatten(ImageOps.exif_transpose(image))
+
+        for size_name, pixels in settings.AVATAR_VARIANT_SIZES.items():
+            thumbnail = ImageOps.fit(image, (pixels, pixels), Image.Resampling.LANCZOS)
+            for image_format, (codec, options) in VARIANT_FORMATS.items():
+                buffer = BytesIO()
+                thumbnail.save(buffer, codec, **options)
+                path = default_storage.save(f"{prefix}-{size_name}.{image_format}", ContentFile(buffer.getvalue()))
+                variants.setdefault(size_name, {})[image_format] = path
+    return variants
+
+
+def generate_avatar_variants(user_id):
+    """
+    Рендерить варіанти поточного аватара юзера і записує шляхи в avatar_variants.
+    Імена файлів містять хеш оригіналу, тому вміст за шляхом ніколи не змінюється
+    і його можна кешувати назавжди. Повертає варіанти або None.
+    """
+    User = get_user_model()
+    user = User.objects.filter(pk=user_id).only('id', 'avatar').first()
+    if user is None or not user.avatar:
+        return None
+    source_name = user.avatar.name
+
+    try:
+        with user.avatar.open('rb') as source:
+            digest = hashlib.sha256()
+            for chunk in source.chunks():
+                digest.update(chunk)
+            source.seek(0)
+            variants = render_variants(source, f"{VARIANTS_DIR}/{user.pk}/{digest.hexdigest()[:16]}")
+    except (UnidentifiedImageError, OSError) as error:
+        logger.warning("Не вдалося зробити варіанти аватара юзера %s: %s", user_id, error)
+        return None
+
+    with transaction.atomic():
+        current = User.objects.select_for_update().get(pk=user_id)
+        if current.avatar.name != source_name:
+            # Аватар замінили під час рендерингу — варіанти зробить наступна задача
+            for paths in variants.values():
+                for path in paths.values():
+                    default_storage.delete(path)
+            return None
+        current.avatar_variants = variants
+        current.save(update_fields=['avatar_variants'])
+    return variants
+
+
+def avatar_url(user, size, image_format=DEFAULT_FORMAT):
+    """URL варіанта потрібного розміру; поки варіанти не готові — URL оригіналу."""
+    if user is None or not user.avatar:
+        return None
+    path = (user.avatar_variants or {}).get(size, {}).get(image_format)
+    return default_storage.url(path) if path else user.avatar.url
+
+
+class AvatarField(serializers.Field):
+    """
+    URL аватара розміру size ('sm', 'md', 'lg') замість багатомегабайтного оригіналу.
+    source — юзер: '*' для серіалізаторів юзера, 'assignee' / 'author' для вкладених.
+    """
+
+    def __init__(self, size, **kwargs):
+        self.size = size
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, user):
+        url = avatar_url(user, self.size)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if url and request is not None else url
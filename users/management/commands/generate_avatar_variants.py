@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from users.avatars import generate_avatar_variants
+
+
+class Command(BaseCommand):
+    help = 'Рендерить зменшені варіанти аватарів, завантажених до появи фонового конвеєра'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Перегенерувати і вже готові варіанти')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = User.objects.exclude(avatar='').exclude(avatar__isnull=True)
+        if not options['all']:
+            users = users.filter(avatar_variants={})
+
+        self.stdout.write(self.style.WARNING("⏳ Рендерю варіанти аватарів..."))
+        done = failed = 0
+        for user_id in users.order_by('pk').values_list('pk', flat=True).iterator():
+            if generate_avatar_variants(user_id):
+                done += 1
+            else:
+                failed += 1
+        self.stdout.write(self.style.SUCCESS(f"Готово! Оброблено: {done}, не вдалося: {failed}"))
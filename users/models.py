@@ -25,12 +25,17 @@ class CustomUser(AbstractUser):
 
     # Додаткова інфо
     avatar = models.ImageField(upload_to='avatars/', null=True, blank=True, verbose_name="Аватар")
+    # Зменшені копії аватара {'sm': {'webp': шлях, 'jpeg': шлях}, ...}; рендеряться у фоні (users/avatars.py)
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Варіанти аватара")
     job_title = models.CharField(max_length=100, blank=True, verbose_name="Посада")
 
     # Контакти
     phone = models.CharField(max_length=20, blank=True, verbose_name="Телефон")
     telegram = models.CharField(max_length=50, blank=True, verbose_name="Telegram (@username)") # пізніше можна переназвати
 
+    # Поля, які показуються в чужих об'єктах (задачі, коментарі, учасники) — зміна оновлює їх ETag
+    DISPLAY_FIELDS = ('email', 'first_name', 'last_name', 'avatar', 'avatar_variants')
+
     # Права доступу (Глобальні)
     global_role = models.TextField(
         choices=GLOBAL_ROLE_CHOICES,
@@ -44,6 +49,16 @@ class CustomUser(AbstractUser):
     # Поля, які обов'язкові при створенні суперюзера (крім email та пароля)
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
 
+    def save(self, *args, **kwargs):
+        # Новий або видалений аватар: старі варіанти більше не відповідають оригіналу,
+        # до готовності нових серіалізатори віддають оригінал (сигнал ставить задачу рендерингу)
+        self._avatar_replaced = bool(self.avatar) and not self.avatar._committed
+        if self._avatar_replaced or (not self.avatar and self.avatar_variants):
+            self.avatar_variants = {}
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'avatar_variants'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         # Відображення в адмінці: "ivan@test.com (Backend Dev)"
         role_mark = "[A]" if self.global_role == self.ROLE_ADMIN else "[U]"
@@ -5,34 +5,90 @@ from django.utils.http import urlsafe_base64_decode
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.utils.encoding import force_str
 from django.db import transaction
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .authentication import add_user_claims, is_user_revoked
+from Core.sparse_fields import SparseFieldsetMixin
+from .avatars import AvatarField
 
 User = get_user_model()
 
 # --- 1. Основні серіалізатори ---
 
+class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Додає в токени роль і статус користувача (для FastJWTAuthentication).
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Оновлення токена з актуальними claims: юзер перечитується з БД, деактивовані
+    та відкликані відхиляються, а claims (з міткою claims_at) ставляться заново.
+    Інакше новий access-токен успадковував би мітку логіну і через FAST_JWT_TRUST_SECONDS
+    кожен запит знову читав би юзера з БД.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user) or is_user_revoked(user.pk):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        # Claims refresh-токена копіюються в новий access-токен
+        add_user_claims(refresh, user)
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    # Застосунок token_blacklist не встановлено
+                    pass
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data['refresh'] = str(refresh)
+        return data
+
+
 class UserSerializer(serializers.ModelSerializer):
     """
     Серіалізатор для перегляду профілю користувача.
+    avatar — оригінал (для завантаження), avatar_large — готова мініатюра для показу.
     """
+    avatar_large = AvatarField('lg', source='*')
+
     class Meta:
         model = User
         fields = [
             'id', 'email', 'first_name', 'last_name',
-            'avatar', 'job_title', 'phone', 'telegram',
+            'avatar', 'avatar_large', 'job_title', 'phone', 'telegram',
             'global_role'
         ]
         read_only_fields = ['id', 'email', 'global_role', 'job_title']
 
-class UserSummarySerializer(serializers.ModelSerializer):
+class UserSummarySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Полегшений серіалізатор для пошуку та списків.
     Повертає тільки публічну інформацію.
     """
     full_name = serializers.ReadOnlyField(source='get_full_name')
+    avatar = AvatarField('sm', source='*')
 
     class Meta:
         model = User
         fields = ['id', 'email', 'full_name', 'avatar', 'job_title', 'phone', 'telegram',]
+        field_sources = {'full_name': ['first_name', 'last_name'], 'avatar': ['avatar', 'avatar_variants']}
 
 class UserManageSerializer(serializers.ModelSerializer):
     """
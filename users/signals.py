@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import CustomUser
+from .tasks import generate_avatar_variants_async
+
+
+@receiver(post_save, sender=CustomUser)
+def schedule_avatar_variants(sender, instance, **kwargs):
+    # Рендеринг після коміту: воркер має побачити вже збережений файл і шлях
+    if getattr(instance, '_avatar_replaced', False):
+        user_id = instance.pk
+        transaction.on_commit(lambda: generate_avatar_variants_async.delay(user_id))
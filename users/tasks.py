@@ -0,0 +1,9 @@
+from celery import shared_task
+from .avatars import generate_avatar_variants
+
+
+@shared_task
+def generate_avatar_variants_async(user_id):
+    """Фонова задача: рендерить зменшені копії аватара після завантаження."""
+    variants = generate_avatar_variants(user_id)
+    return f"Avatar variants for user {user_id}: {len(variants) if variants else 0} sizes."
@@ -1,6 +1,21 @@
-from rest_framework.test import APITestCase
+import tempfile
+import time
+from unittest import mock
+from io import BytesIO
+from urllib.parse import parse_qs, urlsplit
+from PIL import Image
+from rest_framework.test import APIRequestFactory, APITestCase
 from rest_framework import status
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from projects.models import Project, ProjectMember
+from tasks.models import Task
+from django.core.cache import cache
+from rest_framework_simplejwt.tokens import AccessToken
+from users.authentication import FastJWTAuthentication
 
 User = get_user_model()
 
@@ -63,4 +78,134 @@ class UserAPITests(APITestCase):
         }
         response_login = self.client.post(url_token, data_login)
 
-        self.assertEqual(response_login.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
+        self.assertEqual(response_login.status_code, status.HTTP_401_UNAUTHORIZED)
+
+class FastJWTAuthenticationTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.member = User.objects.create_user(username='jwt_member', email='jwt@test.com', password='strongpassword123')
+        self.admin = User.objects.create_superuser(username='jwt_admin', email='jwtadmin@test.com', password='adminpass123')
+
+    def _login(self, email, password):
+        response = self.client.post('/api/v1/users/token/', {"email": email, "password": password})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['access']
+
+    def test_fresh_token_authenticates_without_user_query(self):
+        """Свіжий токен: користувач відновлюється з claims без SELECT у БД"""
+        token = AccessToken(self._login('jwt@test.com', 'strongpassword123'))
+
+        with self.assertNumQueries(0):
+            user = FastJWTAuthentication().get_user(token)
+
+        self.assertEqual(user.pk, self.member.pk)
+        self.assertFalse(user.is_staff)
+        self.assertEqual(user.global_role, User.ROLE_USER)
+
+    def test_deactivation_revokes_issued_tokens(self):
+        """Деактивований адміном юзер втрачає доступ одразу, навіть зі свіжим токеном"""
+        access = self._login('jwt@test.com', 'strongpassword123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(self.client.get('/api/v1/users/me/').status_code, status.HTTP_200_OK)
+
+        self.client.credentials()
+        self.client.force_authenticate(user=self.admin)
+        self.client.delete(f'/api/v1/users/{self.member.id}/')
+        self.client.force_authenticate(user=None)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(self.client.get('/api/v1/users/me/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_role_change_makes_issued_claims_stale(self):
+        """Після зміни ролі свіжий токен більше не довіряє старим claims — юзер читається з БД"""
+        token = AccessToken(self._login('jwt@test.com', 'strongpassword123'))
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.patch(f'/api/v1/users/{self.member.id}/', {"global_role": User.ROLE_ADMIN})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        user = FastJWTAuthentication().get_user(token)
+        self.assertEqual(user.global_role, User.ROLE_ADMIN)
+
+    def test_refreshed_token_is_trusted_after_login_window(self):
+        """Оновлений після вікна довіри токен знову автентифікується без SELECT у БД"""
+        response = self.client.post('/api/v1/users/token/', {"email": 'jwt@test.com', "password": 'strongpassword123'})
+        refresh = response.data['refresh']
+
+        later = time.time() + settings.FAST_JWT_TRUST_SECONDS + 60
+        with mock.patch('users.authentication.time.time', return_value=later):
+            response = self.client.post('/api/v1/users/token/refresh/', {"refresh": refresh})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            token = AccessToken(response.data['access'])
+
+            with self.assertNumQueries(0):
+                user = FastJWTAuthentication().get_user(token)
+        self.assertEqual(user.pk, self.member.pk)
+
+        # Деактивований юзер нового токена не отримує
+        User.objects.filter(pk=self.member.pk).update(is_active=False)
+        response = self.client.post('/api/v1/users/token/refresh/', {"refresh": refresh})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_unsafe_request_loads_full_user_once(self):
+        """POST читає юзера одним SELECT, а не по запиту на кожне відкладене поле"""
+        access = self._login('jwt@test.com', 'strongpassword123')
+        request = APIRequestFactory().post('/', HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        with self.assertNumQueries(1):
+            user, _ = FastJWTAuthentication().authenticate(request)
+            self.assertEqual(user.email, 'jwt@test.com')
+            self.assertFalse(user.avatar)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), OBJECT_STORAGE={
+    **settings.OBJECT_STORAGE, 'ENDPOINT_URL': 'http://testserver/storage', 'SECRET_KEY': 'object-storage-test',
+})
+class AvatarVariantTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='avatar_user', email='avatar@test.com', password='123')
+        project = Project.objects.create(name="Avatars", key="AVA", owner=self.user)
+        ProjectMember.objects.create(project=project, user=self.user, role='owner')
+        Task.objects.create(project=project, title="Аватар у списку", reporter=self.user, assignee=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def _upload_avatar(self):
+        buffer = BytesIO()
+        Image.new('RGBA', (1200, 800), (200, 30, 30, 128)).save(buffer, 'PNG')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch('/api/v1/users/me/', {
+                'avatar': SimpleUploadedFile('me.png', buffer.getvalue(), content_type='image/png')
+            }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+
+    def test_upload_renders_variants_and_lists_use_thumbnails(self):
+        self._upload_avatar()
+
+        variants = self.user.avatar_variants
+        self.assertEqual(set(variants), {'sm', 'md', 'lg'})
+        with default_storage.open(variants['sm']['webp']) as stored, Image.open(stored) as image:
+            self.assertEqual((image.format, image.size), ('WEBP', (48, 48)))
+        with default_storage.open(variants['lg']['jpeg']) as stored, Image.open(stored) as image:
+            self.assertEqual((image.format, image.size), ('JPEG', (256, 256)))
+
+        # Список задач віддає мініатюру, а не оригінал
+        task = self.client.get('/api/v1/tasks/').data['results'][0]
+        self.assertIn(variants['sm']['webp'], task['assignee_avatar'])
+        self.assertNotIn(self.user.avatar.name, task['assignee_avatar'])
+
+        # Мініатюри незмінні за своїм шляхом — кешуються надовго. Заголовок підписаний у самому URL,
+        # тож S3/MinIO віддадуть його так само, як локальна заглушка
+        query = parse_qs(urlsplit(task['assignee_avatar']).query)
+        self.assertEqual(query['response-cache-control'], [f"private, max-age={365 * 24 * 3600}, immutable"])
+        thumbnail = self.client.get(task['assignee_avatar'])
+        self.assertEqual(thumbnail.status_code, status.HTTP_200_OK)
+        self.assertIn('immutable', thumbnail['Cache-Control'])
+
+    def test_new_avatar_resets_stale_variants(self):
+        self._upload_avatar()
+        self.user.avatar = SimpleUploadedFile('other.png', b'not an image')
+        self.user.save()
+        self.assertEqual(self.user.avatar_variants, {})
@@ -1,8 +1,7 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenRefreshView
 from .views import MeView, CreateInvitationView, RegisterByInviteView, PasswordResetRequestView, \
-    PasswordResetConfirmView, UserViewSet, CustomTokenObtainPairView
+    PasswordResetConfirmView, UserViewSet, CustomTokenObtainPairView, CustomTokenRefreshView
 
 # --- ЛОКАЛЬНИЙ РОУТЕР ---
 # Він створить шляхи:
@@ -17,7 +16,7 @@ router.register(r'', UserViewSet, basename='user')
 urlpatterns = [
     # Auth (JWT)
     path('token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'), # Логін
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'), # Оновлення токена
+    path('token/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'), # Оновлення токена
 
     # Users Logic
     path('me/', MeView.as_view(), name='user_me'), # Мій профіль
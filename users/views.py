@@ -4,26 +4,38 @@ from rest_framework.views import APIView
 from django.contrib.auth import get_user_model
 from .models import Invitation
 from .serializers import (UserSerializer, InvitationSerializer, RegistrationSerializer, SetNewPasswordSerializer,
-                          PasswordResetRequestSerializer, UserSummarySerializer, UserManageSerializer)
+                          PasswordResetRequestSerializer, UserSummarySerializer, UserManageSerializer,
+                          CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer)
+from .authentication import USER_CLAIMS, invalidate_user_claims, revoke_user_tokens, restore_user_tokens
 from django.db import transaction
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
+from django.utils import timezone
 from notifications.tasks import send_email_async
 from Core.pagination import CoreCursorPagination
-from rest_framework.throttling import ScopedRateThrottle
-from rest_framework_simplejwt.views import TokenObtainPairView
+from Core.throttling import ScopedSlidingWindowThrottle
+from Core.sparse_fields import SparseQuerysetMixin
+from sync.changelog import record_changes
+from sync.models import ChangeLogEntry
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 User = get_user_model()
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     """
     Кастомний ендпоінт логіну з захистом від Brute-force.
-    Наслідує логіку SimpleJWT, але додає Throttling.
+    Наслідує логіку SimpleJWT, але додає Throttling та claims для швидкої автентифікації.
     """
-    throttle_classes = [ScopedRateThrottle]
+    serializer_class = CustomTokenObtainPairSerializer
+    throttle_classes = [ScopedSlidingWindowThrottle]
     throttle_scope = 'login'
 
+
+class CustomTokenRefreshView(TokenRefreshView):
+    """Оновлення access-токена зі свіжими claims для швидкої автентифікації."""
+    serializer_class = CustomTokenRefreshSerializer
+
 class MeView(generics.RetrieveUpdateDestroyAPIView):
     """
     GET /users/me/ -> Отримати свій профіль
@@ -33,8 +45,9 @@ class MeView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        # Повертає поточного залогіненого юзера
-        return self.request.user
+        # Повертає поточного залогіненого юзера.
+        # request.user може бути "легким" (з claims токена), тому профіль читається повністю
+        return User.objects.get(pk=self.request.user.pk)
 
     def perform_destroy(self, instance):
         """
@@ -43,6 +56,7 @@ class MeView(generics.RetrieveUpdateDestroyAPIView):
         """
         instance.is_active = False
         instance.save()
+        revoke_user_tokens(instance.pk)
 
 
 class CreateInvitationView(generics.CreateAPIView):
@@ -62,7 +76,7 @@ class RegisterByInviteView(APIView):
     POST /users/register/ -> Реєстрація по токену
     """
     permission_classes = [permissions.AllowAny]  # Доступно всім (навіть без логіну)
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [ScopedSlidingWindowThrottle]
     throttle_scope = 'register'
 
     def post(self, request):
@@ -82,7 +96,7 @@ class PasswordResetRequestView(generics.GenericAPIView):
     """
     serializer_class = PasswordResetRequestSerializer
     permission_classes = [permissions.AllowAny]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [ScopedSlidingWindowThrottle]
     throttle_scope = 'password_reset'
 
     def post(self, request):
@@ -136,10 +150,11 @@ class UserCursorPagination(CoreCursorPagination):
     """
     ordering = '-date_joined'
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     Універсальний контролер:
     - GET /users/ : Список (для юзерів - тільки активні, для адміна - всі).
+    - GET /users/?fields=id,full_name : Тільки вибрані поля (для випадних списків).
     - PATCH /users/{id}/ : Редагування (Тільки Адмін).
     - DELETE /users/{id}/ : Деактивація (Тільки Адмін).
     """
@@ -159,8 +174,10 @@ class UserViewSet(viewsets.ModelViewSet):
         """
         user = self.request.user
         if user.is_staff or user.is_superuser:
-            return User.objects.all()
-        return User.objects.filter(is_active=True)
+            queryset = User.objects.all()
+        else:
+            queryset = User.objects.filter(is_active=True)
+        return self.narrow_queryset(queryset)
 
     def get_serializer_class(self):
         # Якщо змінює дані або створює (тільки адмін) - повний доступ
@@ -176,6 +193,18 @@ class UserViewSet(viewsets.ModelViewSet):
         # Всі інші (list, retrieve) - для всіх авторизованих
         return [permissions.IsAuthenticated()]
 
+    def perform_update(self, serializer):
+        previous = {field: getattr(serializer.instance, field) for field in USER_CLAIMS}
+        user = serializer.save()
+        # Адмін може забанити або розбанити юзера через is_active
+        if user.is_active:
+            restore_user_tokens(user.pk)
+        else:
+            revoke_user_tokens(user.pk)
+        # Зміна ролі чи прав: видані токени несуть старі claims
+        if any(getattr(user, field) != value for field, value in previous.items()):
+            invalidate_user_claims(user.pk)
+
     def destroy(self, request, *args, **kwargs):
         """
         Soft Delete + Очищення робочих хвостів.
@@ -198,7 +227,12 @@ class UserViewSet(viewsets.ModelViewSet):
         # 2. Знімає юзера з активних задач (Assignee -> None)
         # Шукає задачі які ще НЕ зроблені (To Do, In Progress, Review)
         active_tasks = Task.objects.filter(assignee=user).exclude(status=Task.STATUS_DONE)
-        updated_tasks_count = active_tasks.update(assignee=None)
+        # updated_at вручну: update() не викликає auto_now, а від нього залежить ETag задачі
+        task_rows = list(active_tasks.values_list('id', 'project_id'))
+        updated_tasks_count = Task.objects.filter(id__in=[task_id for task_id, _ in task_rows]).update(
+            assignee=None, updated_at=timezone.now()
+        )
+        record_changes(ChangeLogEntry.ENTITY_TASK, task_rows)
 
         # 3. Видаляє його зі списків учасників проєктів
         # (Щоб його не можна было вибрати у нових задачах)
@@ -208,6 +242,8 @@ class UserViewSet(viewsets.ModelViewSet):
         # 4. Власне деактивація (Soft Delete)
         user.is_active = False
         user.save()
+        # Токени юзера перестають працювати одразу, а не після закінчення їх терміну
+        revoke_user_tokens(user.pk)
 
         return Response(
             {